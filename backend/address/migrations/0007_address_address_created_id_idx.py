@@ -0,0 +1,19 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address", "0006_alter_addresstype_address_type"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(
+                fields=["created_at", "id"], name="address_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("address", "0007_address_address_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="address",
+            name="address_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_at", "id"],
+                name="address_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["module_field_id", "module"],
+                name="address_live_owner_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from models import LIVE, SoftDeleteModel
 from user.models import User
 
 from .constants import *
@@ -9,7 +10,7 @@ class AddressType(models.Model):
     address_type = models.CharField(max_length=100, default=USER_ADDRESS)
 
 
-class Address(models.Model):
+class Address(SoftDeleteModel):
     """
     Address model class
     mapped by : User model - many to one mapping
@@ -44,4 +45,17 @@ class Address(models.Model):
         AddressType, on_delete=models.CASCADE, related_name=ADDRESS_MODULE
     )
     module_field_id = models.IntegerField(null=True)
-    is_deleted = models.BooleanField(editable=False, default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                condition=LIVE,
+                name="address_created_id_idx",
+            ),
+            models.Index(
+                fields=["module_field_id", "module"],
+                condition=LIVE,
+                name="address_live_owner_idx",
+            ),
+        ]
@@ -29,7 +29,7 @@ class AddressViewSets(ModelViewSet):
     Also, this class manage the all crud requests from end address.
     """
 
-    queryset = Address.objects.filter(is_deleted=False)
+    queryset = Address.objects.all()
     serializer_class = AddressSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
@@ -48,22 +48,16 @@ class AddressViewSets(ModelViewSet):
             type = request.data[MODULE]
             if type == HOME_ADDRESS:
                 request.data[MODULE] = 1
-                created_by = User.objects.get(
-                    is_deleted=False, id=request.data[MODULE_FIELD_ID]
-                )
+                created_by = User.objects.get(id=request.data[MODULE_FIELD_ID])
                 request.data[CREATED_BY] = created_by.id
                 request.data[UPDATED_BY] = created_by.id
             elif type == WORK_ADDRESS:
                 request.data[MODULE] = 2
-                created_by = Profession.objects.get(
-                    is_deleted=False, id=request.data[MODULE_FIELD_ID]
-                )
+                created_by = Profession.objects.get(id=request.data[MODULE_FIELD_ID])
                 request.data[CREATED_BY] = created_by.address.id
                 request.data[UPDATED_BY] = created_by.address.id
             elif type == SHOP_ADDRESS:
-                created_by = Shop.objects.get(
-                    is_deleted=False, id=request.data[MODULE_FIELD_ID]
-                )
+                created_by = Shop.objects.get(id=request.data[MODULE_FIELD_ID])
                 request.data[CREATED_BY] = created_by.address.id
                 request.data[UPDATED_BY] = created_by.address.id
             serializer = self.get_serializer(data=request.data)
@@ -99,17 +93,12 @@ class AddressViewSets(ModelViewSet):
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(ADDRESS_NOT_FOUND)
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(ADDRESS_NOT_FOUND)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -130,25 +119,23 @@ class AddressViewSets(ModelViewSet):
             if address_type == HOME_ADDRESS:
                 request.data[MODULE] = 1
                 try:
-                    User.objects.get(is_deleted=False, id=request.data[MODULE_FIELD_ID])
+                    User.objects.get(id=request.data[MODULE_FIELD_ID])
                 except Exception as e:
                     raise DataNotExist(e.__str__())
             elif address_type == WORK_ADDRESS:
                 request.data[MODULE] = 2
                 try:
-                    Profession.objects.get(
-                        is_deleted=False, id=request.data[MODULE_FIELD_ID]
-                    )
+                    Profession.objects.get(id=request.data[MODULE_FIELD_ID])
                 except Exception as e:
                     raise DataNotExist(e.__str__())
             elif address_type == SHOP_ADDRESS:
                 request.data[MODULE] = 3
                 try:
-                    Shop.objects.get(is_deleted=False, id=request.data[MODULE_FIELD_ID])
+                    Shop.objects.get(id=request.data[MODULE_FIELD_ID])
                 except Exception as e:
                     raise DataNotExist(e.__str__())
             try:
-                instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
+                instance.updated_by = User.objects.get(id=updated_by)
             except Exception as e:
                 raise DataNotExist(e.__str__())
             serializer = self.get_serializer(instance, data=request.data)
@@ -185,10 +172,7 @@ def delete_address(request, pk):
              else return error message with status code
     """
     try:
-        address = Address.objects.get(pk=pk)
-        if not address.is_deleted:
-            address.is_deleted = True
-            Address.save(address)
+        if Address.objects.filter(pk=pk).soft_delete():
             logger.info(DELETED_SUCCESS)
             return Response({DETAIL: DELETED_SUCCESS})
 
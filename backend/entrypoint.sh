@@ -1,3 +1,4 @@
 python3 manage.py makemigrations
 python3 manage.py migrate
-python3 manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+python3 manage.py createcachetable
+python3 -m uvicorn my_civil_service_project.asgi:application --host 0.0.0.0 --port 8000
\ No newline at end of file
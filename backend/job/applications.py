@@ -0,0 +1,266 @@
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from my_exceptions import DataAlreadyExist, DataNotExist
+from profession.availability import mark_busy, release
+from search.constants import JOB
+from search.documents import refresh
+from search.feed import enqueue
+
+from .constants import *
+from .events import notify_requestor
+from .models import Job, JobApplication
+
+APPLY_SQL = f"""
+    INSERT INTO {JOB_APPLICATION} (job_id, worker_id, status, created_at, updated_at)
+    SELECT %(job)s, %(worker)s, %(applied)s, now(), now()
+    WHERE EXISTS (
+        SELECT 1 FROM {Job._meta.db_table}
+        WHERE id = %(job)s AND NOT is_deleted AND job_status <> %(closed)s
+            AND number_of_workers > 0
+    )
+    ON CONFLICT (job_id, worker_id) DO UPDATE
+        SET status = EXCLUDED.status, updated_at = EXCLUDED.updated_at
+        WHERE {JOB_APPLICATION}.status = %(withdrawn)s
+    RETURNING id
+"""
+
+
+def job_changed(job_id):
+    """
+    Set-based updates skip post_save, keep the search document and the
+    worker feeds in step with a job whose openings changed
+    """
+    refresh(JOB, [job_id])
+    enqueue([job_id])
+
+
+def owned_job(job_id, requestor_id):
+    """
+    Whether a live job was posted by the given house owner, only the
+    requestor may see or decide on the applicants of a job
+    """
+    return Job.objects.filter(id=job_id, requestor_id=requestor_id).exists()
+
+
+def apply(job_id, worker_id):
+    """
+    Apply a worker to a live, open job with openings left with one
+    idempotent INSERT, applying again after a withdraw re-opens the
+    application, any other repeat is a no-op
+    :param job_id: id of the job
+    :param worker_id: id of the applying worker
+    :return: True when the application was created or re-opened
+    :raise Job.DoesNotExist: when the job is deleted or missing
+    :raise DataNotExist: when the job is closed or has no openings left
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            APPLY_SQL,
+            {
+                "job": job_id,
+                "worker": worker_id,
+                "applied": APPLIED,
+                "withdrawn": WITHDRAWN,
+                "closed": CLOSED,
+            },
+        )
+        if cursor.fetchone() is not None:
+            notify_requestor(job_id, APPLIED, [worker_id])
+            return True
+    job_status = (
+        Job.objects.filter(id=job_id).values_list("job_status", flat=True).first()
+    )
+    if job_status is None:
+        raise Job.DoesNotExist(JOB_NOT_EXIST)
+    if (
+        JobApplication.objects.filter(job_id=job_id, worker_id=worker_id)
+        .exclude(status=WITHDRAWN)
+        .exists()
+    ):
+        return False
+    raise DataNotExist(JOB_CLOSED if job_status == CLOSED else NO_OPENINGS)
+
+
+def change_status(job_id, worker_id, status, current=(APPLIED,)):
+    """
+    Move one application to a new status through its unique key, the job
+    requestor is notified once the change commits
+    :param job_id: id of the job
+    :param worker_id: id of the worker
+    :param status: new status
+    :param current: statuses the application may be moved from
+    :return: True when the application was changed
+    """
+    changed = JobApplication.objects.filter(
+        job_id=job_id, worker_id=worker_id, status__in=current
+    ).update(status=status, updated_at=timezone.now())
+    if changed:
+        notify_requestor(job_id, status, [worker_id])
+    return bool(changed)
+
+
+def lock_job(queryset, job_id, **filters):
+    """
+    Lock a job row for the rest of the transaction. Every decision on the
+    applicants of a job locks the job before its applications, so
+    concurrent ones queue instead of deadlocking. The lock lets the foreign
+    key checks of new applications through.
+    :return: the job or None
+    """
+    return (
+        queryset.select_for_update(no_key=True)
+        .only("number_of_workers", "work_date", "working_days")
+        .filter(id=job_id, **filters)
+        .first()
+    )
+
+
+def withdraw(job_id, worker_id):
+    """
+    Withdraw the application of a worker. Withdrawing after being accepted
+    gives the opening back, drops the acceptor row and frees the worker's
+    calendar for the job days.
+    :param job_id: id of the job
+    :param worker_id: id of the withdrawing worker
+    :return: True when the application was withdrawn
+    """
+    with transaction.atomic():
+        job = lock_job(Job.all_objects, job_id)
+        if job is None:
+            return False
+        application = (
+            JobApplication.objects.select_for_update()
+            .filter(job_id=job_id, worker_id=worker_id, status__in=(APPLIED, ACCEPTED))
+            .first()
+        )
+        if application is None:
+            return False
+        if application.status == ACCEPTED:
+            Job.acceptor.through.objects.filter(
+                job_id=job_id, user_id=worker_id
+            ).delete()
+            Job.all_objects.filter(id=job_id).update(
+                number_of_workers=F("number_of_workers") + 1,
+                updated_at=timezone.now(),
+            )
+            release([(worker_id, job.work_date, job.working_days)], [job_id])
+            transaction.on_commit(lambda: job_changed(job_id))
+        return change_status(job_id, worker_id, WITHDRAWN, (application.status,))
+
+
+def accept(job_id, worker_id, requestor_id):
+    """
+    Accept an applied worker in one transaction. The opening is taken with a
+    guarded `UPDATE ... SET number_of_workers = number_of_workers - 1 WHERE
+    number_of_workers > 0 AND requestor_id = ...`, the row lock it takes
+    serializes concurrent acceptors of the same job so a job is never filled
+    past its openings, and only the requestor of the job can take one.
+    The worker is booked in the availability calendar for the job days.
+    :param job_id: id of the job
+    :param worker_id: id of the worker to accept
+    :param requestor_id: id of the accepting house owner
+    :return: number of openings left
+    :raise Job.DoesNotExist: when the job is not a live job of the requestor
+    :raise DataNotExist: when the worker has not applied or the job is full
+    :raise DataAlreadyExist: when the worker is already accepted
+    """
+    with transaction.atomic():
+        # the job row is locked by the update before the application
+        taken = Job.objects.filter(
+            id=job_id, requestor_id=requestor_id, number_of_workers__gt=0
+        ).update(
+            number_of_workers=F("number_of_workers") - 1,
+            updated_by_id=requestor_id,
+            updated_at=timezone.now(),
+        )
+        if not taken:
+            if not owned_job(job_id, requestor_id):
+                raise Job.DoesNotExist(JOB_NOT_EXIST)
+            raise DataNotExist(NO_OPENINGS)
+        if not change_status(job_id, worker_id, ACCEPTED):
+            raise DataNotExist(APPLICATION_NOT_EXIST)
+        try:
+            with transaction.atomic():
+                Job.acceptor.through.objects.create(job_id=job_id, user_id=worker_id)
+        except IntegrityError:
+            raise DataAlreadyExist(ALREADY_ACCEPTED)
+        openings, work_date, working_days = Job.objects.values_list(
+            "number_of_workers", "work_date", "working_days"
+        ).get(id=job_id)
+        mark_busy([worker_id], work_date, working_days)
+        transaction.on_commit(lambda: job_changed(job_id))
+    return openings
+
+
+def decide(job_id, decisions, requestor_id):
+    """
+    Accept and reject many applicants of one job in one transaction with a
+    fixed number of queries whatever the number of workers: lock the job,
+    then lock and read the applications, insert the acceptor rows, take the
+    openings, book the accepted workers and move the applications in two
+    updates.
+    :param job_id: id of the job
+    :param decisions: list of {worker, decision} with accepted or rejected
+    :param requestor_id: id of the deciding house owner
+    :return: dict of worker id -> outcome and the openings left
+    :raise Job.DoesNotExist: when the job is not a live job of the requestor
+    """
+    outcomes = {}
+    wanted = {}
+    for entry in decisions:
+        worker_id, decision = int(entry[WORKER_ID]), entry[DECISION]
+        if decision in (ACCEPTED, REJECTED):
+            wanted[worker_id] = decision
+        else:
+            outcomes[worker_id] = INVALID_DECISION
+    with transaction.atomic():
+        job = lock_job(Job.objects, job_id, requestor_id=requestor_id)
+        if job is None:
+            raise Job.DoesNotExist(JOB_NOT_EXIST)
+        # a worker withdrawing meanwhile waits for these locks
+        applied = set(
+            JobApplication.objects.select_for_update()
+            .filter(job_id=job_id, worker_id__in=wanted, status=APPLIED)
+            .order_by("worker_id")
+            .values_list("worker_id", flat=True)
+        )
+        accepted, rejected = [], []
+        openings = job.number_of_workers
+        for worker_id, decision in wanted.items():
+            if worker_id not in applied:
+                outcomes[worker_id] = APPLICATION_NOT_EXIST
+            elif decision == REJECTED:
+                rejected.append(worker_id)
+                outcomes[worker_id] = REJECTED
+            elif len(accepted) < openings:
+                accepted.append(worker_id)
+                outcomes[worker_id] = ACCEPTED
+            else:
+                outcomes[worker_id] = NO_OPENINGS
+        now = timezone.now()
+        if accepted:
+            Job.acceptor.through.objects.bulk_create(
+                [
+                    Job.acceptor.through(job_id=job_id, user_id=worker_id)
+                    for worker_id in accepted
+                ],
+                ignore_conflicts=True,
+            )
+            Job.objects.filter(id=job_id).update(
+                number_of_workers=F("number_of_workers") - len(accepted),
+                updated_by_id=requestor_id,
+                updated_at=now,
+            )
+            JobApplication.objects.filter(
+                job_id=job_id, worker_id__in=accepted, status=APPLIED
+            ).update(status=ACCEPTED, updated_at=now)
+            mark_busy(accepted, job.work_date, job.working_days)
+            notify_requestor(job_id, ACCEPTED, accepted)
+            transaction.on_commit(lambda: job_changed(job_id))
+        if rejected:
+            JobApplication.objects.filter(
+                job_id=job_id, worker_id__in=rejected, status=APPLIED
+            ).update(status=REJECTED, updated_at=now)
+            notify_requestor(job_id, REJECTED, rejected)
+    return outcomes, openings - len(accepted)
@@ -30,3 +30,50 @@ REGISTER_PLEASE = "Worker does not exist please register first"
 DATA_NOT_FOUND = "data not found"
 PAY = "work_pay"
 DAYS = "working_days"
+APPLICATIONS = "applications"
+JOB_APPLICATIONS = "job_applications"
+JOB_APPLICATION = "job_application"
+APPLIED = "applied"
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+WITHDRAWN = "withdrawn"
+APPLICATION_STATUSES = (
+    (APPLIED, "Applied"),
+    (ACCEPTED, "Accepted"),
+    (REJECTED, "Rejected"),
+    (WITHDRAWN, "Withdrawn"),
+)
+STATUS = "status"
+WORKER_ID = "worker"
+APPLIED_SUCCESS = "Successfully Applied"
+ALREADY_APPLIED = "Already applied"
+REJECTED_SUCCESS = "Rejected successfully"
+WITHDRAWN_SUCCESS = "Withdrawn successfully"
+APPLICATION_NOT_EXIST = "Application does not exist"
+NO_ONE_APPLIED = "No one applied"
+ACCEPTED_SUCCESS = "Accepted successfully"
+ALREADY_ACCEPTED = "Worker already accepted"
+NO_OPENINGS = "No openings left for the job"
+JOB_CLOSED = "Job is closed"
+OPENINGS = "openings"
+DECISION = "decision"
+DECISIONS = "decisions"
+OUTCOMES = "outcomes"
+INVALID_DECISION = "Invalid decision, use accepted or rejected"
+DECIDED_SUCCESS = "Decisions applied successfully"
+ACTIVE_ON = "active_on"
+PERIOD_FROM = "from"
+PERIOD_TO = "to"
+WITHIN = "within"
+INVALID_DATE = "Dates must be given as YYYY-MM-DD and from must not be after to"
+ID = "id"
+UNIQUE_LIVE_JOB = "unique_live_job_per_day"
+OPEN = "open"
+CLOSED = "closed"
+EVENT = "event"
+JOB_ID = "job"
+DEFAULT_EVENT_BROKER = "job.events.InProcessBroker"
+EVENTS_PATH = "/api/v1/civil-service-management/job/events"
+# seconds between keep-alive comments on an idle event stream
+KEEP_ALIVE = 15
+CHANGES_RETRIEVED = "Job changes retrieved successfully"
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .constants import *
+from .models import Job
+
+# events a subscriber may fall behind by before older ones are dropped
+QUEUE_SIZE = 100
+
+
+class InProcessBroker:
+    """
+    Fan out job events to the subscribers connected to this process.
+    Publishers may run on any thread, every subscriber queue is fed on the
+    event loop that owns it. Swap it for a shared broker through the
+    JOB_EVENT_BROKER setting when the site runs more than one process, a
+    replacement only needs the same subscribe, unsubscribe and publish.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """
+        Open a queue receiving the events of one user, call from the event loop
+        """
+        queue = asyncio.Queue(QUEUE_SIZE)
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(
+                (asyncio.get_running_loop(), queue)
+            )
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self.lock:
+            queues = self.subscribers.get(user_id, set())
+            queues.discard((asyncio.get_running_loop(), queue))
+            if not queues:
+                self.subscribers.pop(user_id, None)
+
+    def publish(self, user_id, event):
+        """
+        Deliver an event to every open queue of a user
+        """
+        with self.lock:
+            targets = list(self.subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(deliver, queue, event)
+
+
+def deliver(queue, event):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+broker = None
+broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    The broker of this process, built from the JOB_EVENT_BROKER setting
+    """
+    global broker
+    if broker is None:
+        with broker_lock:
+            if broker is None:
+                broker = import_string(
+                    getattr(settings, "JOB_EVENT_BROKER", DEFAULT_EVENT_BROKER)
+                )()
+    return broker
+
+
+def notify_requestor(job_id, event, worker_ids):
+    """
+    Push an application event to the requestor of the job once the current
+    transaction commits
+    :param job_id: id of the job
+    :param event: applied, withdrawn, accepted or rejected
+    :param worker_ids: ids of the workers the event is about
+    """
+
+    def publish():
+        requestor_id = (
+            Job.objects.filter(id=job_id).values_list("requestor_id", flat=True).first()
+        )
+        if requestor_id is None:
+            return
+        for worker_id in worker_ids:
+            get_broker().publish(
+                requestor_id, {EVENT: event, JOB_ID: job_id, WORKER_ID: worker_id}
+            )
+
+    transaction.on_commit(publish)
@@ -0,0 +1,91 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from my_exceptions import DataAlreadyExist, DataNotExist
+from user.models import User
+
+from ...applications import accept
+from ...models import Job, JobApplication, WorkType
+
+
+class Command(BaseCommand):
+    help = (
+        "Accept many applicants of one job from concurrent threads and check "
+        "the job is filled exactly up to its openings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--acceptors", type=int, default=60)
+        parser.add_argument("--openings", type=int, default=10)
+
+    def handle(self, *args, **options):
+        acceptors, openings = options["acceptors"], options["openings"]
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-{tag}",
+            name="bench",
+            mobile=int(time.time() * 1000),
+            email=f"bench-{tag}@example.com",
+        )
+        workers = User.objects.bulk_create(
+            [
+                User(
+                    username=f"bench-{tag}-{number}",
+                    name="bench",
+                    mobile=owner.mobile + number + 1,
+                    email=f"bench-{tag}-{number}@example.com",
+                )
+                for number in range(acceptors)
+            ]
+        )
+        work_type = WorkType.objects.create(name=f"bench-{tag}")
+        job = Job.objects.create(
+            work_type=work_type,
+            number_of_workers=openings,
+            work_date=timezone.now().date(),
+            working_days=1,
+            work_pay=0,
+            requestor=owner,
+        )
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, worker=worker) for worker in workers
+        )
+
+        def attempt(worker):
+            try:
+                accept(job.id, worker.id, owner.id)
+                return True
+            except (DataNotExist, DataAlreadyExist):
+                return False
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=acceptors) as pool:
+                results = list(pool.map(attempt, workers))
+            elapsed = time.perf_counter() - started
+
+            filled = sum(results)
+            job.refresh_from_db()
+            accepted_rows = job.acceptor.count()
+            self.stdout.write(
+                f"{acceptors} acceptors, {openings} openings: {filled} accepted, "
+                f"{acceptors - filled} refused, {job.number_of_workers} left, "
+                f"{accepted_rows} acceptor rows in {elapsed:.3f}s "
+                f"({acceptors / elapsed:.0f} accepts/s)"
+            )
+            if (
+                filled != min(acceptors, openings)
+                or accepted_rows != filled
+                or job.number_of_workers != openings - filled
+            ):
+                raise CommandError("Job was filled inconsistently")
+        finally:
+            job.delete()
+            work_type.delete()
+            User.objects.filter(username__startswith=f"bench-{tag}").delete()
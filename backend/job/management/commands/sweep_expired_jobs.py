@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from profession.availability import release_jobs
+from psycopg2.extras import DateRange
+from search.constants import JOB
+from search.documents import refresh
+from search.models import WorkerFeedEntry
+
+from ...constants import *
+from ...models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Close the jobs whose work period has ended, in small batches with a "
+        "pause between them, meant to be run on a schedule"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause", type=float, default=0.2, help="seconds to sleep between batches"
+        )
+
+    def handle(self, *args, **options):
+        batch_size, pause = options["batch_size"], options["pause"]
+        today = timezone.localdate()
+        # work periods lying wholly before today, read off the partial GiST index
+        expired = (
+            Job.objects.filter(work_period__fully_lt=DateRange(today, None))
+            .exclude(job_status=CLOSED)
+            .values_list(ID, flat=True)
+        )
+        total = 0
+        batches = 0
+        started = time.perf_counter()
+        while True:
+            batch_started = time.perf_counter()
+            with transaction.atomic():
+                ids = list(expired.select_for_update(skip_locked=True)[:batch_size])
+                if not ids:
+                    break
+                closed = (
+                    Job.objects.filter(id__in=ids)
+                    .exclude(job_status=CLOSED)
+                    .update(job_status=CLOSED, updated_at=timezone.now())
+                )
+                # set-based updates skip post_save, take the jobs out of search,
+                # the worker feeds and the calendars of their acceptors here
+                refresh(JOB, ids)
+                WorkerFeedEntry.objects.filter(job_id__in=ids).delete()
+                release_jobs(ids)
+            batches += 1
+            total += closed
+            self.stdout.write(
+                f"batch {batches}: {closed} jobs closed in "
+                f"{(time.perf_counter() - batch_started) * 1000:.0f} ms"
+            )
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause)
+        self.stdout.write(
+            f"{total} jobs closed in {batches} batches, "
+            f"{time.perf_counter() - started:.2f}s"
+        )
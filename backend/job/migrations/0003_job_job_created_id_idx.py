@@ -0,0 +1,17 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0002_remove_job_requester_job_requestor"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(fields=["created_at", "id"], name="job_created_id_idx"),
+        ),
+    ]
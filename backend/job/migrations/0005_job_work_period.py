@@ -0,0 +1,33 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:43
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0004_job_application"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="work_period",
+            field=django.contrib.postgres.fields.ranges.DateRangeField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE job_job SET work_period = "
+            "daterange(work_date, work_date + working_days, '[)')",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["work_period"], name="job_work_period_idx"
+            ),
+        ),
+    ]
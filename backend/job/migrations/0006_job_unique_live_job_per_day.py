@@ -0,0 +1,56 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:43
+
+from django.db import migrations, models
+
+# the pre-check the constraint replaces was racy, keep the newest live job
+# per requestor and day
+DEDUP_SQL = """
+    UPDATE job_job AS job SET is_deleted = true, updated_at = now()
+    WHERE NOT job.is_deleted AND job.requestor_id IS NOT NULL AND EXISTS (
+        SELECT 1 FROM job_job AS newer
+        WHERE NOT newer.is_deleted AND newer.requestor_id = job.requestor_id
+            AND newer.work_date = job.work_date AND newer.id > job.id
+    )
+    RETURNING job.id
+"""
+
+
+def drop_duplicate_jobs(apps, schema_editor):
+    """
+    Soft delete all but the newest live job per requestor and day, and take
+    them out of search and the worker feeds when those tables exist already
+    """
+    connection = schema_editor.connection
+    tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(DEDUP_SQL)
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return
+        if "search_document" in tables:
+            cursor.execute(
+                "UPDATE search_document SET is_deleted = true "
+                "WHERE entity_type = 'job' AND entity_id = ANY(%s)",
+                [ids],
+            )
+        if "worker_feed" in tables:
+            cursor.execute("DELETE FROM worker_feed WHERE job_id = ANY(%s)", [ids])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0005_job_work_period"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="job",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_deleted", False)),
+                fields=("requestor", "work_date"),
+                name="unique_live_job_per_day",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:44
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0006_job_unique_live_job_per_day"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="job_status",
+            field=models.CharField(default="open", max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.GistIndex(
+                condition=models.Q(
+                    ("is_deleted", False),
+                    models.Q(("job_status", "closed"), _negated=True),
+                ),
+                fields=["work_period"],
+                name="job_unclosed_period_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_deleted", False),
+                    models.Q(("job_status", "closed"), _negated=True),
+                ),
+                fields=["created_at", "id"],
+                name="job_unclosed_created_id_idx",
+            ),
+        ),
+    ]
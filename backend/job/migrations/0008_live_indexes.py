@@ -0,0 +1,33 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0007_job_status_sweep"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="job",
+            name="job_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_at", "id"],
+                name="job_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["requestor"],
+                name="job_live_requestor_idx",
+            ),
+        ),
+    ]
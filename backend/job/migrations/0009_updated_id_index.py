@@ -0,0 +1,17 @@
+# Generated by Django 3.2.17 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0008_live_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(fields=["updated_at", "id"], name="job_updated_id_idx"),
+        ),
+    ]
@@ -1,5 +1,11 @@
+import datetime
+
 from address.models import Address
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from models import LIVE, SoftDeleteModel
+from psycopg2.extras import DateRange
 from user.models import User
 
 from .constants import *
@@ -10,7 +16,7 @@ class WorkType(models.Model):
     name = models.CharField(max_length=100)
 
 
-class Job(models.Model):
+class Job(SoftDeleteModel):
     """
     Job model class
     """
@@ -30,7 +36,7 @@ class Job(models.Model):
     acceptor = models.ManyToManyField(
         User, related_name=JOB_ACCEPTOR, null=True, db_table=APPLIED_WORKER
     )
-    job_status = models.CharField(max_length=100)
+    job_status = models.CharField(max_length=100, default=OPEN)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
@@ -39,4 +45,79 @@ class Job(models.Model):
     updated_by = models.ForeignKey(
         User, on_delete=models.CASCADE, blank=True, null=True, related_name=UPDATE_JOB
     )
-    is_deleted = models.BooleanField(editable=False, default=False)
+    # [work_date, work_date + working_days), kept in step with the two fields
+    work_period = DateRangeField(editable=False, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], condition=LIVE, name="job_created_id_idx"
+            ),
+            # delta sync reads every change, soft deletes included
+            models.Index(fields=["updated_at", "id"], name="job_updated_id_idx"),
+            models.Index(
+                fields=["requestor"], condition=LIVE, name="job_live_requestor_idx"
+            ),
+            GistIndex(fields=["work_period"], name="job_work_period_idx"),
+            # working set of the sweeper and of the job list, closed jobs drop out
+            GistIndex(
+                fields=["work_period"],
+                condition=models.Q(is_deleted=False) & ~models.Q(job_status=CLOSED),
+                name="job_unclosed_period_idx",
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_deleted=False) & ~models.Q(job_status=CLOSED),
+                name="job_unclosed_created_id_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["requestor", "work_date"],
+                condition=models.Q(is_deleted=False),
+                name=UNIQUE_LIVE_JOB,
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        work_date = self.work_date
+        if isinstance(work_date, str):
+            work_date = datetime.date.fromisoformat(work_date)
+        self.work_period = DateRange(
+            work_date, work_date + datetime.timedelta(days=int(self.working_days))
+        )
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "work_period"}
+        super().save(*args, **kwargs)
+
+
+class JobApplication(models.Model):
+    """
+    Job application model class
+    mapped by : Job, User - one application per job and worker
+    """
+
+    id = models.AutoField(primary_key=True)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name=APPLICATIONS)
+    worker = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name=JOB_APPLICATIONS
+    )
+    status = models.CharField(
+        max_length=20, choices=APPLICATION_STATUSES, default=APPLIED
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = JOB_APPLICATION
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "worker"], name="unique_job_application"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["job", "status", "created_at", "id"],
+                name="job_application_listing_idx",
+            )
+        ]
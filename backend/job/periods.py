@@ -0,0 +1,45 @@
+import datetime
+
+from django.db.models import Q
+from my_exceptions import DataNotExist
+from psycopg2.extras import DateRange
+from streaming import TRUE_VALUES
+
+from .constants import *
+
+
+def parse_date(params, key):
+    try:
+        return datetime.date.fromisoformat(params[key])
+    except ValueError:
+        raise DataNotExist(INVALID_DATE)
+
+
+def period_condition(params):
+    """
+    Condition on the work period of the jobs built from the query parameters,
+    every form is answered by the GiST index on work_period
+    `active_on` - jobs running on that day
+    `from` and `to` - jobs running on any day of the window, or with
+    `within=true` jobs running only on days of the window
+    :param params: query parameters of the search request
+    :return: Q object, None when no period parameter is given
+    """
+    condition = None
+    if ACTIVE_ON in params:
+        condition = Q(work_period__contains=parse_date(params, ACTIVE_ON))
+    if PERIOD_FROM in params or PERIOD_TO in params:
+        start = parse_date(params, PERIOD_FROM) if PERIOD_FROM in params else None
+        end = parse_date(params, PERIOD_TO) if PERIOD_TO in params else None
+        if start and end and start > end:
+            raise DataNotExist(INVALID_DATE)
+        # the window is inclusive of `to`, ranges are half open
+        window = DateRange(start, end + datetime.timedelta(days=1) if end else None)
+        if params.get(WITHIN, "").lower() in TRUE_VALUES:
+            window_condition = Q(work_period__contained_by=window)
+        else:
+            window_condition = Q(work_period__overlap=window)
+        condition = (
+            window_condition if condition is None else condition & window_condition
+        )
+    return condition
@@ -1,9 +1,11 @@
 import datetime
 import re
 
+from profession.constants import MAX_WORKING_DAYS
 from rest_framework import serializers
+from user.models import User
 
-from .models import Job
+from .models import Job, JobApplication
 from .my_logger import logger
 
 
@@ -27,6 +29,11 @@ class JobSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Working days must be integer.",
             )
+        if not 1 <= data["working_days"] <= MAX_WORKING_DAYS:
+            logger.error(f"Working days must be from 1 to {MAX_WORKING_DAYS}.")
+            raise serializers.ValidationError(
+                f"Working days must be from 1 to {MAX_WORKING_DAYS}.",
+            )
         if not data["work_date"] > datetime.date.today():
             logger.error("Work must be starts to after 24 hours from now.")
             raise serializers.ValidationError(
@@ -54,3 +61,34 @@ class JobResponseSerializer(serializers.ModelSerializer):
             "working_days",
             "work_pay",
         )
+
+
+class JobChangeSerializer(JobResponseSerializer):
+    """
+    Job serializer for the changes of a client side cache, the response
+    fields and the id the client keys them by
+    """
+
+    class Meta(JobResponseSerializer.Meta):
+        fields = ("id",) + JobResponseSerializer.Meta.fields
+
+
+class JobApplicationSerializer(serializers.ModelSerializer):
+    """
+    Job application serializer for list the workers applied for a job
+    """
+
+    class WorkerResponseSerializer(serializers.ModelSerializer):
+        """
+        User serializer for return response we can hide some important details
+        """
+
+        class Meta:
+            model = User
+            fields = ("id", "name", "email", "mobile")
+
+    worker = WorkerResponseSerializer()
+
+    class Meta:
+        model = JobApplication
+        fields = ("worker", "status", "created_at")
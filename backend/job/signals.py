@@ -0,0 +1,72 @@
+import datetime
+
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from models import soft_deleted
+from profession.availability import mark_busy, release, release_jobs
+
+from .constants import *
+from .models import Job
+
+
+def booked_period(work_date, working_days, is_deleted, job_status):
+    """
+    Period a job books its acceptors for, None once it is deleted or closed
+    """
+    if is_deleted or job_status == CLOSED:
+        return None
+    if isinstance(work_date, str):
+        work_date = datetime.date.fromisoformat(work_date)
+    return work_date, int(working_days)
+
+
+@receiver(pre_save, sender=Job)
+def capture_booking(sender, instance, raw=False, **kwargs):
+    """
+    Remember the period a job booked its acceptors for before a write
+    """
+    if not raw and instance.id:
+        stored = (
+            Job.all_objects.filter(id=instance.id)
+            .values_list("work_date", "working_days", "is_deleted", "job_status")
+            .first()
+        )
+        instance._stored_booking = booked_period(*stored) if stored else None
+
+
+@receiver(post_save, sender=Job)
+def move_bookings(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Move the bookings of the acceptors of a re-dated job, free them when the
+    job is deleted or closed by a save
+    """
+    if raw or created:
+        return
+    old = instance.__dict__.pop("_stored_booking", None)
+    new = booked_period(
+        instance.work_date,
+        instance.working_days,
+        instance.is_deleted,
+        instance.job_status,
+    )
+    if old == new:
+        return
+    workers = list(
+        Job.acceptor.through.objects.filter(job_id=instance.id).values_list(
+            "user_id", flat=True
+        )
+    )
+    if not workers:
+        return
+    if old is not None:
+        release([(worker_id, *old) for worker_id in workers], [instance.id])
+    if new is not None:
+        mark_busy(workers, *new)
+
+
+@receiver(soft_deleted, sender=Job)
+def release_soft_deleted(sender, ids, **kwargs):
+    """
+    Free the acceptors of jobs soft deleted by one UPDATE, cascades included
+    """
+    release_jobs(ids)
@@ -0,0 +1,114 @@
+import asyncio
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework.exceptions import APIException
+from user.authentication import SafeJWTAuthentication
+
+from .constants import *
+from .events import get_broker
+
+
+def authenticate(scope):
+    """
+    Id of the user signed in on the stream request. The stream bypasses the
+    Django handler, so the stale connections it closes around every request
+    are closed here.
+    """
+    close_old_connections()
+    try:
+        user, _ = SafeJWTAuthentication().authenticate(ASGIRequest(scope, io.BytesIO()))
+        return user.id
+    finally:
+        close_old_connections()
+
+
+async def send_error(send, exception):
+    body = json.dumps({DETAIL: str(exception.detail)}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": exception.status_code,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def event_stream(scope, receive, send):
+    """
+    Server-Sent Events stream of the application events of the jobs posted
+    by the signed in user. An idle stream is one coroutine waiting on a
+    queue, so a process holds thousands of them without a thread each.
+    """
+    try:
+        user_id = await sync_to_async(authenticate)(scope)
+    except APIException as e:
+        await send_error(send, e)
+        return
+    broker = get_broker()
+    queue = broker.subscribe(user_id)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=KEEP_ALIVE,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_event in done:
+                event = next_event.result()
+                body = f"event: {event[EVENT]}\ndata: {json.dumps(event)}\n\n"
+            else:
+                next_event.cancel()
+                body = ": keep-alive\n\n"
+            if not disconnected.done():
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": body.encode(),
+                        "more_body": True,
+                    }
+                )
+    finally:
+        disconnected.cancel()
+        broker.unsubscribe(user_id, queue)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def with_event_stream(application):
+    """
+    Serve the job event stream from the ASGI app, pass every other request
+    on to the Django application
+    """
+
+    async def router(scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["path"].rstrip("/") == EVENTS_PATH
+            and scope["method"] == "GET"
+        ):
+            await event_stream(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+
+    return router
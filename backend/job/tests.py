@@ -1 +1,701 @@
-# Create your tests here.
+import datetime
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from address.models import Address, AddressType
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from my_exceptions import DataAlreadyExist, DataNotExist
+from profession.availability import mark_busy
+from profession.models import WorkerAvailability
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from search.models import SearchDocument, WorkerFeedEntry
+from sync import CHANGED, CURSOR, DELETED, HAS_MORE, changes_response, settled_before
+from user.authentication import SafeJWTAuthentication
+from user.models import Role, User
+
+from .applications import accept, apply, decide, withdraw
+from .constants import *
+from .models import Job, JobApplication, WorkType
+from .periods import period_condition
+from .serializers import JobChangeSerializer
+
+
+def make_user(number):
+    return User.objects.create(
+        username=f"user-{number}",
+        name=f"user {number}",
+        mobile=9000000000 + number,
+        email=f"user-{number}@example.com",
+    )
+
+
+class DecideTestCase(TestCase):
+    """
+    Bulk accept and reject of the applicants of one job
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.workers = [make_user(number) for number in range(1, 7)]
+        self.job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=2,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=3,
+            work_pay=500,
+            requestor=self.owner,
+        )
+        JobApplication.objects.bulk_create(
+            JobApplication(job=self.job, worker=worker) for worker in self.workers[:5]
+        )
+
+    def ids(self, *positions):
+        return [self.workers[position].id for position in positions]
+
+    def test_outcomes_and_openings_left(self):
+        first, second, third, rejected, withdrawn, stranger = self.ids(*range(6))
+        JobApplication.objects.filter(worker_id=withdrawn).update(status=WITHDRAWN)
+        outcomes, openings = decide(
+            self.job.id,
+            [
+                {WORKER_ID: first, DECISION: ACCEPTED},
+                {WORKER_ID: second, DECISION: ACCEPTED},
+                {WORKER_ID: third, DECISION: ACCEPTED},
+                {WORKER_ID: rejected, DECISION: REJECTED},
+                {WORKER_ID: withdrawn, DECISION: ACCEPTED},
+                {WORKER_ID: stranger, DECISION: ACCEPTED},
+                {WORKER_ID: first + 100, DECISION: "maybe"},
+            ],
+            self.owner.id,
+        )
+        self.assertEqual(
+            outcomes,
+            {
+                first: ACCEPTED,
+                second: ACCEPTED,
+                third: NO_OPENINGS,
+                rejected: REJECTED,
+                withdrawn: APPLICATION_NOT_EXIST,
+                stranger: APPLICATION_NOT_EXIST,
+                first + 100: INVALID_DECISION,
+            },
+        )
+        self.assertEqual(openings, 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.number_of_workers, 0)
+        self.assertEqual(
+            set(self.job.acceptor.values_list("id", flat=True)), {first, second}
+        )
+        self.assertEqual(
+            dict(
+                JobApplication.objects.filter(job=self.job).values_list(
+                    "worker_id", STATUS
+                )
+            ),
+            {
+                first: ACCEPTED,
+                second: ACCEPTED,
+                third: APPLIED,
+                rejected: REJECTED,
+                withdrawn: WITHDRAWN,
+            },
+        )
+        # the job runs 30 January to 1 February, both months are booked
+        self.assertEqual(
+            WorkerAvailability.objects.filter(worker_id__in=[first, second]).count(),
+            4,
+        )
+
+    def test_query_count_does_not_grow_with_the_workers(self):
+        self.job.number_of_workers = 5
+        self.job.save()
+        with CaptureQueriesContext(connection) as two:
+            decide(
+                self.job.id,
+                [
+                    {WORKER_ID: worker_id, DECISION: ACCEPTED}
+                    for worker_id in self.ids(0, 1)
+                ],
+                self.owner.id,
+            )
+        with CaptureQueriesContext(connection) as three:
+            decide(
+                self.job.id,
+                [
+                    {WORKER_ID: worker_id, DECISION: ACCEPTED}
+                    for worker_id in self.ids(2, 3, 4)
+                ],
+                self.owner.id,
+            )
+        self.assertEqual(len(two), len(three))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.number_of_workers, 0)
+
+    def test_only_the_requestor_decides(self):
+        with self.assertRaises(Job.DoesNotExist):
+            decide(
+                self.job.id,
+                [{WORKER_ID: self.workers[0].id, DECISION: ACCEPTED}],
+                self.workers[5].id,
+            )
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.number_of_workers, 2)
+        self.assertFalse(self.job.acceptor.exists())
+
+
+class ApplyTestCase(TestCase):
+    """
+    Applying to live, open jobs with openings left
+    """
+
+    def setUp(self):
+        self.worker = make_user(1)
+        self.job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=1,
+            work_pay=500,
+            requestor=make_user(0),
+        )
+
+    def assertRefused(self, message):
+        with self.assertRaises(DataNotExist) as refused:
+            apply(self.job.id, self.worker.id)
+        self.assertEqual(str(refused.exception), message)
+
+    def test_apply_once(self):
+        self.assertTrue(apply(self.job.id, self.worker.id))
+        self.assertFalse(apply(self.job.id, self.worker.id))
+        self.assertEqual(JobApplication.objects.get(job=self.job).status, APPLIED)
+
+    def test_closed_job(self):
+        Job.objects.filter(id=self.job.id).update(job_status=CLOSED)
+        self.assertRefused(JOB_CLOSED)
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_job_without_openings(self):
+        Job.objects.filter(id=self.job.id).update(number_of_workers=0)
+        self.assertRefused(NO_OPENINGS)
+
+    def test_withdrawn_application_is_not_reopened_on_a_closed_job(self):
+        apply(self.job.id, self.worker.id)
+        JobApplication.objects.update(status=WITHDRAWN)
+        Job.objects.filter(id=self.job.id).update(job_status=CLOSED)
+        self.assertRefused(JOB_CLOSED)
+        self.assertEqual(JobApplication.objects.get(job=self.job).status, WITHDRAWN)
+        Job.objects.filter(id=self.job.id).update(job_status=OPEN)
+        self.assertTrue(apply(self.job.id, self.worker.id))
+
+    def test_missing_job(self):
+        self.job.delete()
+        with self.assertRaises(Job.DoesNotExist):
+            apply(self.job.id, self.worker.id)
+
+
+class AcceptTestCase(TestCase):
+    """
+    Accepting an applicant takes one opening of the requestor's job
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.worker = make_user(1)
+        self.job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=2,
+            work_pay=500,
+            requestor=self.owner,
+        )
+        JobApplication.objects.create(job=self.job, worker=self.worker)
+
+    def openings(self):
+        self.job.refresh_from_db()
+        return self.job.number_of_workers
+
+    def test_accept_books_the_worker(self):
+        self.assertEqual(accept(self.job.id, self.worker.id, self.owner.id), 0)
+        self.assertEqual(JobApplication.objects.get(job=self.job).status, ACCEPTED)
+        self.assertEqual(list(self.job.acceptor.all()), [self.worker])
+        self.assertTrue(WorkerAvailability.objects.filter(worker=self.worker).exists())
+        with self.assertRaises(DataNotExist) as refused:
+            accept(self.job.id, self.worker.id, self.owner.id)
+        self.assertEqual(str(refused.exception), NO_OPENINGS)
+
+    def test_refused_accept_keeps_the_opening(self):
+        with self.assertRaises(Job.DoesNotExist):
+            accept(self.job.id, self.worker.id, self.worker.id)
+        with self.assertRaises(DataNotExist):
+            accept(self.job.id, make_user(2).id, self.owner.id)
+        self.job.acceptor.add(self.worker)
+        with self.assertRaises(DataAlreadyExist):
+            accept(self.job.id, self.worker.id, self.owner.id)
+        self.assertEqual(self.openings(), 1)
+        self.assertEqual(JobApplication.objects.get(job=self.job).status, APPLIED)
+
+
+class PostJobTestCase(TestCase):
+    """
+    One live job per requestor and day, guarded by the database
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.owner.role.add(Role.objects.create(name="House Owner"))
+        WorkType.objects.create(name="Mason")
+        self.address = Address.objects.create(
+            city="Chennai",
+            landmark="landmark",
+            district="Chennai",
+            state="Tamil Nadu",
+            pincode=600001,
+            module=AddressType.objects.create(address_type="User Address"),
+            module_field_id=self.owner.id,
+        )
+        self.work_date = datetime.date.today() + datetime.timedelta(days=10)
+        patcher = mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(self.owner, None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, work_date):
+        return APIClient().post(
+            "/api/v1/civil-service-management/job/",
+            {
+                WORK_TYPE: "Mason",
+                ADDRESS: self.address.id,
+                "requestor": self.owner.id,
+                "number_of_workers": 2,
+                "work_date": work_date.isoformat(),
+                "working_days": 2,
+                "work_pay": 500,
+            },
+            format="json",
+        )
+
+    def test_second_job_on_the_same_day_is_refused(self):
+        self.assertEqual(self.post(self.work_date).status_code, 201)
+        response = self.post(self.work_date)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(
+            response.data["error"]["details"]["detail"], JOB_ALREADY_POSTED
+        )
+        self.assertEqual(Job.objects.count(), 1)
+        next_day = self.work_date + datetime.timedelta(days=1)
+        self.assertEqual(self.post(next_day).status_code, 201)
+
+    def test_deleted_job_frees_its_day(self):
+        self.assertEqual(self.post(self.work_date).status_code, 201)
+        Job.objects.filter(requestor=self.owner).soft_delete()
+        self.assertEqual(self.post(self.work_date).status_code, 201)
+        self.assertEqual(Job.all_objects.filter(work_date=self.work_date).count(), 2)
+
+
+class PeriodTestCase(TestCase):
+    """
+    Jobs found by the days of their work period
+    """
+
+    def setUp(self):
+        owner = make_user(0)
+        work_type = WorkType.objects.create(name="Mason")
+        self.jobs = {
+            name: Job.objects.create(
+                work_type=work_type,
+                number_of_workers=1,
+                work_date=datetime.date(2030, 1, day),
+                working_days=days,
+                work_pay=500,
+                requestor=owner,
+            )
+            for name, day, days in (("first", 1, 3), ("fifth", 5, 1), ("third", 3, 5))
+        }
+
+    def found(self, params):
+        jobs = Job.objects.filter(period_condition(params))
+        return {
+            name for name, job in self.jobs.items() if jobs.filter(id=job.id).exists()
+        }
+
+    def test_period_searches(self):
+        self.assertEqual(self.found({ACTIVE_ON: "2030-01-03"}), {"first", "third"})
+        self.assertEqual(self.found({ACTIVE_ON: "2030-01-04"}), {"third"})
+        self.assertEqual(
+            self.found({PERIOD_FROM: "2030-01-04", PERIOD_TO: "2030-01-05"}),
+            {"fifth", "third"},
+        )
+        self.assertEqual(self.found({PERIOD_TO: "2030-01-02"}), {"first"})
+        self.assertEqual(
+            self.found(
+                {PERIOD_FROM: "2030-01-03", PERIOD_TO: "2030-01-07", WITHIN: "true"}
+            ),
+            {"fifth", "third"},
+        )
+        self.assertIsNone(period_condition({}))
+        for params in (
+            {ACTIVE_ON: "soon"},
+            {PERIOD_FROM: "2030-01-05", PERIOD_TO: "2030-01-04"},
+        ):
+            with self.assertRaises(DataNotExist):
+                period_condition(params)
+
+    def test_period_follows_the_working_days(self):
+        job = self.jobs["fifth"]
+        job.working_days = 4
+        job.save(update_fields=["working_days"])
+        self.assertEqual(self.found({ACTIVE_ON: "2030-01-08"}), {"fifth"})
+
+
+class SweepTestCase(TestCase):
+    """
+    Jobs whose work period has ended are closed in batches
+    """
+
+    def test_expired_jobs_are_closed(self):
+        owner, worker = make_user(0), make_user(1)
+        work_type = WorkType.objects.create(name="Mason")
+        today = datetime.date.today()
+        jobs = [
+            Job.objects.create(
+                work_type=work_type,
+                number_of_workers=1,
+                work_date=today + datetime.timedelta(days=offset),
+                working_days=2,
+                work_pay=500,
+                requestor=owner,
+            )
+            for offset in (-10, -5, -3, -2, -1, 0)
+        ]
+        expired, running = jobs[:4], jobs[4:]
+        for job in jobs:
+            job.acceptor.add(worker)
+            mark_busy([worker.id], job.work_date, job.working_days)
+            WorkerFeedEntry.objects.create(
+                worker=worker, job=job, created_at=job.created_at
+            )
+
+        call_command("sweep_expired_jobs", batch_size=3, pause=0, stdout=StringIO())
+
+        closed = set(Job.objects.filter(job_status=CLOSED).values_list("id", flat=True))
+        self.assertEqual(closed, {job.id for job in expired})
+        hidden = SearchDocument.objects.filter(entity_type="job", is_deleted=True)
+        self.assertEqual(set(hidden.values_list("entity_id", flat=True)), closed)
+        self.assertEqual(
+            set(WorkerFeedEntry.objects.values_list("job_id", flat=True)),
+            {job.id for job in running},
+        )
+        # the days of the running jobs stay booked, the others are freed
+        busy = WorkerAvailability.objects.filter(worker=worker).exclude(busy_days=0)
+        booked = {
+            month + datetime.timedelta(days=day)
+            for month, days in busy.values_list("month", "busy_days")
+            for day in range(31)
+            if days >> day & 1
+        }
+        self.assertEqual(
+            booked, {today + datetime.timedelta(days=offset) for offset in (-1, 0, 1)}
+        )
+
+
+def in_thread(function):
+    """
+    Run function in a transaction on another connection, the transaction is
+    held open until the returned event is set
+    :return: the event, the thread and a dict receiving the result
+    """
+    done, finish, result = threading.Event(), threading.Event(), {}
+
+    def run():
+        try:
+            with transaction.atomic():
+                result["value"] = function()
+                done.set()
+                finish.wait(10)
+        finally:
+            done.set()
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return done, finish, thread, result
+
+
+class DecisionRaceTestCase(TransactionTestCase):
+    """
+    Bulk decisions and withdrawals of the same applications from concurrent
+    connections
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.worker = make_user(1)
+        self.job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=2,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=3,
+            work_pay=500,
+            requestor=self.owner,
+        )
+        JobApplication.objects.create(job=self.job, worker=self.worker)
+
+    def accept_all(self):
+        return decide(
+            self.job.id,
+            [{WORKER_ID: self.worker.id, DECISION: ACCEPTED}],
+            self.owner.id,
+        )
+
+    def assertBlocked(self, done):
+        self.assertFalse(done.wait(0.5))
+
+    def test_withdraw_waits_for_a_decision_and_undoes_it(self):
+        decided, finish, decider, result = in_thread(self.accept_all)
+        self.assertTrue(decided.wait(10))
+        withdrawn, end, withdrawer, gave_up = in_thread(
+            lambda: withdraw(self.job.id, self.worker.id)
+        )
+        end.set()
+        self.assertBlocked(withdrawn)
+        finish.set()
+        decider.join()
+        withdrawer.join()
+        self.assertEqual(result["value"], ({self.worker.id: ACCEPTED}, 1))
+        self.assertTrue(gave_up["value"])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.number_of_workers, 2)
+        self.assertFalse(self.job.acceptor.exists())
+        self.assertEqual(
+            JobApplication.objects.get(worker=self.worker).status, WITHDRAWN
+        )
+        self.assertFalse(
+            WorkerAvailability.objects.filter(worker=self.worker)
+            .exclude(busy_days=0)
+            .exists()
+        )
+
+    def test_decision_waits_for_a_withdrawal_and_skips_it(self):
+        withdrawn, finish, withdrawer, _ = in_thread(
+            lambda: withdraw(self.job.id, self.worker.id)
+        )
+        self.assertTrue(withdrawn.wait(10))
+        decided, end, decider, result = in_thread(self.accept_all)
+        end.set()
+        self.assertBlocked(decided)
+        finish.set()
+        withdrawer.join()
+        decider.join()
+        self.assertEqual(result["value"], ({self.worker.id: APPLICATION_NOT_EXIST}, 2))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.number_of_workers, 2)
+        self.assertFalse(self.job.acceptor.exists())
+        self.assertFalse(WorkerAvailability.objects.exists())
+
+
+class AcceptRaceTestCase(TransactionTestCase):
+    """
+    Concurrent acceptors of the same job never fill it past its openings
+    """
+
+    def test_concurrent_accepts_take_each_opening_once(self):
+        owner = make_user(0)
+        job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=3,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=1,
+            work_pay=500,
+            requestor=owner,
+        )
+        workers = [make_user(number) for number in range(1, 11)]
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, worker=worker) for worker in workers
+        )
+
+        def run(worker):
+            try:
+                return accept(job.id, worker.id, owner.id) >= 0
+            except DataNotExist:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+            self.assertEqual(sum(pool.map(run, workers)), 3)
+        job.refresh_from_db()
+        self.assertEqual(job.number_of_workers, 0)
+        self.assertEqual(job.acceptor.count(), 3)
+        self.assertEqual(
+            JobApplication.objects.filter(job=job, status=ACCEPTED).count(), 3
+        )
+
+
+class SyncTestCase(TransactionTestCase):
+    """
+    Pulls of the job changes from a cursor while other connections write
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.work_type = WorkType.objects.create(name="Mason")
+        self.jobs = [self.make_job(day) for day in range(1, 6)]
+        # rows stamped a moment ago count as settled, no pull waits for the clock
+        patcher = mock.patch("sync.SYNC_LAG", datetime.timedelta(0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_job(self, day):
+        return Job.objects.create(
+            work_type=self.work_type,
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, day),
+            working_days=1,
+            work_pay=500,
+            requestor=self.owner,
+        )
+
+    def pull(self, since=None, page_size=2):
+        params = {"page_size": page_size}
+        if since:
+            params["since"] = since
+        request = Request(APIRequestFactory().get("/", params))
+        return changes_response(
+            request, Job.all_objects.all(), JobChangeSerializer
+        ).data
+
+    def pull_all(self, since=None):
+        """
+        :return: ids of the changed jobs, ids of the deleted ones, next cursor
+        """
+        changed, deleted = [], []
+        while True:
+            page = self.pull(since)
+            changed += [job["id"] for job in page[CHANGED]]
+            deleted += page[DELETED]
+            since = page[CURSOR]
+            if not page[HAS_MORE]:
+                return changed, deleted, since
+
+    def test_pages_cover_every_change_once(self):
+        changed, deleted, cursor = self.pull_all()
+        self.assertEqual(changed, [job.id for job in self.jobs])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.pull_all(cursor), ([], [], cursor))
+
+        Job.objects.filter(id=self.jobs[1].id).soft_delete()
+        self.jobs[3].work_pay = 600
+        self.jobs[3].save()
+        changed, deleted, cursor = self.pull_all(cursor)
+        self.assertEqual(changed, [self.jobs[3].id])
+        self.assertEqual(deleted, [self.jobs[1].id])
+
+    def test_open_transaction_holds_the_cursor_back(self):
+        *_, cursor = self.pull_all()
+        slow = self.jobs[0]
+        saved, finish, thread, _ = in_thread(slow.save)
+        self.assertTrue(saved.wait(10))
+        fast = self.make_job(6)
+        # the fast job is committed but stamped after the slow one started,
+        # passing it would move the cursor past the slow job for good
+        self.assertEqual(self.pull_all(cursor), ([], [], cursor))
+        finish.set()
+        thread.join()
+        changed, _, _ = self.pull_all(cursor)
+        self.assertEqual(changed, [slow.id, fast.id])
+
+    def test_hold_is_bounded(self):
+        hold = datetime.timedelta(milliseconds=200)
+        done, finish, thread, _ = in_thread(lambda: Job.objects.count())
+        self.assertTrue(done.wait(10))
+        try:
+            with mock.patch("sync.MAX_SYNC_HOLD", hold):
+                held = settled_before()
+                time.sleep(hold.total_seconds() * 2)
+                self.assertGreater(settled_before(), held + hold)
+        finally:
+            finish.set()
+            thread.join()
+
+
+class EventStreamTestCase(TransactionTestCase):
+    """
+    Application events pushed to the requestor over the ASGI event stream
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.worker = make_user(1)
+        self.job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=1,
+            work_pay=500,
+            requestor=self.owner,
+        )
+
+    def communicator(self):
+        from my_civil_service_project.asgi import application
+
+        return ApplicationCommunicator(
+            application,
+            {
+                "type": "http",
+                "method": "GET",
+                "path": EVENTS_PATH,
+                "query_string": b"",
+                "headers": [(b"host", b"localhost")],
+            },
+        )
+
+    def test_requestor_receives_the_application(self):
+        async def run():
+            communicator = self.communicator()
+            await communicator.send_input({"type": "http.request"})
+            start = await communicator.receive_output(10)
+            await sync_to_async(apply)(self.job.id, self.worker.id)
+            message = await communicator.receive_output(10)
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(10)
+            return start, message
+
+        with mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(self.owner, None)
+        ):
+            start, message = async_to_sync(run)()
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        event, data = message["body"].decode().strip().split("\n")
+        self.assertEqual(event, f"event: {APPLIED}")
+        self.assertEqual(
+            json.loads(data[len("data: ") :]),
+            {EVENT: APPLIED, JOB_ID: self.job.id, WORKER_ID: self.worker.id},
+        )
+
+    def test_signed_out_stream_is_refused(self):
+        async def run():
+            communicator = self.communicator()
+            await communicator.send_input({"type": "http.request"})
+            return await communicator.receive_output(10)
+
+        with mock.patch.object(
+            SafeJWTAuthentication,
+            "authenticate",
+            side_effect=AuthenticationFailed("expired"),
+        ):
+            start = async_to_sync(run)()
+        self.assertEqual(start["status"], 401)
@@ -2,7 +2,18 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import DeleteJob, JobViewSets, RejectOffer, SearchOfferedJobs
+from .views import (
+    AcceptOffer,
+    ApplyOffer,
+    DecideOffers,
+    DeleteJob,
+    JobChanges,
+    JobViewSets,
+    RejectOffer,
+    SearchOfferedJobs,
+    ViewRequest,
+    WithdrawOffer,
+)
 
 router = DefaultRouter()
 router.register("api/v1/civil-service-management/job", JobViewSets)
@@ -11,6 +22,20 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include(router.urls)),
     path("api/v1/civil-service-management/job/backup/<int:pk>", DeleteJob.as_view()),
+    path("api/v1/civil-service-management/job/apply/<int:pk>/", ApplyOffer.as_view()),
+    path(
+        "api/v1/civil-service-management/job/withdraw/<int:pk>/",
+        WithdrawOffer.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/job/requests/<int:pk>/",
+        ViewRequest.as_view(),
+    ),
+    path("api/v1/civil-service-management/job/accept/<int:pk>/", AcceptOffer.as_view()),
     path("api/v1/civil-service-management/job/reject/<int:pk>/", RejectOffer.as_view()),
+    path(
+        "api/v1/civil-service-management/job/decide/<int:pk>/", DecideOffers.as_view()
+    ),
     path("api/v1/civil-service-management/job/search", SearchOfferedJobs.as_view()),
+    path("api/v1/civil-service-management/job/changes", JobChanges.as_view()),
 ]
@@ -1,20 +1,34 @@
 from address.models import Address
 from address.serializers import UserAddressResponseSerializer
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from my_exceptions import DataAlreadyExist, DataNotExist
+from pagination import paginated_response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from search.constants import ENTITY_ID, JOB
+from search.documents import live_documents, paginated_documents
+from search.facets import job_facets, with_facets
+from sync import changes_response
 from user.authentication import SafeJWTAuthentication
 from user.models import Role, User
-from user.permissions import IsHouseOwner
+from user.permissions import IsHouseOwner, IsWorker
 
+from . import applications
 from .constants import *
-from .models import Job, WorkType
+from .models import Job, JobApplication, WorkType
 from .my_logger import logger
-from .serializers import JobResponseSerializer, JobSerializer
+from .periods import period_condition
+from .serializers import (
+    JobApplicationSerializer,
+    JobChangeSerializer,
+    JobResponseSerializer,
+    JobSerializer,
+)
 
 
 class JobViewSets(ModelViewSet):
@@ -25,7 +39,7 @@ class JobViewSets(ModelViewSet):
     Also, this class manage the all crud requests from end job.
     """
 
-    queryset = Job.objects.filter(is_deleted=False)
+    queryset = Job.objects.all()
     serializer_class = JobSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsHouseOwner,)
@@ -44,20 +58,23 @@ class JobViewSets(ModelViewSet):
             request.data[WORK_TYPE] = WorkType.objects.get(
                 name=request.data[WORK_TYPE]
             ).id
-            address = Address.objects.get(is_deleted=False, id=request.data[ADDRESS])
-            job = Job.objects.filter(
-                work_date=request.data[WORK_DATE], requestor=request.data["requestor"]
-            )
-
-            if not job:
-                serializer = self.get_serializer(data=request.data)
-                serializer.is_valid(raise_exception=True)
-                created_by = User.objects.get(id=address.module_field_id)
-                serializer.save(created_by=created_by, updated_by=created_by)
-                logger.info(CREATED_SUCCESS, status.HTTP_201_CREATED)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            else:
+            address = Address.objects.get(id=request.data[ADDRESS])
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            created_by = User.objects.get(id=address.module_field_id)
+            try:
+                with transaction.atomic():
+                    serializer.save(created_by=created_by, updated_by=created_by)
+            except IntegrityError as e:
+                # one live job per requestor and day, enforced by the database
+                diag = getattr(e.__cause__, "diag", None)
+                if getattr(diag, "constraint_name", None) != UNIQUE_LIVE_JOB:
+                    raise
                 raise DataAlreadyExist(JOB_ALREADY_POSTED)
+            logger.info(CREATED_SUCCESS, status.HTTP_201_CREATED)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        except DataAlreadyExist:
+            raise
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -74,7 +91,7 @@ class JobViewSets(ModelViewSet):
         try:
             instance = self.get_object()
             serializer = JobResponseSerializer(instance)
-            address = Address.objects.get(is_deleted=False, pk=instance.address.id)
+            address = Address.objects.get(pk=instance.address.id)
             address_serializer = UserAddressResponseSerializer(address)
             result = serializer.data
             result.__setitem__(ADDRESS, address_serializer.data)
@@ -86,24 +103,22 @@ class JobViewSets(ModelViewSet):
     def list(self, request, *args, **kwargs):
         """
         This method overrides the default list method in viewSet
-        Added some fields like Updated by this who crates this object
+        Added some fields like Updated by this who crates this object,
+        closed jobs are left out of the list
         :param request: put request for list the job
         :return: if request was success returns response object of the job with status code
                  else return error message with status code
         """
         try:
-            queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(JOB_NOT_EXIST)
+            queryset = self.filter_queryset(self.get_queryset()).exclude(
+                job_status=CLOSED
+            )
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(JOB_NOT_EXIST)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -123,7 +138,7 @@ class JobViewSets(ModelViewSet):
             request.data[WORK_TYPE] = WorkType.objects.get(
                 name=request.data[WORK_TYPE]
             ).id
-            instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
+            instance.updated_by = User.objects.get(id=updated_by)
             serializer = self.get_serializer(instance, data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
@@ -134,102 +149,198 @@ class JobViewSets(ModelViewSet):
 
 
 class ApplyOffer(APIView):
+    """
+    Api view class for a worker to apply for a job
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsWorker,)
+
     @staticmethod
-    def post(request):
+    def post(request, pk):
         """
         This is the method to save the workers for the job applied
-        :param request: post request with job id and user id
+        :param request: post request from the applying worker
+        :param pk: id of the job
         :return: return success message when job applied successfully.
         """
         try:
-            if job_request[request.data["job_id"]]:
-                job_request[request.data["job_id"]] = [request.data["user_id"]]
-            else:
-                job_request[request.data["job_id"]].append(request.data["user_id"])
+            if applications.apply(pk, request.user.id):
+                logger.info(APPLIED_SUCCESS)
+                return Response(
+                    {DETAIL: APPLIED_SUCCESS}, status=status.HTTP_201_CREATED
+                )
+            logger.info(ALREADY_APPLIED)
+            return Response({DETAIL: ALREADY_APPLIED}, status=status.HTTP_200_OK)
+        except Job.DoesNotExist:
+            logger.error(JOB_NOT_EXIST)
+            return Response({DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
-            return Response(
-                {
-                    DETAIL: "Successfully Applied",
-                    "status": 200,
-                    "timestamp": datetime.datetime.now(),
-                }
-            )
+
+class WithdrawOffer(APIView):
+    """
+    Api view class for a worker to withdraw a job application
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsWorker,)
+
+    @staticmethod
+    def put(request, pk):
+        """
+        This is the method to withdraw the application of the worker
+        :param request: put request from the applied worker
+        :param pk: id of the job
+        :return: if request was success returns success message
+                 else return error message with status code
+        """
+        try:
+            if not applications.withdraw(pk, request.user.id):
+                raise DataNotExist(APPLICATION_NOT_EXIST)
+            logger.info(WITHDRAWN_SUCCESS)
+            return Response({DETAIL: WITHDRAWN_SUCCESS}, status=status.HTTP_200_OK)
         except Exception as e:
-            return Response(
-                {
-                    DETAIL: e.__str__(),
-                    "status": 400,
-                    "timestamp": datetime.datetime.now(),
-                }
-            )
+            raise DataNotExist(e.__str__())
 
 
 class ViewRequest(APIView):
+    """
+    Api view class for list the workers applied for a job
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
     @staticmethod
-    def get(request):
+    def get(request, pk):
         """
         This is used to view the list of workers who applied job
-        :param request: get request for view applied workers
-        :return: if request was success returns response object of the job with status code
+        :param request: get request for view applied workers, the `status`
+                        query parameter selects other than applied workers
+        :param pk: id of the job
+        :return: if request was success returns a page of applications
                  else return error message with status code
         """
         try:
-            if job_request[request.data["job_id"]]:
-                return Response({DETAIL: job_request[request.data["job_id"]]})
-            else:
+            if not applications.owned_job(pk, request.user.id):
+                logger.error(JOB_NOT_EXIST)
                 return Response(
-                    {
-                        DETAIL: "No one applied",
-                        "status": 200,
-                        "timestamp": datetime.datetime.now(),
-                    }
+                    {DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND
                 )
-        except Exception as e:
-            return Response(
-                {
-                    DETAIL: e.__str__(),
-                    "status": 400,
-                    "timestamp": datetime.datetime.now(),
-                }
+            application_status = request.query_params.get(STATUS, APPLIED)
+            queryset = JobApplication.objects.filter(
+                job_id=pk, status=application_status
+            ).select_related(WORKER_ID)
+            response = paginated_response(
+                request, queryset, JobApplicationSerializer, NO_ONE_APPLIED
             )
+            logger.info(RETRIEVED_SUCCESS)
+            return response
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
 
 class AcceptOffer(APIView):
+    """
+    Api view class for accept a worker applied for a job
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
     @staticmethod
-    def put(request, **kwargs):
+    def put(request, pk):
         """
         This is the method to accept the request
-        :param request: put request for accept job request
-        :return: if request was success returns response object of the job with status code
+        :param request: put request with the `worker` id to accept
+        :param pk: id of the job
+        :return: if request was success returns the openings left with status code
                  else return error message with status code
         """
         try:
-            updated_by = request.headers.get(USER_ID)
-            instance = Job.objects.get(is_deleted=False, id=kwargs["pk"])
-            instance.acceptor.append(request.data[ID])
-            instance.no_of_workers = instance.number_of_workers - 1
-            instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
-            Job.save(instance)
-            logger.info(UPDATED_SUCCESS, status.HTTP_200_OK)
-            return Response({DETAIL: instance.number_of_workers})
+            openings = applications.accept(pk, request.data[WORKER_ID], request.user.id)
+            logger.info(ACCEPTED_SUCCESS)
+            return Response(
+                {DETAIL: ACCEPTED_SUCCESS, OPENINGS: openings},
+                status=status.HTTP_200_OK,
+            )
+        except Job.DoesNotExist:
+            logger.error(JOB_NOT_EXIST)
+            return Response({DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
 
 class RejectOffer(APIView):
+    """
+    Api view class for reject a worker applied for a job
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
     @staticmethod
-    def put(request, **kwargs):
+    def put(request, pk):
         """
         This is the method to reject the request
-        :param request: put request for reject job request
+        :param request: put request with the `worker` id to reject
+        :param pk: id of the job
         :return: if request was success returns response object of the job with status code
                  else return error message with status code
         """
         try:
-            job_request.get(request.data["job_id"]).pop(request.data[user_id])
+            if not applications.owned_job(pk, request.user.id):
+                logger.error(JOB_NOT_EXIST)
+                return Response(
+                    {DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND
+                )
+            if not applications.change_status(pk, request.data[WORKER_ID], REJECTED):
+                raise DataNotExist(APPLICATION_NOT_EXIST)
+            logger.info(REJECTED_SUCCESS)
+            return Response({DETAIL: REJECTED_SUCCESS}, status=status.HTTP_200_OK)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class DecideOffers(APIView):
+    """
+    Api view class for accept and reject many workers applied for a job at once
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
+    @staticmethod
+    def put(request, pk):
+        """
+        This is the method to accept and reject many requests in one transaction
+        :param request: put request with `decisions`, a list of {worker, decision}
+        :param pk: id of the job
+        :return: if request was success returns the outcome of every worker
+                 and the openings left with status code
+                 else return error message with status code
+        """
+        try:
+            outcomes, openings = applications.decide(
+                pk, request.data[DECISIONS], request.user.id
+            )
+            logger.info(DECIDED_SUCCESS)
             return Response(
-                {DETAIL: "Rejected successfully"}, status=status.HTTP_200_OK
+                {
+                    DETAIL: DECIDED_SUCCESS,
+                    OPENINGS: openings,
+                    OUTCOMES: [
+                        {WORKER_ID: worker_id, STATUS: outcome}
+                        for worker_id, outcome in outcomes.items()
+                    ],
+                },
+                status=status.HTTP_200_OK,
             )
+        except Job.DoesNotExist:
+            logger.error(JOB_NOT_EXIST)
+            return Response({DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -253,11 +364,7 @@ class DeleteJob(APIView):
                  else return error message with status code
         """
         try:
-            job = Job.objects.get(pk=pk)
-
-            if not job.is_deleted:
-                job.is_deleted = True
-                Job.save(job)
+            if Job.objects.filter(pk=pk).soft_delete():
                 logger.info(DELETED_SUCCESS)
                 return Response({DETAIL: DELETED_SUCCESS})
             else:
@@ -281,52 +388,48 @@ class SearchOfferedJobs(APIView):
     def get(request):
         """
         we retrieve all jobs matches for the requested fields
-        :param request: get request with fields
+        :param request: get request with fields, the `active_on`, `from`, `to`
+                        and `within` query parameters filter the work period
         :return: list of jobs
         """
         try:
             if request.data:
-                jobs = {}
+                job_documents = live_documents(JOB)
+                documents = None
                 if WORK_TYPE in request.data and len(request.data) == 1:
                     work_type = request.data[WORK_TYPE]
                     try:
                         work = WorkType.objects.get(name=work_type)
                     except Exception as e:
                         raise DataNotExist(e.__str__())
-                    jobs = Job.objects.filter(is_deleted=False, work_type=work.id)
+                    documents = job_documents.filter(work_type=work.id)
 
                 elif DAYS in request.data and len(request.data) == 1:
                     days = request.data[DAYS]
-                    jobs = Job.objects.filter(is_deleted=False, working_days__lte=days)
+                    documents = job_documents.filter(working_days__lte=days)
 
                 elif PAY in request.data and len(request.data) == 1:
                     pay = request.data[PAY]
-                    jobs = Job.objects.filter(is_deleted=False, work_pay__gte=pay)
+                    documents = job_documents.filter(amount__gte=pay)
 
                 elif WORK_DATE in request.data and len(request.data) == 1:
                     date = request.data[WORK_DATE]
-                    jobs = Job.objects.filter(is_deleted=False, work_date=date)
+                    documents = job_documents.filter(work_date=date)
 
                 elif WORK_DATE and PAY in request.data and len(request.data) == 2:
                     days = request.data[DAYS]
                     pay = request.data[PAY]
-                    jobs = Job.objects.filter(
-                        is_deleted=False, working_days=days, work_pay=pay
-                    )
+                    documents = job_documents.filter(working_days=days, amount=pay)
 
                 elif WORK_TYPE and WORK_DATE in request.data and len(request.data) == 2:
                     date = request.data[WORK_DATE]
                     pay = request.data[PAY]
-                    jobs = Job.objects.filter(
-                        is_deleted=False, work_date=date, work_pay=pay
-                    )
+                    documents = job_documents.filter(work_date=date, amount=pay)
 
                 elif WORK_DATE and DAYS in request.data and len(request.data) == 2:
                     date = request.data[WORK_DATE]
                     days = request.data[DAYS]
-                    jobs = Job.objects.filter(
-                        is_deleted=False, work_date=date, working_days=days
-                    )
+                    documents = job_documents.filter(work_date=date, working_days=days)
 
                 elif (
                     DAYS
@@ -337,40 +440,50 @@ class SearchOfferedJobs(APIView):
                     date = request.data[WORK_DATE]
                     pay = request.data[PAY]
                     days = request.data[DAYS]
-                    jobs = Job.objects.filter(
-                        is_deleted=False,
+                    documents = job_documents.filter(
                         work_date=date,
                         working_days=days,
-                        work_pay=pay,
+                        amount=pay,
                     )
 
-                if not jobs:
+                if documents is None:
                     raise DataNotExist(DATA_NOT_FOUND)
-
-                page = Job.paginate_queryset(jobs)
-                if page is not None:
-                    serializer = JobSerializer(page, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Job.get_paginated_response(serializer.data)
-
-                serializer = JobSerializer(jobs, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data, status=status.HTTP_200_OK)
-
             else:
-                queryset = Job.objects.filter(is_deleted=False)
-                if queryset:
-                    page = self.paginate_queryset(queryset)
+                documents = live_documents(JOB)
+            period = period_condition(request.query_params)
+            if period is not None:
+                documents = documents.filter(
+                    Exists(Job.objects.filter(period, id=OuterRef(ENTITY_ID)))
+                )
+            response = paginated_documents(
+                request, documents, Job.objects, JobSerializer, DATA_NOT_FOUND
+            )
+            logger.info(RETRIEVED_SUCCESS)
+            return with_facets(request, response, documents, job_facets)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
-                    if page is not None:
-                        serializer = Job.get_serializer(page, many=True)
-                        logger.info()
-                        return Job.get_paginated_response(serializer.data)
 
-                    serializer = Job.get_serializer(queryset, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(serializer.data)
+class JobChanges(APIView):
+    """
+    Api view class for the job changes of a client side cache
+    """
 
-                raise DataNotExist(JOB_NOT_EXIST)
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        jobs created, updated or deleted since the cursor, oldest first
+        :param request: get request with the `since` cursor of the last pull
+        :return: changed jobs, ids of the deleted ones and the next cursor
+        """
+        try:
+            response = changes_response(
+                request, Job.all_objects.all(), JobChangeSerializer
+            )
+            logger.info(CHANGES_RETRIEVED)
+            return response
         except Exception as e:
             raise DataNotExist(e.__str__())
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MaterialStockConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "material_stock"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,52 @@
+from django.db import connection
+from psycopg2.extras import execute_values
+
+from .constants import *
+from .models import Product
+
+INSERT_SQL = f"""
+    INSERT INTO {PRODUCT} (type_id, name, brand, created_at) VALUES %s
+    ON CONFLICT (type_id, name, brand) DO NOTHING
+"""
+SELECT_SQL = f"""
+    SELECT product.id, product.type_id, product.name, product.brand
+    FROM {PRODUCT} AS product
+    JOIN (VALUES %s) AS wanted (type_id, name, brand)
+        ON product.type_id = wanted.type_id AND product.name = wanted.name
+        AND product.brand = wanted.brand
+"""
+
+
+def normalize(value):
+    """
+    Spelling of a name or brand in the catalog, inner runs of whitespace
+    collapsed so "OPC  53 " and "OPC 53" are the same product
+    """
+    return " ".join(str(value).split())
+
+
+def product_for(type_id, name, brand):
+    """
+    The catalog product of a type, name and brand, added when new
+    :return: Product object
+    """
+    product, _ = Product.objects.get_or_create(
+        type_id=type_id, name=normalize(name), brand=normalize(brand)
+    )
+    return product
+
+
+def resolve(keys):
+    """
+    Match many items to catalog products, one insert adds the new ones and
+    one join reads back the ids of all of them
+    :param keys: iterable of normalized (type id, name, brand)
+    :return: dict of (type id, name, brand) -> product id
+    """
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    with connection.cursor() as cursor:
+        execute_values(cursor, INSERT_SQL, keys, template="(%s, %s, %s, now())")
+        rows = execute_values(cursor, SELECT_SQL, keys, fetch=True)
+    return {(type_id, name, brand): pk for pk, type_id, name, brand in rows}
@@ -33,3 +33,84 @@ MATERIAL = "material"
 CREATE_MATERIAL_STOCK = "create_material_stock"
 UPDATE_MATERIAL_STOCK = "update_material_stock"
 MATERIALSTOCKS = "materialstocks"
+MATERIAL_STOCK_NOT_EXIST = "Material stock does not exist"
+STOCK = "stock"
+RATE = "rate"
+ROW = "row"
+ERRORS = "errors"
+CREATED = "created"
+UPDATED = "updated"
+CSV_CONTENT_TYPE = "text/csv"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+INVALID_IMPORT = "Send a CSV, NDJSON or JSON array of material stocks"
+INVALID_TYPE = "Type must be the name of a shop type."
+IMPORTED_SUCCESS = "Material stocks imported successfully"
+UNIQUE_LIVE_MATERIAL = "unique_live_material_stock"
+INVALID_ROW = "Row must be an object of material stock fields"
+QUANTITY = "quantity"
+UNIT = "unit"
+IN_STOCK = "in_stock"
+MIN_QUANTITY = "min_quantity"
+ORDERING = "ordering"
+QUANTITY_ORDERINGS = {"quantity": False, "-quantity": True}
+INVALID_QUANTITY = "min_quantity must be a number"
+HELD = "held"
+COMMITTED = "committed"
+RELEASED = "released"
+EXPIRED = "expired"
+RESERVATION_STATUSES = (
+    (HELD, "Held"),
+    (COMMITTED, "Committed"),
+    (RELEASED, "Released"),
+    (EXPIRED, "Expired"),
+)
+STOCK_RESERVATION = "stock_reservation"
+RESERVATIONS = "reservations"
+STOCK_RESERVATIONS = "stock_reservations"
+TTL = "ttl"
+# seconds a reservation holds its stock unless committed
+DEFAULT_RESERVATION_TTL = 900
+MAX_RESERVATION_TTL = 86400
+NOT_ENOUGH_STOCK = "Not enough stock left"
+INVALID_RESERVATION = "quantity must be a positive number and ttl a number of seconds"
+RESERVATION_NOT_EXIST = "Reservation does not exist or has expired"
+RESERVED_SUCCESS = "Stock reserved successfully"
+COMMITTED_SUCCESS = "Reservation committed successfully"
+RELEASED_SUCCESS = "Reservation released successfully"
+MATERIAL_RATE_HISTORY = "material_rate_history"
+MATERIAL_RATE_ROLLUP = "material_rate_rollup"
+RATE_HISTORY = "rate_history"
+RATE_ROLLUPS = "rate_rollups"
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+GRANULARITIES = ((DAY, "Day"), (WEEK, "Week"), (MONTH, "Month"))
+GRANULARITY = "granularity"
+FROM = "from"
+TO = "to"
+PERIOD_START = "period_start"
+OPEN = "open"
+CLOSE = "close"
+LOW = "low"
+HIGH = "high"
+AVERAGE = "average"
+CHANGES = "changes"
+MAX_TREND_PERIODS = 366
+# days a trend reaches back when no from date is given
+DEFAULT_TREND_DAYS = {DAY: 30, WEEK: 182, MONTH: 365}
+INVALID_TREND = (
+    "granularity must be day, week or month and from, to dates as YYYY-MM-DD"
+)
+TOO_MANY_PERIODS = "Ask for at most 366 periods at once"
+TREND_RETRIEVED = "Material rate trend retrieved successfully"
+CITY = "city"
+PRICES_RETRIEVED = "Material prices retrieved successfully"
+INVALID_PRICE_QUERY = "Send the type and city of the materials"
+NO_PRICES = "No material of this type is stocked in the city"
+PRODUCT = "product"
+PRODUCTS_RETRIEVED = "Products retrieved successfully"
+PRODUCT_NOT_EXIST = "Product does not exist"
+INVALID_PRODUCT = "product must be the id of a product"
+PRODUCT_NAME = "product__name"
+PRODUCT_BRAND = "product__brand"
+CHANGES_RETRIEVED = "Material stock changes retrieved successfully"
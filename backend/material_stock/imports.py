@@ -0,0 +1,167 @@
+import codecs
+import csv
+import json
+
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+from search.autocomplete import record_created
+from search.constants import MATERIAL_STOCK
+from search.documents import refresh
+from shop.models import ShopType
+
+from .catalog import normalize, resolve
+from .constants import *
+from .models import MaterialStock
+from .rates import record
+from .serializers import material_errors
+from .units import parse_stock
+
+BATCH_SIZE = 1000
+COLUMNS = ("product_id", "quantity", "unit", "rate")
+
+UPSERT_SQL = f"""
+    INSERT INTO {MaterialStock._meta.db_table} (
+        {", ".join(COLUMNS)}, shop_id, created_by_id, updated_by_id,
+        created_at, updated_at, is_deleted
+    ) VALUES %s
+    ON CONFLICT (shop_id, product_id) WHERE NOT is_deleted DO UPDATE SET
+        quantity = EXCLUDED.quantity,
+        unit = EXCLUDED.unit,
+        stock_note = NULL,
+        rate = EXCLUDED.rate,
+        updated_by_id = EXCLUDED.updated_by_id,
+        updated_at = EXCLUDED.updated_at
+    RETURNING id, product_id, xmax = 0, rate, (
+        -- subqueries in RETURNING read the table as it was before the insert
+        SELECT stored.rate FROM {MaterialStock._meta.db_table} AS stored
+        WHERE stored.id = {MaterialStock._meta.db_table}.id
+    )
+"""
+# the item columns, then shop and owner, then the timestamps and live flag
+TEMPLATE = f"({', '.join(['%s'] * (len(COLUMNS) + 3))}, now(), now(), false)"
+
+
+def read_rows(request):
+    """
+    Read the items of an import one at a time without holding the payload
+    CSV and NDJSON bodies are parsed line by line off the request stream,
+    a JSON array body is parsed by the request parser
+    :param request: import request
+    :return: iterator of item dicts
+    """
+    content_type = request.content_type.split(";")[0].strip()
+    if content_type == CSV_CONTENT_TYPE:
+        return csv.DictReader(codecs.iterdecode(request.stream, "utf-8"))
+    if content_type == NDJSON_CONTENT_TYPE:
+        lines = codecs.iterdecode(request.stream, "utf-8")
+        return (json_line(line) for line in lines if line.strip())
+    if not isinstance(request.data, list):
+        raise ValueError(INVALID_IMPORT)
+    return iter(request.data)
+
+
+def json_line(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def clean(row, types):
+    """
+    Validate one imported item the way the create endpoint does
+    :param row: item read from the payload
+    :param types: shop type name -> id
+    :return: ((catalog key, stock columns), list of errors), the catalog key
+             being the normalized (type id, name, brand)
+    """
+    if not isinstance(row, dict):
+        return None, [INVALID_ROW]
+    data = {
+        key: (value.strip() if isinstance(value, str) else value)
+        for key, value in row.items()
+    }
+    try:
+        data[RATE] = float(data.get(RATE))
+    except (TypeError, ValueError):
+        pass
+    data[QUANTITY], data[UNIT] = parse_stock(data.get(STOCK)) or (None, None)
+    errors = material_errors(data)
+    type_id = types.get(data.get(TYPE))
+    if type_id is None:
+        errors.append(INVALID_TYPE)
+    if errors:
+        return None, errors
+    key = (type_id, normalize(data[NAME]), normalize(data[BRAND]))
+    return (key, (data[QUANTITY], data[UNIT], data[RATE])), errors
+
+
+def upsert(batch, shop, user_id):
+    """
+    Match one batch of valid items to the catalog and write them with a
+    single INSERT ... ON CONFLICT, then append the set or changed rates to
+    the rate history
+    :param batch: dict of catalog key -> stock columns
+    :return: (list of (id, catalog key) of the created rows,
+              ids of the updated rows)
+    """
+    products = resolve(batch)
+    with connection.cursor() as cursor:
+        rows = execute_values(
+            cursor,
+            UPSERT_SQL,
+            [
+                (products[key],) + values + (shop.id, user_id, user_id)
+                for key, values in batch.items()
+            ],
+            template=TEMPLATE,
+            page_size=len(batch),
+            fetch=True,
+        )
+    record([(pk, stored, rate) for pk, _, _, rate, stored in rows])
+    keys = {product_id: key for key, product_id in products.items()}
+    created = [(pk, keys[product]) for pk, product, inserted, _, _ in rows if inserted]
+    updated = [pk for pk, _, inserted, _, _ in rows if not inserted]
+    return created, updated
+
+
+def import_materials(rows, shop):
+    """
+    Upsert the items of a shop on (shop, product) in batches
+    :param rows: iterator of item dicts
+    :param shop: shop the items are stocked in
+    :return: created count, updated count and per row errors
+    """
+    types = dict(ShopType.objects.values_list("name", "id"))
+    user_id = shop.user_id
+    report = {CREATED: 0, UPDATED: 0, ERRORS: []}
+
+    def flush(batch):
+        with transaction.atomic():
+            created, updated = upsert(batch, shop, user_id)
+            refresh(MATERIAL_STOCK, [pk for pk, _ in created] + updated)
+        record_created(
+            MaterialStock,
+            [
+                {PRODUCT_NAME: name, PRODUCT_BRAND: brand}
+                for _, (_, name, brand) in created
+            ],
+        )
+        report[CREATED] += len(created)
+        report[UPDATED] += len(updated)
+
+    batch = {}
+    for number, row in enumerate(rows, start=1):
+        item, errors = clean(row, types)
+        if errors:
+            report[ERRORS].append({ROW: number, ERRORS: errors})
+            continue
+        # a repeated item in one batch keeps its last values
+        key, values = item
+        batch[key] = values
+        if len(batch) == BATCH_SIZE:
+            flush(batch)
+            batch = {}
+    if batch:
+        flush(batch)
+    return report
@@ -0,0 +1,107 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from my_exceptions import DataNotExist
+from shop.models import Shop, ShopType
+from user.models import User
+
+from ...catalog import product_for
+from ...constants import *
+from ...models import MaterialStock, Product, StockReservation
+from ...reservations import commit, release, reserve
+
+
+class Command(BaseCommand):
+    help = (
+        "Reserve, commit and release stock of a few hot materials from "
+        "concurrent threads and check nothing is oversold"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--buyers", type=int, default=64)
+        parser.add_argument("--attempts", type=int, default=20)
+        parser.add_argument("--materials", type=int, default=2)
+        parser.add_argument("--stock", type=float, default=500)
+
+    def handle(self, *args, **options):
+        buyers, attempts = options["buyers"], options["attempts"]
+        tag = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-{tag}",
+            name="bench",
+            mobile=int(time.time() * 1000),
+            email=f"bench-{tag}@example.com",
+        )
+        shop_type = ShopType.objects.first() or ShopType.objects.create(name="bench")
+        shop = Shop.objects.create(name=f"bench-{tag}", invented_year=2000, user=owner)
+        materials = [
+            MaterialStock.objects.create(
+                product=product_for(shop_type.id, f"bench {number}", "bench"),
+                quantity=options["stock"],
+                unit="bag",
+                shop=shop,
+            )
+            for number in range(options["materials"])
+        ]
+
+        def buyer(_):
+            outcomes = {"reserved": 0, "refused": 0}
+            try:
+                for _ in range(attempts):
+                    material = random.choice(materials)
+                    try:
+                        reservation = reserve(
+                            material.id, owner.id, random.randint(1, 5)
+                        )
+                    except DataNotExist:
+                        outcomes["refused"] += 1
+                        continue
+                    outcomes["reserved"] += 1
+                    # most buyers go through with the purchase
+                    if random.random() < 0.8:
+                        commit(reservation.id, owner.id)
+                    else:
+                        release(reservation.id, owner.id)
+                return outcomes
+            finally:
+                connection.close()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=buyers) as pool:
+                results = list(pool.map(buyer, range(buyers)))
+            elapsed = time.perf_counter() - started
+            reserved = sum(result["reserved"] for result in results)
+            refused = sum(result["refused"] for result in results)
+            self.stdout.write(
+                f"{buyers} buyers x {attempts} attempts on {len(materials)} "
+                f"materials: {reserved} reserved, {refused} refused in "
+                f"{elapsed:.3f}s ({(reserved + refused) / elapsed:.0f} ops/s)"
+            )
+            for material in materials:
+                material.refresh_from_db()
+                held = (
+                    StockReservation.objects.filter(
+                        material=material, status__in=(HELD, COMMITTED)
+                    ).aggregate(total=Sum("quantity"))["total"]
+                    or 0
+                )
+                self.stdout.write(
+                    f"{material.product.name}: {held:g} sold, {material.quantity:g} left"
+                )
+                if (
+                    material.quantity < 0
+                    or held + material.quantity != options["stock"]
+                ):
+                    raise CommandError(f"{material.product.name} was oversold")
+        finally:
+            shop.delete()
+            Product.objects.filter(
+                id__in=[material.product_id for material in materials]
+            ).delete()
+            owner.delete()
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...reservations import expire
+
+
+class Command(BaseCommand):
+    help = (
+        "Put the stock of expired reservations back on the materials, in "
+        "batches with a pause between them, meant to be run on a schedule"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="seconds to sleep between batches"
+        )
+
+    def handle(self, *args, **options):
+        batch_size, pause = options["batch_size"], options["pause"]
+        total = 0
+        started = time.perf_counter()
+        while True:
+            expired = expire(batch_size)
+            total += expired
+            if expired < batch_size:
+                break
+            time.sleep(pause)
+        self.stdout.write(
+            f"{total} reservations expired in {time.perf_counter() - started:.2f}s"
+        )
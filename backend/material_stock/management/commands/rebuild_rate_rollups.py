@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...models import RateHistory
+from ...rates import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the day, week and month rate rollups from the rate history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        materials = (
+            RateHistory.objects.values_list("material_id", flat=True)
+            .order_by("material_id")
+            .distinct()
+        )
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(materials.filter(material_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            rebuild_rollups(batch)
+            total += len(batch)
+            last_id = batch[-1]
+        self.stdout.write(f"{total} material rate rollups rebuilt")
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0002_alter_materialstock_type_delete_material"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="materialstock",
+            index=models.Index(
+                fields=["created_at", "id"], name="material_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+# stock written before the constraint may repeat a shop, name and brand, keep
+# the newest live row of each
+DEDUP_SQL = """
+    UPDATE material_stock_materialstock AS material
+        SET is_deleted = true, updated_at = now()
+    WHERE NOT material.is_deleted AND EXISTS (
+        SELECT 1 FROM material_stock_materialstock AS newer
+        WHERE NOT newer.is_deleted AND newer.shop_id = material.shop_id
+            AND newer.name = material.name AND newer.brand = material.brand
+            AND newer.id > material.id
+    )
+    RETURNING material.id
+"""
+
+RESEED_ROLLUPS_SQL = """
+    DELETE FROM material_price_rollup;
+    INSERT INTO material_price_rollup
+        (type_id, brand, city, count, rate_sum, min_rate, max_rate)
+    SELECT shop_types[1], brand, city, count(*), sum(amount), min(amount),
+        max(amount)
+    FROM search_document
+    WHERE entity_type = 'material_stock' AND NOT is_deleted
+        AND cardinality(shop_types) > 0 AND brand IS NOT NULL
+        AND city IS NOT NULL AND amount IS NOT NULL
+    GROUP BY shop_types[1], brand, city
+"""
+
+
+def drop_duplicate_stock(apps, schema_editor):
+    """
+    Soft delete all but the newest live stock per shop, name and brand, and
+    take them out of search and the price rollups when those tables exist
+    already
+    """
+    connection = schema_editor.connection
+    tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        cursor.execute(DEDUP_SQL)
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids or "search_document" not in tables:
+            return
+        cursor.execute(
+            "UPDATE search_document SET is_deleted = true "
+            "WHERE entity_type = 'material_stock' AND entity_id = ANY(%s)",
+            [ids],
+        )
+        if "material_price_rollup" in tables:
+            cursor.execute(RESEED_ROLLUPS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0003_materialstock_material_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_stock, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="materialstock",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_deleted", False)),
+                fields=("shop", "name", "brand"),
+                name="unique_live_material_stock",
+            ),
+        ),
+    ]
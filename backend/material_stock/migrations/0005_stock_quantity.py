@@ -0,0 +1,82 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+from material_stock.units import format_stock, parse_stock
+
+FIELDS = ["quantity", "unit", "stock_note"]
+
+
+def split_stock(apps, schema_editor):
+    MaterialStock = apps.get_model("material_stock", "MaterialStock")
+    batch = []
+    for material in MaterialStock.objects.only("stock", *FIELDS).iterator(2000):
+        parsed = parse_stock(material.stock)
+        if parsed is not None:
+            material.quantity, material.unit = parsed
+        else:
+            # keep the text the shop typed rather than lose it with the column
+            material.stock_note = material.stock
+        batch.append(material)
+        if len(batch) == 2000:
+            MaterialStock.objects.bulk_update(batch, FIELDS)
+            batch = []
+    MaterialStock.objects.bulk_update(batch, FIELDS)
+
+
+def join_stock(apps, schema_editor):
+    MaterialStock = apps.get_model("material_stock", "MaterialStock")
+    batch = []
+    for material in MaterialStock.objects.only(*FIELDS).iterator(2000):
+        material.stock = material.stock_note or format_stock(
+            material.quantity, material.unit
+        )
+        batch.append(material)
+        if len(batch) == 2000:
+            MaterialStock.objects.bulk_update(batch, ["stock"])
+            batch = []
+    MaterialStock.objects.bulk_update(batch, ["stock"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0004_unique_live_material_stock"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="materialstock",
+            name="quantity",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="materialstock",
+            name="unit",
+            field=models.CharField(default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="materialstock",
+            name="stock_note",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        # nullable so that unapplying re-adds the column before join_stock fills it
+        migrations.AlterField(
+            model_name="materialstock",
+            name="stock",
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.RunPython(split_stock, join_stock),
+        migrations.RemoveField(
+            model_name="materialstock",
+            name="stock",
+        ),
+        migrations.AddIndex(
+            model_name="materialstock",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["quantity", "id"],
+                name="material_quantity_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:52
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0006_stock_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RateRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("day", "Day"), ("week", "Week"), ("month", "Month")],
+                        max_length=10,
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("open_rate", models.FloatField()),
+                ("close_rate", models.FloatField()),
+                ("min_rate", models.FloatField()),
+                ("max_rate", models.FloatField()),
+                ("rate_sum", models.FloatField()),
+                ("changes", models.IntegerField()),
+                (
+                    "material",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rate_rollups",
+                        to="material_stock.materialstock",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "material_rate_rollup",
+            },
+        ),
+        migrations.CreateModel(
+            name="RateHistory",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("month", models.DateField()),
+                ("first_rate", models.BigIntegerField()),
+                ("last_rate", models.BigIntegerField()),
+                (
+                    "offsets",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "deltas",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(), default=list, size=None
+                    ),
+                ),
+                (
+                    "material",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rate_history",
+                        to="material_stock.materialstock",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "material_rate_history",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="raterollup",
+            constraint=models.UniqueConstraint(
+                fields=("material", "granularity", "period_start"),
+                name="unique_material_rate_period",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ratehistory",
+            constraint=models.UniqueConstraint(
+                fields=("material", "month"), name="unique_material_rate_month"
+            ),
+        ),
+        # seed the history and rollups with the rates standing today
+        migrations.RunSQL(
+            "INSERT INTO material_rate_history "
+            "(material_id, month, first_rate, last_rate, offsets, deltas) "
+            "SELECT id, date_trunc('month', now())::date, round(rate * 100), "
+            "round(rate * 100), "
+            "ARRAY[extract(epoch FROM now() - date_trunc('month', now()))::integer], "
+            "ARRAY[0]::bigint[] "
+            "FROM material_stock_materialstock",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "INSERT INTO material_rate_rollup "
+            "(material_id, granularity, period_start, open_rate, close_rate, "
+            "min_rate, max_rate, rate_sum, changes) "
+            "SELECT material.id, period.granularity, "
+            "date_trunc(period.granularity, now())::date, material.rate, "
+            "material.rate, material.rate, material.rate, material.rate, 1 "
+            "FROM material_stock_materialstock AS material "
+            "CROSS JOIN (VALUES ('day'), ('week'), ('month')) AS period (granularity)",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,206 @@
+# Generated by Django 3.2.17 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+from material_stock.units import format_stock
+
+NORMALIZED_NAME = "regexp_replace(btrim(material.name), '\\s+', ' ', 'g')"
+NORMALIZED_BRAND = "regexp_replace(btrim(material.brand), '\\s+', ' ', 'g')"
+
+# search documents of the materials take the catalog spelling
+RENAME_DOCUMENTS_SQL = """
+    UPDATE search_document AS document
+        SET name = product.name, brand = product.brand, updated_at = now()
+    FROM material_stock_materialstock AS material
+    JOIN product ON product.id = material.product_id
+    WHERE document.entity_type = 'material_stock'
+        AND document.entity_id = material.id
+        AND (document.name, document.brand)
+            IS DISTINCT FROM (product.name, product.brand)
+"""
+
+RESEED_ROLLUPS_SQL = """
+    DELETE FROM material_price_rollup;
+    INSERT INTO material_price_rollup
+        (type_id, brand, city, count, rate_sum, min_rate, max_rate)
+    SELECT shop_types[1], brand, city, count(*), sum(amount), min(amount),
+        max(amount)
+    FROM search_document
+    WHERE entity_type = 'material_stock' AND NOT is_deleted
+        AND cardinality(shop_types) > 0 AND brand IS NOT NULL
+        AND city IS NOT NULL AND amount IS NOT NULL
+    GROUP BY shop_types[1], brand, city
+"""
+
+
+def merge_stock(kept, merged):
+    """
+    Add the stock of a merged row to the row kept, as quantity when both are
+    counted in one unit, else as text in the stock note
+    """
+    if kept.stock_note is None and merged.stock_note is None:
+        if merged.unit == kept.unit:
+            kept.quantity += merged.quantity
+            return
+    notes = [
+        row.stock_note or format_stock(row.quantity, row.unit) for row in (kept, merged)
+    ]
+    kept.stock_note = " + ".join(notes)[:100]
+
+
+def merge_duplicate_stock(apps, schema_editor):
+    """
+    Spellings merged by the normalization keep their newest live stock, which
+    takes over the stock of the others. Search documents, when that table
+    exists already, get the catalog spelling and drop the merged rows, and
+    the price rollups are counted again off them.
+    """
+    MaterialStock = apps.get_model("material_stock", "MaterialStock")
+    materials = (
+        MaterialStock.objects.filter(is_deleted=False)
+        .only("shop_id", "product_id", "quantity", "unit", "stock_note")
+        .order_by("shop_id", "product_id", "-id")
+    )
+    kept, changed, merged = None, {}, []
+    for material in materials.iterator(2000):
+        if kept and (kept.shop_id, kept.product_id) == (
+            material.shop_id,
+            material.product_id,
+        ):
+            merge_stock(kept, material)
+            changed[kept.id] = kept
+            merged.append(material.id)
+        else:
+            kept = material
+    MaterialStock.objects.bulk_update(
+        changed.values(), ["quantity", "stock_note"], batch_size=2000
+    )
+    MaterialStock.objects.filter(id__in=merged).update(
+        is_deleted=True, updated_at=timezone.now()
+    )
+    connection = schema_editor.connection
+    tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        # check the new product keys now, the columns are altered next
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        if "search_document" not in tables:
+            return
+        cursor.execute(
+            "UPDATE search_document SET is_deleted = true "
+            "WHERE entity_type = 'material_stock' AND entity_id = ANY(%s)",
+            [merged],
+        )
+        cursor.execute(RENAME_DOCUMENTS_SQL)
+        if "material_price_rollup" in tables:
+            cursor.execute(RESEED_ROLLUPS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_shop_shop_created_id_idx"),
+        ("material_stock", "0007_rate_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100)),
+                ("brand", models.CharField(max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="material",
+                        to="shop.shoptype",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="product",
+            constraint=models.UniqueConstraint(
+                fields=("type", "name", "brand"), name="unique_product"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["name", "brand"], name="product_name_idx"),
+        ),
+        migrations.AddField(
+            model_name="materialstock",
+            name="product",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="materialstocks",
+                to="material_stock.product",
+            ),
+        ),
+        # one catalog product per distinct type, name and brand in stock
+        migrations.RunSQL(
+            "INSERT INTO product (type_id, name, brand, created_at) "
+            f"SELECT DISTINCT material.type_id, {NORMALIZED_NAME}, "
+            f"{NORMALIZED_BRAND}, now() "
+            "FROM material_stock_materialstock AS material",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "UPDATE material_stock_materialstock AS material "
+            "SET product_id = product.id FROM product "
+            "WHERE product.type_id = material.type_id "
+            f"AND product.name = {NORMALIZED_NAME} "
+            f"AND product.brand = {NORMALIZED_BRAND}",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(merge_duplicate_stock, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="materialstock",
+            name="unique_live_material_stock",
+        ),
+        migrations.RemoveField(
+            model_name="materialstock",
+            name="brand",
+        ),
+        migrations.RemoveField(
+            model_name="materialstock",
+            name="name",
+        ),
+        migrations.RemoveField(
+            model_name="materialstock",
+            name="type",
+        ),
+        migrations.AlterField(
+            model_name="materialstock",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="materialstocks",
+                to="material_stock.product",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="materialstock",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_deleted", False)),
+                fields=("shop", "product"),
+                name="unique_live_material_stock",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="materialstock",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["product", "rate"],
+                name="material_product_rate_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0008_product_catalog"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="materialstock",
+            name="material_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="materialstock",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_at", "id"],
+                name="material_created_id_idx",
+            ),
+        ),
+    ]
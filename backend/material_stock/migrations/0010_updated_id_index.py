@@ -0,0 +1,19 @@
+# Generated by Django 3.2.17 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("material_stock", "0009_live_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="materialstock",
+            index=models.Index(
+                fields=["updated_at", "id"], name="material_updated_id_idx"
+            ),
+        ),
+    ]
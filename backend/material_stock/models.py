@@ -1,22 +1,50 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from models import LIVE, SoftDeleteModel
 from shop.models import Shop, ShopType
 from user.models import User
 
 from .constants import *
 
 
-class MaterialStock(models.Model):
+class Product(models.Model):
     """
-    Material stock model class
+    Product model class
+    one row per distinct type, name and brand of material, shared by every
+    shop stocking it
     """
 
     id = models.AutoField(primary_key=True)
     type = models.ForeignKey(ShopType, on_delete=models.CASCADE, related_name=MATERIAL)
     name = models.CharField(max_length=100)
-    stock = models.CharField(max_length=100)
-    rate = models.FloatField(default=0.0)
     brand = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = PRODUCT
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "name", "brand"], name="unique_product"
+            )
+        ]
+        indexes = [models.Index(fields=["name", "brand"], name="product_name_idx")]
+
+
+class MaterialStock(SoftDeleteModel):
+    """
+    Material stock model class
+    """
+
+    id = models.AutoField(primary_key=True)
+    product = models.ForeignKey(
+        Product, on_delete=models.PROTECT, related_name=MATERIALSTOCKS
+    )
+    quantity = models.FloatField(default=0.0)
+    unit = models.CharField(max_length=20, default="")
+    # stock text of rows from before the split that did not parse
+    stock_note = models.CharField(max_length=100, blank=True, null=True)
+    rate = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         User,
@@ -35,4 +63,121 @@ class MaterialStock(models.Model):
     shop = models.ForeignKey(
         Shop, on_delete=models.CASCADE, related_name=MATERIALSTOCKS, null=True
     )
-    is_deleted = models.BooleanField(editable=False, default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                condition=LIVE,
+                name="material_created_id_idx",
+            ),
+            # delta sync reads every change, soft deletes included
+            models.Index(fields=["updated_at", "id"], name="material_updated_id_idx"),
+            models.Index(
+                fields=["quantity", "id"],
+                condition=models.Q(is_deleted=False),
+                name="material_quantity_idx",
+            ),
+            # the shops stocking a product, cheapest first
+            models.Index(
+                fields=["product", "rate"],
+                condition=models.Q(is_deleted=False),
+                name="material_product_rate_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shop", "product"],
+                condition=models.Q(is_deleted=False),
+                name=UNIQUE_LIVE_MATERIAL,
+            )
+        ]
+
+
+class StockReservation(models.Model):
+    """
+    Stock reservation model class
+    the reserved quantity is taken off the material stock while the
+    reservation is held, a commit keeps it off, a release or expiry puts it back
+    """
+
+    id = models.AutoField(primary_key=True)
+    material = models.ForeignKey(
+        MaterialStock, on_delete=models.CASCADE, related_name=RESERVATIONS
+    )
+    buyer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name=STOCK_RESERVATIONS
+    )
+    quantity = models.FloatField()
+    status = models.CharField(max_length=20, choices=RESERVATION_STATUSES, default=HELD)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = STOCK_RESERVATION
+        indexes = [
+            # the sweeper only ever reads held reservations by expiry
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(status=HELD),
+                name="reservation_held_expiry_idx",
+            )
+        ]
+
+
+class RateHistory(models.Model):
+    """
+    Rate history model class
+    one row per material and month holding every rate set in the month,
+    delta encoded: the first rate in paise, then for every change its
+    second of the month and its difference to the previous rate
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    material = models.ForeignKey(
+        MaterialStock, on_delete=models.CASCADE, related_name=RATE_HISTORY
+    )
+    month = models.DateField()
+    first_rate = models.BigIntegerField()
+    last_rate = models.BigIntegerField()
+    offsets = ArrayField(models.IntegerField(), default=list)
+    deltas = ArrayField(models.BigIntegerField(), default=list)
+
+    class Meta:
+        db_table = MATERIAL_RATE_HISTORY
+        constraints = [
+            models.UniqueConstraint(
+                fields=["material", "month"], name="unique_material_rate_month"
+            )
+        ]
+
+
+class RateRollup(models.Model):
+    """
+    Rate rollup model class
+    open, close, low, high and mean rate of a material over a day, week or
+    month, kept up to date on every rate change so trends never read history
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    material = models.ForeignKey(
+        MaterialStock, on_delete=models.CASCADE, related_name=RATE_ROLLUPS
+    )
+    granularity = models.CharField(max_length=10, choices=GRANULARITIES)
+    period_start = models.DateField()
+    open_rate = models.FloatField()
+    close_rate = models.FloatField()
+    min_rate = models.FloatField()
+    max_rate = models.FloatField()
+    rate_sum = models.FloatField()
+    changes = models.IntegerField()
+
+    class Meta:
+        db_table = MATERIAL_RATE_ROLLUP
+        constraints = [
+            models.UniqueConstraint(
+                fields=["material", "granularity", "period_start"],
+                name="unique_material_rate_period",
+            )
+        ]
@@ -0,0 +1,237 @@
+import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
+from .constants import *
+from .models import RateHistory, RateRollup
+
+APPEND_SQL = f"""
+    INSERT INTO {MATERIAL_RATE_HISTORY} (
+        material_id, month, first_rate, last_rate, offsets, deltas
+    ) VALUES %s
+    ON CONFLICT (material_id, month) DO UPDATE SET
+        offsets = {MATERIAL_RATE_HISTORY}.offsets || EXCLUDED.offsets,
+        deltas = {MATERIAL_RATE_HISTORY}.deltas
+            || (EXCLUDED.last_rate - {MATERIAL_RATE_HISTORY}.last_rate),
+        last_rate = EXCLUDED.last_rate
+"""
+# the first point of a month is the first rate itself
+APPEND_TEMPLATE = "(%s, %s, %s, %s, ARRAY[%s]::integer[], ARRAY[0]::bigint[])"
+
+ROLLUP_SQL = f"""
+    INSERT INTO {MATERIAL_RATE_ROLLUP} (
+        material_id, granularity, period_start, open_rate, close_rate,
+        min_rate, max_rate, rate_sum, changes
+    ) VALUES %s
+    ON CONFLICT (material_id, granularity, period_start) DO UPDATE SET
+        close_rate = EXCLUDED.close_rate,
+        min_rate = LEAST({MATERIAL_RATE_ROLLUP}.min_rate, EXCLUDED.min_rate),
+        max_rate = GREATEST({MATERIAL_RATE_ROLLUP}.max_rate, EXCLUDED.max_rate),
+        rate_sum = {MATERIAL_RATE_ROLLUP}.rate_sum + EXCLUDED.rate_sum,
+        changes = {MATERIAL_RATE_ROLLUP}.changes + 1
+"""
+
+
+def paise(rate):
+    return round(rate * 100)
+
+
+def month_start(moment):
+    """
+    First instant of the month of a moment, in the site time zone
+    """
+    return timezone.localtime(moment).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def period_starts(day):
+    """
+    First day of the day, week and month a date falls in
+    """
+    return {
+        DAY: day,
+        WEEK: day - datetime.timedelta(days=day.weekday()),
+        MONTH: day.replace(day=1),
+    }
+
+
+def next_period(start, granularity):
+    if granularity == DAY:
+        return start + datetime.timedelta(days=1)
+    if granularity == WEEK:
+        return start + datetime.timedelta(days=7)
+    return (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def record(changes, at=None):
+    """
+    Append rate changes to the history and fold them into the rollups,
+    one statement for the history and one for the rollups of every change
+    :param changes: list of (material id, old rate or None when created, new rate),
+                    at most one change per material
+    :param at: moment of the changes, now by default
+    """
+    changes = [
+        (material_id, old, new)
+        for material_id, old, new in changes
+        if new is not None and old != new
+    ]
+    if not changes:
+        return
+    at = at or timezone.now()
+    start = month_start(at)
+    offset = int((timezone.localtime(at) - start).total_seconds())
+    history = [
+        (material_id, start.date(), paise(new), paise(new), offset)
+        for material_id, _, new in changes
+    ]
+    starts = period_starts(timezone.localdate(at))
+    rollups = [
+        (
+            material_id,
+            granularity,
+            period_start,
+            opened,
+            new,
+            min(opened, new),
+            max(opened, new),
+            new,
+            1,
+        )
+        for material_id, old, new in changes
+        for opened in [new if old is None else old]
+        for granularity, period_start in starts.items()
+    ]
+    with connection.cursor() as cursor:
+        execute_values(cursor, APPEND_SQL, history, template=APPEND_TEMPLATE)
+        execute_values(cursor, ROLLUP_SQL, rollups)
+
+
+def points(history):
+    """
+    Decode one month of rate history
+    :param history: RateHistory object
+    :return: list of (moment, rate) in the order they were set
+    """
+    start = timezone.make_aware(
+        datetime.datetime.combine(history.month, datetime.time())
+    )
+    rate = history.first_rate
+    decoded = []
+    for offset, delta in zip(history.offsets, history.deltas):
+        rate += delta
+        decoded.append((start + datetime.timedelta(seconds=offset), rate / 100))
+    return decoded
+
+
+def rebuild_rollups(material_ids):
+    """
+    Recompute the rollups of materials from their rate history
+    :param material_ids: ids of the materials
+    """
+    periods = {}
+    previous = {}
+    months = RateHistory.objects.filter(material_id__in=material_ids).order_by(
+        "material_id", "month"
+    )
+    for history in months:
+        for moment, rate in points(history):
+            opened = previous.get(history.material_id, rate)
+            previous[history.material_id] = rate
+            day = timezone.localdate(moment)
+            for granularity, period_start in period_starts(day).items():
+                key = (history.material_id, granularity, period_start)
+                rollup = periods.get(key)
+                if rollup is None:
+                    periods[key] = RateRollup(
+                        material_id=history.material_id,
+                        granularity=granularity,
+                        period_start=period_start,
+                        open_rate=opened,
+                        close_rate=rate,
+                        min_rate=min(opened, rate),
+                        max_rate=max(opened, rate),
+                        rate_sum=rate,
+                        changes=1,
+                    )
+                    continue
+                rollup.close_rate = rate
+                rollup.min_rate = min(rollup.min_rate, rate)
+                rollup.max_rate = max(rollup.max_rate, rate)
+                rollup.rate_sum += rate
+                rollup.changes += 1
+    with transaction.atomic():
+        RateRollup.objects.filter(material_id__in=material_ids).delete()
+        RateRollup.objects.bulk_create(periods.values(), batch_size=1000)
+
+
+def count_periods(granularity, start, end):
+    """
+    Number of periods of a granularity between two dates, both included
+    """
+    first = period_starts(start)[granularity]
+    if granularity == DAY:
+        return (end - first).days + 1
+    if granularity == WEEK:
+        return (end - first).days // 7 + 1
+    return (end.year - first.year) * 12 + end.month - first.month + 1
+
+
+def trend(material_id, granularity, start, end):
+    """
+    Rate of a material per period read off the rollups, a period without a
+    change carries the close of the period before it
+    :param material_id: id of the material stock
+    :param granularity: day, week or month
+    :param start: first date of the trend
+    :param end: last date of the trend
+    :return: list of period dicts, oldest first
+    """
+    first = period_starts(start)[granularity]
+    rollups = RateRollup.objects.filter(
+        material_id=material_id, granularity=granularity
+    )
+    stored = {
+        rollup.period_start: rollup
+        for rollup in rollups.filter(period_start__range=(first, end))
+    }
+    carry = (
+        rollups.filter(period_start__lt=first)
+        .order_by("-period_start")
+        .values_list("close_rate", flat=True)
+        .first()
+    )
+    periods = []
+    period_start = first
+    while period_start <= end:
+        rollup = stored.get(period_start)
+        if rollup is not None:
+            periods.append(
+                {
+                    PERIOD_START: period_start,
+                    OPEN: rollup.open_rate,
+                    CLOSE: rollup.close_rate,
+                    LOW: rollup.min_rate,
+                    HIGH: rollup.max_rate,
+                    AVERAGE: round(rollup.rate_sum / rollup.changes, 2),
+                    CHANGES: rollup.changes,
+                }
+            )
+            carry = rollup.close_rate
+        elif carry is not None:
+            periods.append(
+                {
+                    PERIOD_START: period_start,
+                    OPEN: carry,
+                    CLOSE: carry,
+                    LOW: carry,
+                    HIGH: carry,
+                    AVERAGE: carry,
+                    CHANGES: 0,
+                }
+            )
+        period_start = next_period(period_start, granularity)
+    return periods
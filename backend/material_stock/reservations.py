@@ -0,0 +1,114 @@
+import datetime
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from my_exceptions import DataNotExist
+from psycopg2.extras import execute_values
+
+from .constants import *
+from .models import MaterialStock, StockReservation
+
+RESTOCK_SQL = f"""
+    UPDATE {MaterialStock._meta.db_table} AS material
+    SET quantity = material.quantity + returned.quantity, updated_at = now()
+    FROM (VALUES %s) AS returned (id, quantity)
+    WHERE material.id = returned.id
+"""
+
+
+def reserve(material_id, buyer_id, quantity, ttl=DEFAULT_RESERVATION_TTL):
+    """
+    Hold stock of a material for a buyer. The stock is taken with one guarded
+    `UPDATE ... SET quantity = quantity - q WHERE quantity >= q`, concurrent
+    buyers queue on the row lock and the last ones find too little left, so
+    a material is never oversold.
+    :param material_id: id of the material stock
+    :param buyer_id: id of the buyer
+    :param quantity: quantity to hold
+    :param ttl: seconds the stock is held unless committed
+    :return: the held reservation
+    :raise DataNotExist: when there is not enough stock left
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        taken = MaterialStock.objects.filter(
+            id=material_id, quantity__gte=quantity
+        ).update(quantity=F(QUANTITY) - quantity, updated_at=now)
+        if not taken:
+            raise DataNotExist(NOT_ENOUGH_STOCK)
+        return StockReservation.objects.create(
+            material_id=material_id,
+            buyer_id=buyer_id,
+            quantity=quantity,
+            expires_at=now + datetime.timedelta(seconds=ttl),
+        )
+
+
+def commit(reservation_id, buyer_id):
+    """
+    Keep the stock of a held, unexpired reservation for good
+    :raise DataNotExist: when the reservation is not held any more
+    """
+    committed = StockReservation.objects.filter(
+        id=reservation_id,
+        buyer_id=buyer_id,
+        status=HELD,
+        expires_at__gt=timezone.now(),
+    ).update(status=COMMITTED, updated_at=timezone.now())
+    if not committed:
+        raise DataNotExist(RESERVATION_NOT_EXIST)
+
+
+def restock(reservations, status):
+    """
+    Close held reservations and put their quantity back on the materials,
+    one UPDATE for the reservations and one for the materials
+    :param reservations: list of (reservation id, material id, quantity)
+    :param status: released or expired
+    """
+    if not reservations:
+        return
+    StockReservation.objects.filter(
+        id__in=[reservation_id for reservation_id, _, _ in reservations]
+    ).update(status=status, updated_at=timezone.now())
+    returned = {}
+    for _, material_id, quantity in reservations:
+        returned[material_id] = returned.get(material_id, 0) + quantity
+    with connection.cursor() as cursor:
+        execute_values(cursor, RESTOCK_SQL, list(returned.items()))
+
+
+def release(reservation_id, buyer_id):
+    """
+    Give the stock of a held reservation back before it expires
+    :raise DataNotExist: when the reservation is not held any more
+    """
+    with transaction.atomic():
+        reservation = (
+            StockReservation.objects.select_for_update()
+            .filter(id=reservation_id, buyer_id=buyer_id, status=HELD)
+            .values_list(ID, "material_id", QUANTITY)
+            .first()
+        )
+        if reservation is None:
+            raise DataNotExist(RESERVATION_NOT_EXIST)
+        restock([reservation], RELEASED)
+
+
+def expire(batch_size):
+    """
+    Expire one batch of held reservations past their expiry, rows locked by
+    a concurrent commit or release are skipped and picked up next time
+    :param batch_size: most reservations expired
+    :return: number of reservations expired
+    """
+    with transaction.atomic():
+        reservations = list(
+            StockReservation.objects.select_for_update(skip_locked=True)
+            .filter(status=HELD, expires_at__lte=timezone.now())
+            .order_by("expires_at")
+            .values_list(ID, "material_id", QUANTITY)[:batch_size]
+        )
+        restock(reservations, EXPIRED)
+    return len(reservations)
@@ -1,9 +1,35 @@
 import re
 
 from rest_framework import serializers
+from shop.models import ShopType
 
-from .models import MaterialStock
+from .catalog import product_for
+from .models import MaterialStock, Product, StockReservation
 from .my_logger import logger
+from .units import format_stock, parse_stock
+
+STOCK_ERROR = "Stock must be number then follow character."
+
+
+class StockField(serializers.Field):
+    """
+    Stock as one text such as "50 bags", stored as a quantity and a unit
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return instance.stock_note or format_stock(instance.quantity, instance.unit)
+
+    def to_internal_value(self, data):
+        parsed = parse_stock(data)
+        if parsed is None:
+            logger.error(STOCK_ERROR)
+            raise serializers.ValidationError(STOCK_ERROR)
+        quantity, unit = parsed
+        return {"quantity": quantity, "unit": unit, "stock_note": None}
 
 
 class MaterialStockSerializer(serializers.ModelSerializer):
@@ -11,39 +37,96 @@ class MaterialStockSerializer(serializers.ModelSerializer):
     User serializer class for validate inputs from request
     """
 
+    type = serializers.PrimaryKeyRelatedField(
+        source="product.type", queryset=ShopType.objects.all()
+    )
+    name = serializers.CharField(source="product.name", max_length=100)
+    brand = serializers.CharField(source="product.brand", max_length=100)
+    stock = StockField()
+
     class Meta:
         model = MaterialStock
-        fields = "__all__"
+        exclude = ("quantity", "unit", "stock_note", "product")
 
     def validate(self, data):
-        if not re.match("[A-Za-z\s]+", data["name"]):
-            logger.error("Name must be characters.")
-            raise serializers.ValidationError(
-                "Name must be characters.",
-            )
-        if not re.match("[0-9]+[\sA-Za-z]+", data["stock"]):
-            logger.error("Stock must be number then follow character.")
-            raise serializers.ValidationError(
-                "Stock must be number then follow character.",
-            )
-        if not isinstance(data["rate"], float):
-            logger.error("Name must be at least 10 characters long.")
-            raise serializers.ValidationError(
-                "Name must be at least 10 characters long.",
-            )
-        if not re.match("[A-Za-z\s]+", data["brand"]):
-            logger.error("Brand name must be characters.")
-            raise serializers.ValidationError(
-                "Brand name must be characters.",
-            )
+        product = data.pop("product", {})
+        if self.instance is not None:
+            stored = self.instance.product
+            product = {
+                "type": stored.type,
+                "name": stored.name,
+                "brand": stored.brand,
+                **product,
+            }
+        errors = material_errors({**data, **product})
+        if errors:
+            raise serializers.ValidationError(errors[0])
+        data["product"] = product_for(
+            product["type"].id, product["name"], product["brand"]
+        )
         return data
 
 
+def material_errors(data):
+    """
+    Check the name, stock, rate and brand of one material stock
+    :param data: material stock fields, the stock already split by parse_stock
+    :return: list of error messages, empty when the data is valid
+    """
+    errors = []
+    if not re.match("[A-Za-z\s]+", str(data.get("name", ""))):
+        errors.append("Name must be characters.")
+    if data.get("quantity") is None:
+        errors.append(STOCK_ERROR)
+    if not isinstance(data.get("rate"), float):
+        errors.append("Name must be at least 10 characters long.")
+    if not re.match("[A-Za-z\s]+", str(data.get("brand", ""))):
+        errors.append("Brand name must be characters.")
+    for error in errors:
+        logger.error(error)
+    return errors
+
+
 class MaterialStockResponseSerializer(serializers.ModelSerializer):
     """
     Material stock serializer for return response we can hide some important details
     """
 
+    type = serializers.IntegerField(source="product.type_id")
+    name = serializers.CharField(source="product.name")
+    brand = serializers.CharField(source="product.brand")
+    stock = StockField()
+
     class Meta:
         model = MaterialStock
-        fields = ["type", "name", "stock", "rate", "brand"]
+        fields = ["product", "type", "name", "stock", "rate", "brand"]
+
+
+class MaterialStockChangeSerializer(MaterialStockResponseSerializer):
+    """
+    Material stock serializer for the changes of a client side cache, the
+    response fields and the id the client keys them by
+    """
+
+    class Meta(MaterialStockResponseSerializer.Meta):
+        fields = ["id"] + MaterialStockResponseSerializer.Meta.fields
+
+
+class ProductSerializer(serializers.ModelSerializer):
+    """
+    Product serializer for return the catalog entries
+    """
+
+    class Meta:
+        model = Product
+        fields = ("id", "type", "name", "brand")
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    """
+    Stock reservation serializer for return the reservations of a buyer
+    """
+
+    class Meta:
+        model = StockReservation
+        fields = ("id", "material", "quantity", "status", "expires_at")
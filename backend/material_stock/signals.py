@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from . import rates
+from .models import MaterialStock
+
+
+@receiver(pre_save, sender=MaterialStock)
+def capture_rate(sender, instance, raw=False, **kwargs):
+    """
+    Remember the stored rate of a material stock before a write
+    """
+    if not raw and instance.id:
+        instance._stored_rate = (
+            MaterialStock.all_objects.filter(id=instance.id)
+            .values_list("rate", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=MaterialStock)
+def record_rate_change(sender, instance, raw=False, **kwargs):
+    """
+    Append a set or changed rate to the rate history of the material
+    """
+    if raw:
+        return
+    stored = instance.__dict__.pop("_stored_rate", None)
+    rates.record([(instance.id, stored, instance.rate)])
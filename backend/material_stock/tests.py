@@ -1 +1,513 @@
-# Create your tests here.
+import datetime
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from my_exceptions import DataNotExist
+from pagination import KeysetPagination
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from shop.models import Shop, ShopType
+from streaming import PARTS_PER_SEND
+from user.authentication import SafeJWTAuthentication
+from user.models import User
+
+from .catalog import product_for, resolve
+from .constants import *
+from .imports import import_materials
+from .models import (
+    MaterialStock,
+    Product,
+    RateHistory,
+    RateRollup,
+    StockReservation,
+)
+from .rates import points, rebuild_rollups, record, trend
+from .reservations import commit, expire, release, reserve
+from .units import format_stock, parse_stock
+
+STOCK = 5.0
+MATERIAL_STOCK_PATH = "/api/v1/civil-service-management/material-stock/"
+SEARCH_PATH = "/api/v1/civil-service-management/material-stock/search"
+
+
+def make_user(number):
+    return User.objects.create(
+        username=f"user-{number}",
+        name=f"user {number}",
+        mobile=9000000000 + number,
+        email=f"user-{number}@example.com",
+    )
+
+
+def asgi_get(path, query_string=""):
+    """
+    Send a GET request through the ASGI application the server runs
+    :return: status code and the whole body, every streamed part joined
+    """
+    from my_civil_service_project.asgi import application
+
+    async def run():
+        communicator = ApplicationCommunicator(
+            application,
+            {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "query_string": query_string.encode(),
+                "headers": [(b"host", b"localhost")],
+            },
+        )
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(10)
+        body = b""
+        while True:
+            message = await communicator.receive_output(10)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        await communicator.wait(10)
+        return start["status"], body
+
+    return async_to_sync(run)()
+
+
+class ImportTestCase(TestCase):
+    """
+    Bulk imports upsert the live stock of a shop on (shop, product)
+    """
+
+    def setUp(self):
+        ShopType.objects.create(name="Cement")
+        self.shop = Shop.objects.create(
+            name="shop", invented_year=2000, user=make_user(0)
+        )
+
+    def import_items(self, *items):
+        return import_materials(
+            (
+                {TYPE: "Cement", NAME: name, BRAND: "ACC", "stock": stock, RATE: 300}
+                for name, stock in items
+            ),
+            self.shop,
+        )
+
+    def live(self):
+        return MaterialStock.objects.filter(shop=self.shop)
+
+    def test_reimport_updates_the_live_row(self):
+        report = self.import_items(("OPC", "10 bags"), ("PPC", "5 bags"), ("", "1"))
+        self.assertEqual((report[CREATED], report[UPDATED]), (2, 0))
+        self.assertEqual([error[ROW] for error in report[ERRORS]], [3])
+        # names match the catalog whatever their spacing
+        report = self.import_items((" OPC ", "4 bags"), ("OPC", "7 bags"))
+        self.assertEqual((report[CREATED], report[UPDATED]), (0, 1))
+        self.assertEqual(self.live().count(), 2)
+        self.assertEqual(self.live().get(product__name="OPC").quantity, 7)
+
+    def test_deleted_row_is_not_revived(self):
+        self.import_items(("OPC", "10 bags"))
+        deleted = self.live().get()
+        self.live().soft_delete()
+        report = self.import_items(("OPC", "3 bags"))
+        self.assertEqual(report[CREATED], 1)
+        self.assertNotEqual(self.live().get().id, deleted.id)
+        deleted = MaterialStock.all_objects.get(id=deleted.id)
+        self.assertEqual((deleted.is_deleted, deleted.quantity), (True, 10))
+
+
+class StockParsingTestCase(SimpleTestCase):
+    """
+    Stock texts split into a number and a unit
+    """
+
+    def test_parse_stock(self):
+        self.assertEqual(parse_stock("50 bags"), (50.0, "bag"))
+        self.assertEqual(parse_stock(" 2.5 Tonnes "), (2.5, "tonne"))
+        self.assertEqual(parse_stock("12pcs"), (12.0, "piece"))
+        self.assertEqual(parse_stock("3 sq ft"), (3.0, "sq ft"))
+        for text in ("bags", "50", "-1 bag", "", None):
+            self.assertIsNone(parse_stock(text))
+
+    def test_format_stock(self):
+        self.assertEqual(format_stock(50.0, "bag"), "50 bag")
+        self.assertEqual(format_stock(2.5, "tonne"), "2.5 tonne")
+
+
+class StockFilterTestCase(TestCase):
+    """
+    Material search filtered and ordered by the stock quantity
+    """
+
+    def setUp(self):
+        shop_type = ShopType.objects.create(name="Cement")
+        shop = Shop.objects.create(name="shop", invented_year=2000, user=make_user(0))
+        for number, quantity in enumerate((0, 5, 1, 2)):
+            MaterialStock.objects.create(
+                product=product_for(shop_type.id, f"OPC {number}", "ACC"),
+                quantity=quantity,
+                unit="bag",
+                shop=shop,
+            )
+        patcher = mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(make_user(1), None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stocks(self, params):
+        response = APIClient().get(SEARCH_PATH, params)
+        self.assertEqual(response.status_code, 200)
+        return [material["stock"] for material in response.data["results"]]
+
+    def test_in_stock_and_minimum(self):
+        self.assertEqual(
+            sorted(self.stocks({IN_STOCK: "true"})), ["1 bag", "2 bag", "5 bag"]
+        )
+        self.assertEqual(sorted(self.stocks({MIN_QUANTITY: "2"})), ["2 bag", "5 bag"])
+
+    def test_ordered_by_quantity(self):
+        self.assertEqual(
+            self.stocks({ORDERING: "quantity"}), ["0 bag", "1 bag", "2 bag", "5 bag"]
+        )
+        self.assertEqual(
+            self.stocks({ORDERING: "-quantity", IN_STOCK: "true", MIN_QUANTITY: "2"}),
+            ["5 bag", "2 bag"],
+        )
+
+
+class RateHistoryTestCase(TestCase):
+    """
+    Rate changes appended to the monthly history and folded into the rollups
+    """
+
+    def setUp(self):
+        shop_type = ShopType.objects.create(name="Cement")
+        self.material = MaterialStock.objects.create(
+            product=product_for(shop_type.id, "OPC", "ACC"),
+            quantity=1,
+            unit="bag",
+            shop=Shop.objects.create(
+                name="shop", invented_year=2000, user=make_user(0)
+            ),
+        )
+        # start from an empty history instead of the rate set on create
+        RateHistory.objects.all().delete()
+        RateRollup.objects.all().delete()
+        self.moments = [
+            timezone.make_aware(datetime.datetime(2030, 1, day, hour))
+            for day, hour in ((5, 10), (5, 12), (20, 9))
+        ]
+        for moment, (old, new) in zip(
+            self.moments, [(None, 300), (300, 320.5), (320.5, 310)]
+        ):
+            record([(self.material.id, old, new)], at=moment)
+        record([(self.material.id, 310, 310)], at=self.moments[-1])
+
+    def test_history_decodes_every_change(self):
+        history = RateHistory.objects.get(material=self.material)
+        self.assertEqual(points(history), list(zip(self.moments, [300, 320.5, 310])))
+
+    def test_trend_and_rebuild(self):
+        days = trend(
+            self.material.id, DAY, datetime.date(2030, 1, 5), datetime.date(2030, 1, 6)
+        )
+        self.assertEqual(
+            [
+                (day[OPEN], day[CLOSE], day[LOW], day[HIGH], day[CHANGES])
+                for day in days
+            ],
+            [(300, 320.5, 300, 320.5, 2), (320.5, 320.5, 320.5, 320.5, 0)],
+        )
+        month = trend(
+            self.material.id,
+            MONTH,
+            datetime.date(2030, 1, 1),
+            datetime.date(2030, 1, 31),
+        )
+        self.assertEqual(month[0][AVERAGE], round((300 + 320.5 + 310) / 3, 2))
+        weeks = trend(
+            self.material.id,
+            WEEK,
+            datetime.date(2030, 1, 1),
+            datetime.date(2030, 1, 31),
+        )
+        self.assertEqual([week[CHANGES] for week in weeks], [2, 0, 1, 0, 0])
+        rebuild_rollups([self.material.id])
+        self.assertEqual(
+            trend(
+                self.material.id,
+                WEEK,
+                datetime.date(2030, 1, 1),
+                datetime.date(2030, 1, 31),
+            ),
+            weeks,
+        )
+
+
+class CatalogTestCase(TestCase):
+    """
+    Products shared by the stocks of every shop
+    """
+
+    def setUp(self):
+        self.type_id = ShopType.objects.create(name="Cement").id
+
+    def test_resolve_adds_only_new_products(self):
+        opc = product_for(self.type_id, " OPC  53 ", "ACC")
+        keys = [(self.type_id, "OPC 53", "ACC"), (self.type_id, "PPC", "ACC")]
+        with self.assertNumQueries(2):
+            products = resolve(keys)
+        self.assertEqual(products[keys[0]], opc.id)
+        self.assertEqual(resolve(keys + keys), products)
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_search_by_product_across_shops(self):
+        opc = product_for(self.type_id, "OPC", "ACC")
+        for number in range(2):
+            shop = Shop.objects.create(
+                name="shop", invented_year=2000, user=make_user(number)
+            )
+            for product in (opc, product_for(self.type_id, "OPC", "Ramco")):
+                MaterialStock.objects.create(
+                    product=product, quantity=1, unit="bag", shop=shop
+                )
+        with mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(make_user(2), None)
+        ):
+            response = APIClient().get(SEARCH_PATH, {PRODUCT: opc.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (material[NAME], material[BRAND])
+                for material in response.data["results"]
+            ],
+            [("OPC", "ACC"), ("OPC", "ACC")],
+        )
+
+
+class PaginationTestCase(TestCase):
+    """
+    Keyset pages walked forwards and back visit every row once, in order
+    """
+
+    def setUp(self):
+        shop_type = ShopType.objects.create(name="Cement")
+        shop = Shop.objects.create(name="shop", invented_year=2000, user=make_user(0))
+        for number in range(11):
+            MaterialStock.objects.create(
+                product=product_for(shop_type.id, f"OPC {number}", "ACC"),
+                quantity=number % 4,
+                unit="bag",
+                shop=shop,
+            )
+        # rows sharing the ordering value are told apart by their id
+        ids = MaterialStock.objects.order_by("id").values_list("id", flat=True)
+        MaterialStock.objects.filter(id__in=list(ids[:6])).update(
+            created_at=timezone.now()
+        )
+
+    def page(self, paginator, url):
+        request = Request(APIRequestFactory().get(url))
+        rows = paginator.paginate_queryset(MaterialStock.objects.all(), request)
+        return (
+            [row.id for row in rows],
+            paginator.get_next_link(),
+            paginator.get_previous_link(),
+        )
+
+    def assertWalks(self, make_paginator, *ordering):
+        expected = list(
+            MaterialStock.objects.order_by(*ordering).values_list("id", flat=True)
+        )
+        pages, url = [], "/materials?page_size=3"
+        while url:
+            ids, url, previous = self.page(make_paginator(), url)
+            pages.append(ids)
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 3, 2])
+        self.assertEqual(sum(pages, []), expected)
+        # back to the first page from the previous link of the last one
+        backwards, url = [], previous
+        while url:
+            ids, _, url = self.page(make_paginator(), url)
+            backwards.insert(0, ids)
+        self.assertEqual(backwards, pages[:-1])
+
+    def test_created_at_newest_first(self):
+        self.assertWalks(KeysetPagination, "-created_at", "-id")
+
+    def test_quantity_ascending(self):
+        self.assertWalks(
+            lambda: KeysetPagination(ordering=(QUANTITY, ID), descending=False),
+            QUANTITY,
+            ID,
+        )
+
+
+class StreamTestCase(TransactionTestCase):
+    """
+    Streamed lists served by the ASGI application match the paged ones
+    """
+
+    def setUp(self):
+        owner = make_user(0)
+        shop_type = ShopType.objects.create(name="Cement")
+        shop = Shop.objects.create(name="shop", invented_year=2000, user=owner)
+        for number in range(25):
+            MaterialStock.objects.create(
+                product=product_for(shop_type.id, f"OPC {number}", "ACC"),
+                quantity=number,
+                unit="bag",
+                rate=300 + number,
+                shop=shop,
+            )
+        patcher = mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(owner, None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertStreamMatchesPages(self, path):
+        status, body = asgi_get(path, "page_size=100")
+        self.assertEqual(status, 200)
+        paged = json.loads(body)["results"]
+        self.assertEqual(len(paged), 25)
+        # in one read off the worker thread and in many
+        for parts in (PARTS_PER_SEND, 4):
+            with mock.patch("streaming.PARTS_PER_SEND", parts):
+                status, body = asgi_get(path, "stream=true")
+            self.assertEqual(status, 200)
+            self.assertEqual(json.loads(body), paged)
+
+    def test_material_stock_list(self):
+        self.assertStreamMatchesPages(MATERIAL_STOCK_PATH)
+
+    def test_material_search(self):
+        self.assertStreamMatchesPages(SEARCH_PATH)
+
+
+class ReservationRaceTestCase(TransactionTestCase):
+    """
+    Reserve, commit, release and expire of stock from concurrent connections
+    """
+
+    def setUp(self):
+        self.buyer = make_user(0)
+        shop_type = ShopType.objects.create(name="Cement")
+        self.material = MaterialStock.objects.create(
+            product=product_for(shop_type.id, "OPC", "ACC"),
+            quantity=STOCK,
+            unit="bag",
+            shop=Shop.objects.create(name="shop", invented_year=2000, user=self.buyer),
+        )
+
+    def left(self):
+        self.material.refresh_from_db()
+        return self.material.quantity
+
+    def in_parallel(self, function, times):
+        def run(_):
+            try:
+                return function()
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=times) as pool:
+            return list(pool.map(run, range(times)))
+
+    def hold_lock(self, function):
+        """
+        Run function in a transaction on another connection and keep it open
+        :return: event that ends the transaction and the thread running it
+        """
+        locked, finish = threading.Event(), threading.Event()
+
+        def run():
+            try:
+                with transaction.atomic():
+                    function()
+                    locked.set()
+                    finish.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.assertTrue(locked.wait(10))
+        return finish, thread
+
+    def test_concurrent_buyers_never_oversell(self):
+        def buy():
+            try:
+                reserve(self.material.id, self.buyer.id, 1)
+                return True
+            except DataNotExist:
+                return False
+
+        self.assertEqual(sum(self.in_parallel(buy, 12)), STOCK)
+        self.assertEqual(self.left(), 0)
+        self.assertEqual(StockReservation.objects.filter(status=HELD).count(), STOCK)
+
+    def test_expiry_skips_a_reservation_being_committed(self):
+        reservation = reserve(self.material.id, self.buyer.id, 2)
+        finish, thread = self.hold_lock(lambda: commit(reservation.id, self.buyer.id))
+        later = reservation.expires_at + datetime.timedelta(seconds=1)
+        with mock.patch("material_stock.reservations.timezone.now", return_value=later):
+            self.assertEqual(expire(10), 0)
+            finish.set()
+            thread.join()
+            self.assertEqual(expire(10), 0)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, COMMITTED)
+        self.assertEqual(self.left(), STOCK - 2)
+
+    def test_expired_reservation_can_not_be_committed(self):
+        reservation = reserve(self.material.id, self.buyer.id, 2)
+        StockReservation.objects.filter(id=reservation.id).update(
+            expires_at=timezone.now()
+        )
+        with self.assertRaises(DataNotExist):
+            commit(reservation.id, self.buyer.id)
+        self.assertEqual(expire(10), 1)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, EXPIRED)
+        self.assertEqual(self.left(), STOCK)
+
+    def test_release_and_expiry_restock_once(self):
+        reservation = reserve(self.material.id, self.buyer.id, 2)
+        StockReservation.objects.filter(id=reservation.id).update(
+            expires_at=timezone.now()
+        )
+        finish, thread = self.hold_lock(lambda: release(reservation.id, self.buyer.id))
+        self.assertEqual(expire(10), 0)
+        finish.set()
+        thread.join()
+        self.assertEqual(expire(10), 0)
+        with self.assertRaises(DataNotExist):
+            release(reservation.id, self.buyer.id)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, RELEASED)
+        self.assertEqual(self.left(), STOCK)
+
+    def test_concurrent_sweepers_expire_each_reservation_once(self):
+        for _ in range(int(STOCK)):
+            reserve(self.material.id, self.buyer.id, 1)
+        StockReservation.objects.update(expires_at=timezone.now())
+
+        def sweep():
+            expired = 0
+            while True:
+                batch = expire(2)
+                if not batch:
+                    return expired
+                expired += batch
+
+        self.assertEqual(sum(self.in_parallel(sweep, 4)), STOCK)
+        self.assertEqual(StockReservation.objects.filter(status=EXPIRED).count(), STOCK)
+        self.assertEqual(self.left(), STOCK)
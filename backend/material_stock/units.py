@@ -0,0 +1,82 @@
+import re
+
+STOCK_PATTERN = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)\s*([A-Za-z][A-Za-z\s]*?)\s*$")
+
+# spellings shops use -> the unit stored
+UNITS = {
+    "bag": "bag",
+    "bags": "bag",
+    "box": "box",
+    "boxes": "box",
+    "bundle": "bundle",
+    "bundles": "bundle",
+    "roll": "roll",
+    "rolls": "roll",
+    "piece": "piece",
+    "pieces": "piece",
+    "pc": "piece",
+    "pcs": "piece",
+    "no": "piece",
+    "nos": "piece",
+    "unit": "piece",
+    "units": "piece",
+    "kg": "kg",
+    "kgs": "kg",
+    "kilo": "kg",
+    "kilos": "kg",
+    "kilogram": "kg",
+    "kilograms": "kg",
+    "g": "g",
+    "gram": "g",
+    "grams": "g",
+    "ton": "tonne",
+    "tons": "tonne",
+    "tonne": "tonne",
+    "tonnes": "tonne",
+    "l": "litre",
+    "ltr": "litre",
+    "ltrs": "litre",
+    "litre": "litre",
+    "litres": "litre",
+    "liter": "litre",
+    "liters": "litre",
+    "m": "metre",
+    "mtr": "metre",
+    "mtrs": "metre",
+    "metre": "metre",
+    "metres": "metre",
+    "meter": "metre",
+    "meters": "metre",
+    "ft": "foot",
+    "foot": "foot",
+    "feet": "foot",
+    "load": "load",
+    "loads": "load",
+}
+
+
+def normalize_unit(unit):
+    """
+    Lower case a unit, fold its spellings and plurals into one name
+    """
+    unit = " ".join(unit.lower().split())
+    return UNITS.get(unit, unit)
+
+
+def parse_stock(text):
+    """
+    Split a stock text such as "50 bags" into a quantity and a unit
+    :param text: stock as entered by the shop
+    :return: (quantity, unit), None when the text is not a number then a unit
+    """
+    match = STOCK_PATTERN.match(str(text)) if text is not None else None
+    if match is None:
+        return None
+    return float(match.group(1)), normalize_unit(match.group(2))
+
+
+def format_stock(quantity, unit):
+    """
+    Stock text shown to clients, "50 bag" for 50.0 and "bag"
+    """
+    return f"{quantity:g} {unit}".strip()
@@ -2,7 +2,19 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import MaterialStockViewSets, SearchMaterial, delete_material_stock
+from .views import (
+    CommitReservation,
+    ImportMaterialStock,
+    MaterialPrices,
+    MaterialRateTrend,
+    MaterialStockChanges,
+    MaterialStockViewSets,
+    ReleaseReservation,
+    ReserveMaterialStock,
+    SearchMaterial,
+    SearchProduct,
+    delete_material_stock,
+)
 
 router = DefaultRouter()
 router.register("api/v1/civil-service-management/material-stock", MaterialStockViewSets)
@@ -18,4 +30,36 @@ urlpatterns = [
         "api/v1/civil-service-management/material-stock/search",
         SearchMaterial.as_view(),
     ),
+    path(
+        "api/v1/civil-service-management/material-stock/import/<int:pk>",
+        ImportMaterialStock.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/reserve/<int:pk>",
+        ReserveMaterialStock.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/reservation/<int:pk>/commit",
+        CommitReservation.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/reservation/<int:pk>/release",
+        ReleaseReservation.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/rates/<int:pk>",
+        MaterialRateTrend.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/prices",
+        MaterialPrices.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/products",
+        SearchProduct.as_view(),
+    ),
+    path(
+        "api/v1/civil-service-management/material-stock/changes",
+        MaterialStockChanges.as_view(),
+    ),
 ]
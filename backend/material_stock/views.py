@@ -1,4 +1,9 @@
+import datetime
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
 from my_exceptions import DataNotExist
+from pagination import KeysetPagination, paginated_response
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -6,19 +11,35 @@ from rest_framework.decorators import (
     permission_classes,
 )
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from search.constants import ENTITY_ID, MATERIAL_STOCK
+from search.documents import live_documents, paginated_documents
+from search.prices import price_summary
 from shop.models import Shop, ShopType
+from streaming import TRUE_VALUES, streaming_response, wants_stream
+from sync import changes_response
 from user.authentication import SafeJWTAuthentication
 from user.models import User
 from user.permissions import IsShopOwner
 
+from .catalog import normalize
 from .constants import *
-from .models import MaterialStock
+from .imports import import_materials, read_rows
+from .models import MaterialStock, Product
 from .my_logger import logger
-from .serializers import MaterialStockResponseSerializer, MaterialStockSerializer
+from .rates import count_periods, trend
+from .reservations import commit, release, reserve
+from .serializers import (
+    MaterialStockChangeSerializer,
+    MaterialStockResponseSerializer,
+    MaterialStockSerializer,
+    ProductSerializer,
+    StockReservationSerializer,
+)
 
 
 class MaterialStockViewSets(ModelViewSet):
@@ -29,7 +50,7 @@ class MaterialStockViewSets(ModelViewSet):
     Also, this class manage the all crud requests from end material stack.
     """
 
-    queryset = MaterialStock.objects.filter(is_deleted=False)
+    queryset = MaterialStock.objects.all().select_related(PRODUCT)
     serializer_class = MaterialStockSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsShopOwner,)
@@ -45,9 +66,9 @@ class MaterialStockViewSets(ModelViewSet):
                  else return error message with status code
         """
         try:
-            shop = Shop.objects.get(is_deleted=False, id=request.data[SHOP])
+            shop = Shop.objects.get(id=request.data[SHOP])
             type = {"Electrical": 1, "Plumbing": 2, "Raw Material": 3}
-            created_by = User.objects.get(is_deleted=False, id=shop.user.id)
+            created_by = User.objects.get(id=shop.user.id)
             request.data[TYPE] = type[request.data[TYPE]]
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -85,17 +106,15 @@ class MaterialStockViewSets(ModelViewSet):
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
+            if wants_stream(request):
                 logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(MATERIALS_DOES_NOT_EXIST)
+                return streaming_response(queryset, self.get_serializer_class())
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(MATERIAL_STOCK_NOT_EXIST)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -112,7 +131,7 @@ class MaterialStockViewSets(ModelViewSet):
         try:
             updated_by = request.headers.get(USER_ID)
             instance = self.get_object()
-            instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
+            instance.updated_by = User.objects.get(id=updated_by)
             serializer = self.get_serializer(instance, data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
@@ -143,10 +162,7 @@ def delete_material_stock(request, pk):
              else return error message with status code
     """
     try:
-        material_stock = MaterialStock.objects.get(pk=pk)
-        if not material_stock.is_deleted:
-            material_stock.is_deleted = True
-            MaterialStock.save(material_stock)
+        if MaterialStock.objects.filter(pk=pk).soft_delete():
             logger.info(DELETED_SUCCESS)
             return Response({DETAIL: DELETED_SUCCESS})
         else:
@@ -168,33 +184,32 @@ class SearchMaterial(APIView):
     def get(request):
         """
         search all materials by their material_stock
-        :param request: get request
+        :param request: get request, `product` keeps the stocks of one catalog
+                        product, the `in_stock`, `min_quantity` and
+                        `ordering=quantity` or `-quantity` query parameters
+                        filter and sort by the stock quantity
         :return: list of materials else return .DoesNotExist exception
         """
         try:
             if request.data:
-
-                material_stock = {}
+                material_documents = live_documents(MATERIAL_STOCK)
+                documents = None
                 if TYPE in request.data and len(request.data) == 1:
                     shop_type = request.data[TYPE]
                     shop = ShopType.objects.filter(name=shop_type)
                     if not shop:
                         raise DataNotExist(SHOP_NOT_EXIST)
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False, type=shop[0].__dict__[ID]
+                    documents = material_documents.filter(
+                        shop_types__contains=[shop[0].id]
                     )
 
                 elif BRAND in request.data and len(request.data) == 1:
                     brand = request.data[BRAND]
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False, brand=brand
-                    )
+                    documents = material_documents.filter(brand=brand)
 
-                elif BRAND in request.data and len(request.data) == 1:
+                elif NAME in request.data and len(request.data) == 1:
                     name = request.data[NAME]
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False, name=name
-                    )
+                    documents = material_documents.filter(name=name)
 
                 elif BRAND and TYPE in request.data and len(request.data) == 2:
                     shop_type = request.data[TYPE]
@@ -202,8 +217,8 @@ class SearchMaterial(APIView):
                     shop = ShopType.objects.filter(name=shop_type)
                     if not shop:
                         raise DataNotExist(SHOP_NOT_EXIST)
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False, type=shop[0].__dict__[ID], brand=brand
+                    documents = material_documents.filter(
+                        shop_types__contains=[shop[0].id], brand=brand
                     )
 
                 elif NAME and TYPE in request.data and len(request.data) == 2:
@@ -212,16 +227,14 @@ class SearchMaterial(APIView):
                     shop = ShopType.objects.filter(name=shop_type)
                     if not shop:
                         raise DataNotExist(SHOP_NOT_EXIST)
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False, type=shop[0].__dict__[ID], name=name
+                    documents = material_documents.filter(
+                        shop_types__contains=[shop[0].id], name=name
                     )
 
                 elif NAME and BRAND in request.data and len(request.data) == 2:
                     name = request.data[NAME]
                     brand = request.data[BRAND]
-                    material_stock = MaterialStock.objects.filter(
-                        name=name, brand=brand, is_deleted=False
-                    )
+                    documents = material_documents.filter(name=name, brand=brand)
 
                 elif NAME and BRAND and TYPE in request.data and len(request.data) == 3:
                     shop_type = request.data[TYPE]
@@ -230,40 +243,331 @@ class SearchMaterial(APIView):
                     shop = ShopType.objects.filter(name=shop_type)
                     if not shop:
                         raise DataNotExist(SHOP_NOT_EXIST)
-                    material_stock = MaterialStock.objects.filter(
-                        is_deleted=False,
-                        type=shop[0].__dict__[ID],
+                    documents = material_documents.filter(
+                        shop_types__contains=[shop[0].id],
                         brand=brand,
                         name=name,
                     )
 
-                if not material_stock:
+                if documents is None:
                     raise DataNotExist(DATA_NOT_FOUND)
-
-                page = MaterialStock.paginate_queryset(material_stock)
-                if page is not None:
-                    serializer = MaterialStockResponseSerializer(page, many=True)
+            else:
+                documents = live_documents(MATERIAL_STOCK)
+            # conditions on the stock row itself, checked per document
+            stock = Q()
+            params = request.query_params
+            if PRODUCT in params:
+                try:
+                    product_id = int(params[PRODUCT])
+                except ValueError:
+                    raise DataNotExist(INVALID_PRODUCT)
+                stock &= Q(product_id=product_id)
+            if params.get(IN_STOCK, "").lower() in TRUE_VALUES:
+                stock &= Q(quantity__gt=0)
+            if MIN_QUANTITY in params:
+                try:
+                    minimum = float(params[MIN_QUANTITY])
+                except ValueError:
+                    raise DataNotExist(INVALID_QUANTITY)
+                stock &= Q(quantity__gte=minimum)
+            materials = MaterialStock.objects.select_related(PRODUCT)
+            if wants_stream(request) or params.get(ORDERING) in QUANTITY_ORDERINGS:
+                # keyed on the stock table, each row probes its document
+                material_stock = materials.filter(
+                    stock, Exists(documents.filter(entity_id=OuterRef(ID)))
+                )
+                if wants_stream(request):
                     logger.info(RETRIEVED_SUCCESS)
-                    return MaterialStock.get_paginated_response(serializer.data)
+                    return streaming_response(
+                        material_stock, MaterialStockResponseSerializer
+                    )
+                response = paginated_response(
+                    request,
+                    material_stock,
+                    MaterialStockResponseSerializer,
+                    DATA_NOT_FOUND,
+                    KeysetPagination(
+                        ordering=(QUANTITY, ID),
+                        descending=QUANTITY_ORDERINGS[params[ORDERING]],
+                    ),
+                )
+            else:
+                if stock:
+                    documents = documents.filter(
+                        Exists(
+                            MaterialStock.objects.filter(stock, id=OuterRef(ENTITY_ID))
+                        )
+                    )
+                response = paginated_documents(
+                    request,
+                    documents,
+                    materials,
+                    MaterialStockResponseSerializer,
+                    DATA_NOT_FOUND,
+                )
+            logger.info(RETRIEVED_SUCCESS)
+            return response
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
-                serializer = MaterialStockResponseSerializer(material_stock, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data, status=status.HTTP_200_OK)
 
-            else:
-                queryset = MaterialStock.objects.filter(is_deleted=False)
-                if queryset:
-                    page = MaterialStock.paginate_queryset(queryset)
+class ImportMaterialStock(APIView):
+    """
+    Api view class for bulk import the material stocks of a shop
+    """
 
-                    if page is not None:
-                        serializer = MaterialStockResponseSerializer(page, many=True)
-                        logger.info(RETRIEVED_SUCCESS)
-                        return MaterialStock.get_paginated_response(serializer.data)
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsShopOwner,)
+    parser_classes = (JSONParser,)
 
-                    serializer = MaterialStockResponseSerializer(queryset, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(serializer.data)
+    @staticmethod
+    def post(request, pk):
+        """
+        upsert many material stocks of the shop on (shop, name, brand)
+        :param request: post request with a CSV, NDJSON or JSON array body of
+                        items with type, name, stock, rate and brand
+        :param pk: id of a shop of the requesting shop owner
+        :return: created and updated counts and the errors of rejected rows
+        """
+        try:
+            # only the owner of the shop may stock it
+            shop = Shop.objects.filter(id=pk, user_id=request.user.id).first()
+            if shop is None:
+                logger.error(SHOP_NOT_EXIST)
+                return Response(
+                    {DETAIL: SHOP_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND
+                )
+            report = import_materials(read_rows(request), shop)
+            logger.info(IMPORTED_SUCCESS)
+            return Response(report, status=status.HTTP_200_OK)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class ReserveMaterialStock(APIView):
+    """
+    Api view class for hold some stock of a material
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def post(request, pk):
+        """
+        take the quantity off the material stock until committed or expired
+        :param request: post request with `quantity` and an optional `ttl` in seconds
+        :param pk: id of the material stock
+        :return: the held reservation
+        """
+        try:
+            try:
+                quantity = float(request.data[QUANTITY])
+                ttl = int(request.data.get(TTL, DEFAULT_RESERVATION_TTL))
+            except (KeyError, TypeError, ValueError):
+                raise DataNotExist(INVALID_RESERVATION)
+            if quantity <= 0 or not 0 < ttl <= MAX_RESERVATION_TTL:
+                raise DataNotExist(INVALID_RESERVATION)
+            reservation = reserve(pk, request.user.id, quantity, ttl)
+            logger.info(RESERVED_SUCCESS)
+            return Response(
+                StockReservationSerializer(reservation).data,
+                status=status.HTTP_201_CREATED,
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class CommitReservation(APIView):
+    """
+    Api view class for keep the stock of a reservation
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def put(request, pk):
+        """
+        commit a held reservation of the buyer
+        :param request: put request
+        :param pk: id of the reservation
+        :return: success message
+        """
+        try:
+            commit(pk, request.user.id)
+            logger.info(COMMITTED_SUCCESS)
+            return Response({DETAIL: COMMITTED_SUCCESS}, status=status.HTTP_200_OK)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class ReleaseReservation(APIView):
+    """
+    Api view class for give back the stock of a reservation
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def put(request, pk):
+        """
+        release a held reservation of the buyer
+        :param request: put request
+        :param pk: id of the reservation
+        :return: success message
+        """
+        try:
+            release(pk, request.user.id)
+            logger.info(RELEASED_SUCCESS)
+            return Response({DETAIL: RELEASED_SUCCESS}, status=status.HTTP_200_OK)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
+
+class MaterialRateTrend(APIView):
+    """
+    Api view class for the rate trend of a material
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request, pk):
+        """
+        rate of the material per day, week or month read off the rate rollups
+        :param request: get request with optional `granularity` (day, week or
+                        month) and `from`, `to` dates as YYYY-MM-DD
+        :param pk: id of the material stock
+        :return: open, close, low, high and average rate per period
+        """
+        try:
+            params = request.query_params
+            granularity = params.get(GRANULARITY, DAY)
+            try:
+                end = datetime.date.fromisoformat(
+                    params.get(TO) or timezone.localdate().isoformat()
+                )
+                start = datetime.date.fromisoformat(
+                    params.get(FROM)
+                    or (
+                        end - datetime.timedelta(days=DEFAULT_TREND_DAYS[granularity])
+                    ).isoformat()
+                )
+            except (KeyError, ValueError):
+                raise DataNotExist(INVALID_TREND)
+            if start > end:
+                raise DataNotExist(INVALID_TREND)
+            if count_periods(granularity, start, end) > MAX_TREND_PERIODS:
+                raise DataNotExist(TOO_MANY_PERIODS)
+            if not MaterialStock.objects.filter(id=pk).exists():
                 raise DataNotExist(MATERIAL_STOCK_NOT_EXIST)
+            periods = trend(pk, granularity, start, end)
+            logger.info(TREND_RETRIEVED)
+            return Response(
+                {ID: pk, GRANULARITY: granularity, RATE: periods},
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class MaterialPrices(APIView):
+    """
+    Api view class for the rate summary of a material type in a city
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        low, average and high rate per brand read off the price rollups
+        :param request: get request with `type` (shop type name), `city` and
+                        an optional `brand`
+        :return: list of brands with their rate summary
+        """
+        try:
+            params = request.query_params
+            if not params.get(TYPE) or not params.get(CITY):
+                raise DataNotExist(INVALID_PRICE_QUERY)
+            shop_type = ShopType.objects.filter(name=params[TYPE]).first()
+            if shop_type is None:
+                raise DataNotExist(SHOP_NOT_EXIST)
+            summary = price_summary(shop_type.id, params[CITY], params.get(BRAND))
+            if not summary:
+                raise DataNotExist(NO_PRICES)
+            logger.info(PRICES_RETRIEVED)
+            return Response(
+                {TYPE: shop_type.name, CITY: params[CITY], RATE: summary},
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class SearchProduct(APIView):
+    """
+    Api view class for look up products in the catalog
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        catalog products by their exact name and optionally brand and type,
+        the ids found filter the material search with `product`
+        :param request: get request with `name` and optional `brand`, `type`
+        :return: list of products else return .DoesNotExist exception
+        """
+        try:
+            params = request.query_params
+            if not params.get(NAME):
+                raise DataNotExist(PRODUCT_NOT_EXIST)
+            products = Product.objects.filter(name=normalize(params[NAME]))
+            if params.get(BRAND):
+                products = products.filter(brand=normalize(params[BRAND]))
+            if params.get(TYPE):
+                products = products.filter(type__name=params[TYPE])
+            response = paginated_response(
+                request,
+                products,
+                ProductSerializer,
+                PRODUCT_NOT_EXIST,
+            )
+            logger.info(PRODUCTS_RETRIEVED)
+            return response
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class MaterialStockChanges(APIView):
+    """
+    Api view class for the material stock changes of a client side cache
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        material stocks created, updated or deleted since the cursor, oldest first
+        :param request: get request with the `since` cursor of the last pull
+        :return: changed material stocks, ids of the deleted ones and the next cursor
+        """
+        try:
+            response = changes_response(
+                request,
+                MaterialStock.all_objects.select_related(PRODUCT),
+                MaterialStockChangeSerializer,
+            )
+            logger.info(CHANGES_RETRIEVED)
+            return response
         except Exception as e:
             raise DataNotExist(e.__str__())
@@ -1 +1,57 @@
-
\ No newline at end of file
+from django.db import connection, models
+from django.dispatch import Signal
+
+# sent with the model class and the ids of the rows a set based soft delete
+# marked deleted, the save signals never fire for them
+soft_deleted = Signal()
+
+# condition of the partial indexes over the live rows only
+LIVE = models.Q(is_deleted=False)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Queryset of a soft deletable model
+    """
+
+    def soft_delete(self):
+        """
+        Mark the live rows of the queryset deleted with one UPDATE
+        :return: ids of the rows this call deleted
+        """
+        sql, params = self.filter(is_deleted=False).values("pk").query.sql_with_params()
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET is_deleted = true, updated_at = now() "
+                f"WHERE id IN ({sql}) AND NOT is_deleted RETURNING id",
+                params,
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            soft_deleted.send(sender=self.model, ids=ids)
+        return ids
+
+
+class LiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Manager of the rows not soft deleted
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Base of the models deleted by flagging `is_deleted`, `objects` only
+    sees the live rows and `all_objects` sees every row
+    """
+
+    is_deleted = models.BooleanField(editable=False, default=False)
+
+    objects = LiveManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
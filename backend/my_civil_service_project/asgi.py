@@ -9,8 +9,25 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "my_civil_service_project.settings")
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from streaming import StreamingASGIHandler  # noqa: E402 needs the apps loaded
+
+# the handler get_asgi_application returns, reading streamed lists off the
+# event loop
+django_application = StreamingASGIHandler()
+
+# uvicorn serves no static files, in development serve them the way
+# runserver does so the admin keeps its styles and scripts
+if settings.DEBUG:
+    django_application = ASGIStaticFilesHandler(django_application)
+
+from job.sse import with_event_stream  # noqa: E402 needs the apps loaded
+
+application = with_event_stream(django_application)
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "user",
     "job",
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
     "address",
     "profession",
     "material_stock",
+    "search",
     "oauth2_provider",
 ]
 
@@ -93,6 +95,22 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/#database-caching
+# shared by every process serving the site, so an aggregate warmed by the
+# warm_estimates command is read by all of them, the table is made by
+# `manage.py createcachetable`
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache_entry",
+        # one entry per work type and city and one per city, the default of
+        # 300 would cull the warmed aggregates
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -140,6 +158,8 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "EXCEPTION_HANDLER": "api_response.custom_exception_handler",
+    "DEFAULT_PAGINATION_CLASS": "pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
 }
 
 OAUTH2_PROVIDER = {
@@ -25,4 +25,5 @@ urlpatterns = [
     path("", include("address.urls")),
     path("", include("profession.urls")),
     path("", include("material_stock.urls")),
+    path("", include("search.urls")),
 ]
@@ -0,0 +1,181 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from my_exceptions import DataNotExist
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+INVALID_CURSOR = "Invalid cursor"
+
+
+def encode_cursor(payload):
+    """
+    Turn a cursor payload into an opaque url safe token
+    """
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Read back a token made by encode_cursor
+    :raise NotFound: when the token was not made by encode_cursor
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        raise NotFound(INVALID_CURSOR)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on (created_at, id), newest first.
+    A page is read with `WHERE (created_at, id) < cursor ORDER BY ... LIMIT`,
+    so every page costs one index range scan whatever its depth.
+    Another (value, id) key can be given, such as ("quantity", "id").
+    """
+
+    ordering = ("created_at", "id")
+    descending = True
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self, ordering=None, descending=None):
+        if ordering is not None:
+            self.ordering = ordering
+        if descending is not None:
+            self.descending = descending
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        token = request.query_params.get(self.cursor_query_param)
+        position, reverse = None, False
+        if token:
+            cursor = decode_cursor(token)
+            try:
+                position = (self.decode_value(cursor["t"]), int(cursor["i"]))
+                reverse = bool(cursor.get("r"))
+            except (KeyError, TypeError, ValueError):
+                raise NotFound(INVALID_CURSOR)
+            if position[0] is None:
+                raise NotFound(INVALID_CURSOR)
+            queryset = queryset.filter(self.seek(position, reverse))
+
+        time_field, id_field = self.ordering
+        if self.descending != reverse:
+            queryset = queryset.order_by(f"-{time_field}", f"-{id_field}")
+        else:
+            queryset = queryset.order_by(time_field, id_field)
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = (has_more and not reverse) or (reverse and position is not None)
+        self.has_previous = (has_more and reverse) or (
+            not reverse and position is not None
+        )
+        self.page = rows
+        return rows
+
+    def seek(self, position, reverse):
+        """
+        Condition selecting the rows after (or before, when reverse) the cursor
+        """
+        created_at, pk = position
+        time_field, id_field = self.ordering
+        lookup = "lt" if self.descending != reverse else "gt"
+        return Q(**{f"{time_field}__{lookup}": created_at}) | Q(
+            **{time_field: created_at, f"{id_field}__{lookup}": pk}
+        )
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def position_of(self, row):
+        time_field, id_field = self.ordering
+        value = getattr(row, time_field)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        return value, getattr(row, id_field)
+
+    @staticmethod
+    def decode_value(value):
+        """
+        Timestamps travel in the cursor as ISO strings, numbers as they are
+        """
+        return parse_datetime(value) if isinstance(value, str) else value
+
+    def get_link(self, row, reverse):
+        created_at, pk = self.position_of(row)
+        token = encode_cursor({"t": created_at, "i": pk, "r": int(reverse)})
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+
+def paginated_response(
+    request, queryset, serializer_class, empty_message, paginator=None
+):
+    """
+    Keyset paginate a search queryset from a plain APIView
+    :param request: search request, may carry `cursor` and `page_size`
+    :param queryset: filtered queryset
+    :param serializer_class: serializer of the page rows
+    :param empty_message: error message when nothing matches
+    :param paginator: pagination of another key than (created_at, id)
+    :return: paginated response
+    """
+    paginator = paginator or KeysetPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    if not page:
+        raise DataNotExist(empty_message)
+    serializer = serializer_class(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
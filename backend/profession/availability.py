@@ -0,0 +1,156 @@
+import datetime
+import operator
+from functools import reduce
+
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q
+from job.constants import CLOSED
+from job.models import Job
+from my_exceptions import DataNotExist
+from psycopg2.extras import DateRange, execute_values
+
+from .constants import *
+from .models import WorkerAvailability
+
+MARK_BUSY_SQL = f"""
+    INSERT INTO {WORKER_AVAILABILITY} (worker_id, month, busy_days)
+    VALUES %s
+    ON CONFLICT (month, worker_id) DO UPDATE
+        SET busy_days = {WORKER_AVAILABILITY}.busy_days | EXCLUDED.busy_days
+"""
+
+
+RELEASE_SQL = f"""
+    UPDATE {WORKER_AVAILABILITY} AS availability
+        SET busy_days = availability.busy_days & ~freed.mask
+    FROM (VALUES %s) AS freed (worker_id, month, mask)
+    WHERE availability.worker_id = freed.worker_id
+        AND availability.month = freed.month
+"""
+
+
+def month_masks(start, days):
+    """
+    Split a period into the months it touches
+    :param start: first day of the period
+    :param days: number of days of the period, at most MAX_WORKING_DAYS
+    :return: dict of first day of month -> bitmask of the period days in it
+    :raise DataNotExist: when the period is empty or longer than allowed
+    """
+    if not 0 < days <= MAX_WORKING_DAYS:
+        raise DataNotExist(INVALID_PERIOD)
+    masks = {}
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        month = day.replace(day=1)
+        masks[month] = masks.get(month, 0) | 1 << (day.day - 1)
+    return masks
+
+
+def mark_busy(worker_ids, start, days):
+    """
+    Book workers for a period, OR-ing the period into their month bitmaps
+    :param worker_ids: ids of the booked workers
+    :param start: first day of the booking
+    :param days: number of days booked
+    """
+    rows = booking_rows((worker_id, start, days) for worker_id in worker_ids)
+    if rows:
+        with connection.cursor() as cursor:
+            execute_values(cursor, MARK_BUSY_SQL, rows)
+
+
+def booking_rows(bookings):
+    """
+    Month bitmap rows of many bookings, the masks of one worker and month OR-ed
+    :param bookings: iterable of (worker id, first day, days)
+    :return: list of (worker id, month, mask)
+    """
+    masks = {}
+    for worker_id, start, days in bookings:
+        for month, mask in month_masks(start, days).items():
+            masks[worker_id, month] = masks.get((worker_id, month), 0) | mask
+    return [(worker_id, month, mask) for (worker_id, month), mask in masks.items()]
+
+
+def release(bookings, given_up=()):
+    """
+    Free workers for the periods of bookings given up, AND-ing the periods out
+    of their month bitmaps, then book again the days their other live jobs
+    still hold. Three queries whatever the number of bookings.
+    :param bookings: iterable of (worker id, first day, days) given up
+    :param given_up: ids of the jobs the bookings came from
+    """
+    rows = booking_rows(bookings)
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        execute_values(cursor, RELEASE_SQL, rows)
+    months = sorted({month for _, month, _ in rows})
+    last = months[-1]
+    held = (
+        Job.acceptor.through.objects.filter(
+            user_id__in={worker_id for worker_id, _, _ in rows},
+            job__is_deleted=False,
+            job__working_days__range=(1, MAX_WORKING_DAYS),
+            job__work_period__overlap=DateRange(
+                months[0], (last + datetime.timedelta(days=31)).replace(day=1)
+            ),
+        )
+        .exclude(job__job_status=CLOSED)
+        .exclude(job_id__in=list(given_up))
+        .values_list("user_id", "job__work_date", "job__working_days")
+    )
+    freed = {(worker_id, month) for worker_id, month, _ in rows}
+    rows = [row for row in booking_rows(held) if row[:2] in freed]
+    if rows:
+        with connection.cursor() as cursor:
+            execute_values(cursor, MARK_BUSY_SQL, rows)
+
+
+def release_jobs(job_ids):
+    """
+    Free the acceptors of jobs deleted or closed for the days of those jobs
+    :param job_ids: ids of the jobs
+    """
+    job_ids = list(job_ids)
+    # jobs posted longer than the cap before it existed keep their days
+    release(
+        Job.acceptor.through.objects.filter(
+            job_id__in=job_ids, job__working_days__range=(1, MAX_WORKING_DAYS)
+        ).values_list("user_id", "job__work_date", "job__working_days"),
+        job_ids,
+    )
+
+
+def busy(start, days, worker_field="pk"):
+    """
+    Condition true for the rows whose worker is booked on any day of a period,
+    one index probe and one AND per month the period touches
+    :param start: first day of the period
+    :param days: number of days of the period
+    :param worker_field: field of the filtered model holding the worker id
+    :return: Q object
+    """
+    return reduce(
+        operator.or_,
+        (
+            Q(
+                Exists(
+                    WorkerAvailability.objects.filter(
+                        month=month, worker_id=OuterRef(worker_field)
+                    )
+                    .annotate(clash=F("busy_days").bitand(mask))
+                    .exclude(clash=0)
+                )
+            )
+            for month, mask in month_masks(start, days).items()
+        ),
+    )
+
+
+def free(queryset, start, days, worker_field="pk"):
+    """
+    Keep the rows whose worker is free on every day of a period
+    """
+    return queryset.exclude(busy(start, days, worker_field))
@@ -0,0 +1,19 @@
+from address.models import Address
+from django.db import transaction
+
+from .constants import *
+
+
+def delete_professions(professions):
+    """
+    Soft delete professions with their work addresses, one UPDATE per table
+    :param professions: queryset of the professions to delete
+    :return: ids of the professions this call deleted
+    """
+    with transaction.atomic():
+        ids = professions.soft_delete()
+        if ids:
+            Address.objects.filter(
+                module__address_type=WORK_ADDRESS, module_field_id__in=ids
+            ).soft_delete()
+    return ids
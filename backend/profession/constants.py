@@ -32,3 +32,13 @@ CITY = "city"
 SALARY = "salary"
 PROFESSION = "profession"
 USER = "user"
+CALENDAR = "calendar"
+WORKER_AVAILABILITY = "worker_availability"
+WORK_DATE = "work_date"
+WORKING_DAYS = "working_days"
+WORK_TYPE = "work_type"
+# longest period a job books or a free worker search covers, in days
+MAX_WORKING_DAYS = 366
+INVALID_PERIOD = "work_date must be a date and working_days a number from 1 to 366"
+FREE_WORKERS_RETRIEVED = "Free workers retrieved successfully"
+USER_ID_FIELD = "user_id"
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profession", "0003_profession_is_available"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="profession",
+            index=models.Index(
+                fields=["created_at", "id"], name="profession_created_id_idx"
+            ),
+        ),
+    ]
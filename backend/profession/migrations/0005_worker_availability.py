@@ -0,0 +1,41 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("profession", "0004_profession_profession_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkerAvailability",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("month", models.DateField()),
+                ("busy_days", models.IntegerField(default=0)),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="calendar",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "worker_availability",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="workeravailability",
+            constraint=models.UniqueConstraint(
+                fields=("month", "worker"), name="unique_worker_month"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profession", "0005_worker_availability"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="profession",
+            name="profession_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="profession",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_at", "id"],
+                name="profession_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profession",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user"],
+                name="profession_live_user_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,12 @@
 from django.db import models
 from job.models import WorkType
+from models import LIVE, SoftDeleteModel
 from user.models import User
 
+from .constants import *
 
-class Profession(models.Model):
+
+class Profession(SoftDeleteModel):
     """
     Profession model class
     mapped by : WorkerDetail - many to one mapping
@@ -36,4 +39,37 @@ class Profession(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="workerdetails", null=True
     )
-    is_deleted = models.BooleanField(editable=False, default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                condition=LIVE,
+                name="profession_created_id_idx",
+            ),
+            models.Index(
+                fields=["user"], condition=LIVE, name="profession_live_user_idx"
+            ),
+        ]
+
+
+class WorkerAvailability(models.Model):
+    """
+    Worker availability model class
+    one row per worker and month, bit d - 1 of busy_days is set when the
+    worker is booked on day d of the month
+    """
+
+    id = models.AutoField(primary_key=True)
+    worker = models.ForeignKey(User, on_delete=models.CASCADE, related_name=CALENDAR)
+    # first day of the month
+    month = models.DateField()
+    busy_days = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = WORKER_AVAILABILITY
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "worker"], name="unique_worker_month"
+            )
+        ]
@@ -1 +1,105 @@
-# Create your tests here.
+import datetime
+import json
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+from job.models import Job, WorkType
+from material_stock.tests import asgi_get, make_user
+from my_exceptions import DataNotExist
+from user.authentication import SafeJWTAuthentication
+from user.models import User
+
+from .availability import free, mark_busy, month_masks, release
+from .constants import *
+from .models import Profession
+
+PROFESSION_PATH = "/api/v1/civil-service-management/worker/"
+
+
+class StreamTestCase(TransactionTestCase):
+    """
+    Streamed worker list served by the ASGI application matches the paged one
+    """
+
+    def setUp(self):
+        work_type = WorkType.objects.create(name="Mason")
+        for number in range(1, 26):
+            Profession.objects.create(
+                profession=work_type,
+                work_experience=number,
+                expected_salary=400 + number,
+                gender="Male",
+                user=make_user(number),
+            )
+        patcher = mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(make_user(0), None)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_profession_list(self):
+        status, body = asgi_get(PROFESSION_PATH, "page_size=100")
+        self.assertEqual(status, 200)
+        paged = json.loads(body)["results"]
+        self.assertEqual(len(paged), 25)
+        with mock.patch("streaming.PARTS_PER_SEND", 3):
+            status, body = asgi_get(PROFESSION_PATH, "stream=true")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), paged)
+
+
+class AvailabilityTestCase(TestCase):
+    """
+    Month bitmaps of the days workers are booked on
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        self.worker = make_user(1)
+        self.other = make_user(2)
+
+    def free_ids(self, start, days):
+        workers = User.objects.filter(id__in=[self.worker.id, self.other.id])
+        return set(free(workers, start, days).values_list("id", flat=True))
+
+    def book(self, start, days):
+        job = Job.objects.create(
+            work_type=WorkType.objects.get_or_create(name="Mason")[0],
+            number_of_workers=1,
+            work_date=start,
+            working_days=days,
+            work_pay=500,
+            requestor=self.owner,
+        )
+        job.acceptor.add(self.worker)
+        mark_busy([self.worker.id], start, days)
+        return job
+
+    def test_period_split_by_month(self):
+        self.assertEqual(
+            month_masks(datetime.date(2030, 1, 30), 4),
+            {
+                datetime.date(2030, 1, 1): 1 << 29 | 1 << 30,
+                datetime.date(2030, 2, 1): 1 | 1 << 1,
+            },
+        )
+        for days in (0, MAX_WORKING_DAYS + 1):
+            with self.assertRaises(DataNotExist):
+                month_masks(datetime.date(2030, 1, 30), days)
+
+    def test_booked_worker_is_not_free(self):
+        self.book(datetime.date(2030, 1, 30), 4)
+        both = {self.worker.id, self.other.id}
+        self.assertEqual(self.free_ids(datetime.date(2030, 1, 29), 1), both)
+        self.assertEqual(self.free_ids(datetime.date(2030, 1, 25), 6), {self.other.id})
+        self.assertEqual(self.free_ids(datetime.date(2030, 2, 2), 1), {self.other.id})
+        self.assertEqual(self.free_ids(datetime.date(2030, 2, 3), 5), both)
+
+    def test_release_keeps_the_days_of_other_jobs(self):
+        given_up = self.book(datetime.date(2030, 1, 30), 4)
+        self.book(datetime.date(2030, 2, 1), 2)
+        release([(self.worker.id, datetime.date(2030, 1, 30), 4)], [given_up.id])
+        self.assertIn(self.worker.id, self.free_ids(datetime.date(2030, 1, 30), 2))
+        self.assertNotIn(self.worker.id, self.free_ids(datetime.date(2030, 2, 1), 1))
+        self.assertNotIn(self.worker.id, self.free_ids(datetime.date(2030, 2, 2), 1))
+        self.assertIn(self.worker.id, self.free_ids(datetime.date(2030, 2, 3), 1))
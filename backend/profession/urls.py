@@ -2,7 +2,12 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import ProfessionViewSets, SearchProfession, delete_profession
+from .views import (
+    FreeWorkers,
+    ProfessionViewSets,
+    SearchProfession,
+    delete_profession,
+)
 
 router = DefaultRouter()
 router.register("api/v1/civil-service-management/worker", ProfessionViewSets)
@@ -14,4 +19,5 @@ urlpatterns = [
     path(
         "api/v1/civil-service-management/worker/profession", SearchProfession.as_view()
     ),
+    path("api/v1/civil-service-management/worker/free", FreeWorkers.as_view()),
 ]
@@ -1,7 +1,10 @@
-from address.models import Address, AddressType
+import datetime
+
+from address.models import Address
 from address.serializers import WorkingAddressResponseSerializer
 from job.models import WorkType
 from my_exceptions import DataNotExist
+from pagination import paginated_response
 from rest_framework import status
 from rest_framework.decorators import (
     api_view,
@@ -13,9 +16,15 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from search.documents import document_page, live_documents, paginated_documents
+from search.facets import profession_facets, with_facets
+from streaming import streaming_response, wants_stream
 from user.authentication import SafeJWTAuthentication
+from user.models import User
 from user.permissions import IsWorker
 
+from .availability import free
+from .cascade import delete_professions
 from .constants import *
 from .models import Profession
 from .my_logger import logger
@@ -30,7 +39,7 @@ class ProfessionViewSets(ModelViewSet):
     Also, this class manage the all crud requests from end profession.
     """
 
-    queryset = Profession.objects.filter(is_deleted=False)
+    queryset = Profession.objects.all()
     serializer_class = ProfessionSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsWorker,)
@@ -46,7 +55,7 @@ class ProfessionViewSets(ModelViewSet):
                  else return error message with status code
         """
         try:
-            created_by = User.objects.get(is_deleted=False, id=request.data[USER])
+            created_by = User.objects.get(id=request.data[USER])
             request.data[PROFESSION] = WorkType.objects.get(
                 name=request.data[PROFESSION]
             ).id
@@ -86,17 +95,15 @@ class ProfessionViewSets(ModelViewSet):
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
+            if wants_stream(request):
                 logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(PROFESSION_NOT_EXIST)
+                return streaming_response(queryset, self.get_serializer_class())
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(PROFESSION_NOT_EXIST)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -113,7 +120,7 @@ class ProfessionViewSets(ModelViewSet):
         try:
             updated_by = request.headers.get(USER_ID)
             instance = self.get_object()
-            instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
+            instance.updated_by = User.objects.get(id=updated_by)
             serializer = self.get_serializer(instance, data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
@@ -144,10 +151,7 @@ def delete_profession(request, pk):
              else return error message with status code
     """
     try:
-        profession = Profession.objects.get(pk=pk)
-        if not profession.is_deleted:
-            profession.is_deleted = True
-            Profession.save(profession)
+        if delete_professions(Profession.objects.filter(pk=pk)):
             logger.info(DELETED_SUCCESS)
             return Response({DETAIL: DELETED_SUCCESS})
         else:
@@ -177,120 +181,124 @@ class SearchProfession(APIView):
         """
         try:
             if request.data:
-
+                profession_documents = live_documents(PROFESSION).filter(
+                    is_available=True
+                )
+                documents = None
                 if len(request.data) == 1 and PROFESSION in request.data:
                     profession = request.data[PROFESSION]
                     work = WorkType.objects.get(name=profession)
-                    professions = work.work_type.filter(
-                        is_deleted=False, is_available=True
-                    )
-                    if not professions:
-                        raise DataNotExist(DATA_NOT_FOUND)
-                    profession_serializer = ProfessionResponseSerializer(
-                        professions, many=True
-                    )
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(
-                        profession_serializer.data, status=status.HTTP_200_OK
-                    )
+                    documents = profession_documents.filter(work_type=work.id)
 
                 elif SALARY in request.data and len(request.data) == 1:
                     salary = request.data[SALARY]
-                    professions = Profession.objects.filter(
-                        is_deleted=False, expected_salary=salary, is_available=True
-                    )
-                    if not professions:
-                        raise DataNotExist(DATA_NOT_FOUND)
-                    profession_serializer = ProfessionResponseSerializer(
-                        professions, many=True
-                    )
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(
-                        profession_serializer.data, status=status.HTTP_200_OK
-                    )
+                    documents = profession_documents.filter(amount=salary)
 
                 elif PROFESSION and SALARY in request.data and len(request.data) == 2:
                     salary = request.data[SALARY]
                     profession = request.data[PROFESSION]
                     work = WorkType.objects.get(name=profession)
-                    professions = work.work_type.filter(
-                        is_deleted=False, expected_salary__gte=salary, is_available=True
-                    )
-                    if not professions:
-                        raise DataNotExist(DATA_NOT_FOUND)
-                    profession_serializer = ProfessionResponseSerializer(
-                        profession, many=True
-                    )
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(
-                        profession_serializer.data, status=status.HTTP_200_OK
+                    documents = profession_documents.filter(
+                        work_type=work.id, amount__gte=salary
                     )
 
                 elif CITY in request.data and len(request.data) == 1:
                     city = request.data[CITY]
-                    shop = AddressType.objects.get(address_type=WORK_ADDRESS)
-                    address = Address.objects.filter(
-                        is_deleted=False, module=shop.id, city=city
-                    )
-                    if not address:
-                        raise DataNotExist(DATA_NOT_FOUND)
-                    result = []
-                    for i in address:
-                        result.append(
-                            Profession.objects.get(
-                                id=i.__dict__[MODULE_FIELD_ID], is_available=True
-                            )
-                        )
-                    profession_serializer = ProfessionResponseSerializer(
-                        result, many=True
-                    )
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(
-                        profession_serializer.data, status=status.HTTP_200_OK
-                    )
+                    documents = profession_documents.filter(city=city)
 
                 elif CITY and TYPE in request.data and len(request.data) == 2:
                     city = request.data[CITY]
                     type = request.data[TYPE]
-                    shop = AddressType.objects.get(address_type=WORK_ADDRESS)
                     work = WorkType.objects.get(name=type)
-                    professions = work.work_type.filter(
-                        is_deleted=False, is_available=True
+                    documents = profession_documents.filter(
+                        work_type=work.id, city=city
                     )
-                    result_list = []
-                    for i in professions:
-                        address = Address.objects.get(
-                            is_deleted=False,
-                            module_field_id=i.__dict__[ID],
+                    paginator, page = document_page(
+                        request,
+                        documents,
+                        Profession.objects.select_related(USER),
+                        DATA_NOT_FOUND,
+                    )
+                    addresses = {
+                        address.module_field_id: address
+                        for address in Address.objects.filter(
+                            module__address_type=WORK_ADDRESS,
                             city=city,
-                            module=shop.id,
+                            module_field_id__in=[i.id for i in page],
                         )
-                        if address:
-                            address_serializer = WorkingAddressResponseSerializer(
-                                address
-                            )
-                            profession_serializer = ProfessionResponseSerializer(i)
-                            result = profession_serializer.data
-                            result.__setitem__(ADDRESS, address_serializer.data)
-                            result_list.append(result)
+                    }
+                    result_list = []
+                    for i in page:
+                        address_serializer = WorkingAddressResponseSerializer(
+                            addresses[i.id]
+                        )
+                        result = ProfessionResponseSerializer(i).data
+                        result.__setitem__(ADDRESS, address_serializer.data)
+                        result_list.append(result)
                     logger.info(RETRIEVED_SUCCESS)
-                    if not result_list:
-                        raise DataNotExist(DATA_NOT_FOUND)
-                    return Response(result_list, status=status.HTTP_200_OK)
+                    return with_facets(
+                        request,
+                        paginator.get_paginated_response(result_list),
+                        documents,
+                        profession_facets,
+                    )
+
+                if documents is None:
+                    raise DataNotExist(DATA_NOT_FOUND)
             else:
-                queryset = Profession.objects.filter(is_deleted=False)
-                if queryset:
-                    page = Profession.paginate_queryset(queryset)
+                documents = live_documents(PROFESSION)
+            response = paginated_documents(
+                request,
+                documents,
+                Profession.objects.select_related(USER),
+                ProfessionResponseSerializer,
+                DATA_NOT_FOUND,
+            )
+            logger.info(RETRIEVED_SUCCESS)
+            return with_facets(request, response, documents, profession_facets)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
-                    if page is not None:
-                        serializer = ProfessionResponseSerializer(page, many=True)
-                        logger.info(RETRIEVED_SUCCESS)
-                        return Profession.get_paginated_response(serializer.data)
 
-                    serializer = ProfessionResponseSerializer(queryset, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(serializer.data)
+class FreeWorkers(APIView):
+    """
+    Api view class for the available workers free across a work period
+    """
 
-                raise DataNotExist(PROFESSION_NOT_EXIST)
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        list the workers not booked on any day of [work_date, work_date + working_days)
+        :param request: get request with `work_date`, `working_days` and an
+                        optional `work_type`
+        :return: page of free workers
+        """
+        try:
+            try:
+                work_date = datetime.date.fromisoformat(request.query_params[WORK_DATE])
+                working_days = int(request.query_params[WORKING_DAYS])
+            except (KeyError, ValueError):
+                raise DataNotExist(INVALID_PERIOD)
+            if not 1 <= working_days <= MAX_WORKING_DAYS:
+                raise DataNotExist(INVALID_PERIOD)
+            professions = Profession.objects.filter(
+                is_available=True, user__isnull=False
+            )
+            if WORK_TYPE in request.query_params:
+                professions = professions.filter(
+                    profession_id=request.query_params[WORK_TYPE]
+                )
+            professions = free(professions, work_date, working_days, USER_ID_FIELD)
+            response = paginated_response(
+                request,
+                professions.select_related(USER),
+                ProfessionResponseSerializer,
+                NO_DATA,
+            )
+            logger.info(FREE_WORKERS_RETRIEVED)
+            return response
         except Exception as e:
             raise DataNotExist(e.__str__())
@@ -0,0 +1,125 @@
+from django.apps import apps
+from django.db.models import Count
+
+from .constants import *
+from .prefix_index import PrefixIndex
+
+# autocomplete field -> (model label, model field) it completes from
+SOURCES = {
+    CITY: ("address.Address", "city"),
+    SHOP: ("shop.Shop", "name"),
+    BRAND: ("material_stock.MaterialStock", "product__brand"),
+    MATERIAL: ("material_stock.MaterialStock", "product__name"),
+    WORK_TYPE: ("job.WorkType", "name"),
+}
+
+indexes = {field: PrefixIndex() for field in SOURCES}
+
+
+def _is_live(model):
+    return any(field.name == IS_DELETED for field in model._meta.fields)
+
+
+def value_of(instance, column):
+    """
+    Value of a model field or of a field followed across relations
+    """
+    for attribute in column.split("__"):
+        instance = getattr(instance, attribute)
+    return instance
+
+
+def get_index(field):
+    """
+    Return the prefix index of a field, building it from the database on first use
+    and rebuilding it once it is older than AUTOCOMPLETE_REFRESH, so the writes
+    made by other worker processes show up
+    :param field: autocomplete field name
+    :return: loaded PrefixIndex
+    """
+    index = indexes[field]
+    if index.stale(AUTOCOMPLETE_REFRESH):
+        label, column = SOURCES[field]
+        model = apps.get_model(label)
+        queryset = model._base_manager.all()
+        if _is_live(model):
+            queryset = queryset.filter(is_deleted=False)
+        index.load(queryset.values_list(column).annotate(count=Count("pk")).order_by())
+    return index
+
+
+def tracked_fields(model):
+    """
+    Fields of the model feeding a loaded index, indexes not built yet are
+    skipped, they will read the current rows when they are built
+    :param model: model class of the saved instance
+    :return: dict of autocomplete field -> model field
+    """
+    return {
+        field: column
+        for field, (label, column) in SOURCES.items()
+        if indexes[field].loaded and apps.get_model(label) is model
+    }
+
+
+def snapshot(instance, fields):
+    """
+    Values of the tracked fields as they are stored right now
+    :param instance: model instance about to be saved
+    :param fields: tracked fields of the model
+    :return: dict of model field -> stored value, empty for a live-less or new row
+    """
+    model = type(instance)
+    if instance.pk is None or instance._state.adding:
+        return {}
+    columns = set(fields.values())
+    if _is_live(model):
+        columns.add(IS_DELETED)
+    row = model._base_manager.filter(pk=instance.pk).values(*columns).first()
+    if row is None or row.pop(IS_DELETED, False):
+        return {}
+    return row
+
+
+def apply_change(fields, old, instance):
+    """
+    Move the popularity of the old values to the new values of the instance
+    :param fields: tracked fields of the model
+    :param old: snapshot taken before the write
+    :param instance: saved instance, None when the row was removed
+    """
+    is_live = instance is not None and not getattr(instance, IS_DELETED, False)
+    for field, column in fields.items():
+        new_value = value_of(instance, column) if is_live else None
+        old_value = old.get(column)
+        if old_value == new_value:
+            continue
+        indexes[field].remove(old_value)
+        indexes[field].add(new_value)
+
+
+def record_created(model, rows):
+    """
+    Add the values of rows created outside save(), such as bulk imports
+    :param model: model class of the created rows
+    :param rows: dicts of model field -> value of every created row
+    """
+    fields = tracked_fields(model)
+    for row in rows:
+        for field, column in fields.items():
+            indexes[field].add(row.get(column))
+
+
+def record_deleted(model, ids):
+    """
+    Drop the values of rows soft deleted outside save(), such as cascades
+    :param model: model class of the deleted rows
+    :param ids: ids of the deleted rows
+    """
+    fields = tracked_fields(model)
+    if not fields:
+        return
+    rows = model._base_manager.filter(pk__in=ids).values_list(*fields.values())
+    for row in rows:
+        for field, value in zip(fields, row):
+            indexes[field].remove(value)
@@ -0,0 +1,113 @@
+import numpy as np
+from django.db.models import OuterRef, Q, Subquery
+from material_stock.models import MaterialStock
+
+from .constants import *
+from .documents import live_documents
+
+# shops covering the most items are the only ones paired up
+MAX_PAIRED_SHOPS = 200
+
+
+def offers(city, items):
+    """
+    Live offers of the basket items in a city read off the price index
+    :param city: city of the contractor
+    :param items: list of {name, brand, quantity}
+    :return: rows of (shop id, name, brand, rate, quantity in stock)
+    """
+    wanted = Q(pk__in=[])
+    for item in items:
+        condition = Q(name=item[NAME])
+        if item.get(BRAND):
+            condition &= Q(brand=item[BRAND])
+        wanted |= condition
+    in_stock = MaterialStock.objects.filter(id=OuterRef(ENTITY_ID)).values(QUANTITY)
+    return (
+        live_documents(MATERIAL_STOCK)
+        .filter(wanted, city=city, shop__isnull=False, amount__isnull=False)
+        .annotate(in_stock=Subquery(in_stock))
+        .values_list("shop_id", NAME, BRAND, "amount", "in_stock")
+    )
+
+
+def price_matrix(rows, items):
+    """
+    Cheapest cost of every item at every shop, inf where a shop cannot fill it
+    :return: shop ids, cost matrix of shops x items, chosen brand per cell
+    """
+    shop_ids = sorted({row[0] for row in rows})
+    position = {shop_id: index for index, shop_id in enumerate(shop_ids)}
+    costs = np.full((len(shop_ids), len(items)), np.inf)
+    brands = {}
+    for shop_id, name, brand, rate, in_stock in rows:
+        for column, item in enumerate(items):
+            if name != item[NAME] or item.get(BRAND) not in (None, "", brand):
+                continue
+            if (in_stock or 0) < item[QUANTITY]:
+                continue
+            cost = rate * item[QUANTITY]
+            row = position[shop_id]
+            if cost < costs[row, column]:
+                costs[row, column] = cost
+                brands[row, column] = brand
+    return shop_ids, costs, brands
+
+
+def option(shop_ids, costs, brands, rows, items):
+    """
+    Describe one fulfilment option: which shop supplies which item at what cost
+    """
+    lines = []
+    for column, item in enumerate(items):
+        best = rows[int(np.argmin(costs[rows, column]))]
+        lines.append(
+            {
+                NAME: item[NAME],
+                BRAND: brands[best, column],
+                QUANTITY: item[QUANTITY],
+                SHOP: shop_ids[best],
+                COST: round(float(costs[best, column]), 2),
+            }
+        )
+    return {
+        SHOPS: [shop_ids[row] for row in rows],
+        TOTAL: round(sum(line[COST] for line in lines), 2),
+        ITEMS: lines,
+    }
+
+
+def rank_baskets(city, items, limit):
+    """
+    Rank the shops and shop pairs of a city that can fill a whole basket
+    :param city: city of the contractor
+    :param items: list of {name, brand, quantity}
+    :param limit: options returned per kind
+    :return: dict with the cheapest single shop and two shop options
+    """
+    rows = list(offers(city, items))
+    result = {SINGLE_SHOP: [], TWO_SHOPS: []}
+    if not rows:
+        return result
+    shop_ids, costs, brands = price_matrix(rows, items)
+
+    totals = costs.sum(axis=1)
+    for row in np.argsort(totals, kind="stable")[:limit]:
+        if np.isfinite(totals[row]):
+            result[SINGLE_SHOP].append(option(shop_ids, costs, brands, [row], items))
+
+    # pair up the shops covering the most items, each pair takes the cheaper
+    # of the two shops per item
+    coverage = np.isfinite(costs).sum(axis=1)
+    paired = np.argsort(-coverage, kind="stable")[:MAX_PAIRED_SHOPS]
+    pairs = []
+    for index, first in enumerate(paired[:-1]):
+        others = paired[index + 1 :]
+        pair_totals = np.minimum(costs[first], costs[others]).sum(axis=1)
+        for other, total in zip(others, pair_totals):
+            if np.isfinite(total) and total < min(totals[first], totals[other]):
+                pairs.append((total, int(first), int(other)))
+    pairs.sort()
+    for _, first, other in pairs[:limit]:
+        result[TWO_SHOPS].append(option(shop_ids, costs, brands, [first, other], items))
+    return result
@@ -0,0 +1,85 @@
+CITY = "city"
+SHOP = "shop"
+BRAND = "brand"
+MATERIAL = "material"
+WORK_TYPE = "work_type"
+QUERY = "q"
+LIMIT = "limit"
+VALUE = "value"
+COUNT = "count"
+IS_DELETED = "is_deleted"
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# seconds an autocomplete index is served before it is rebuilt from the database,
+# signals only reach the index of the worker process that wrote the row
+AUTOCOMPLETE_REFRESH = 5 * 60
+FIELD_NOT_SUPPORTED = "Autocomplete is not supported for this field"
+INVALID_LIMIT = "limit must be a positive number"
+RETRIEVED_SUCCESS = "Completions retrieved successfully"
+PAY_BAND = "pay_band"
+DAYS_BAND = "working_days_band"
+FACETS = "facets"
+WORK_ADDRESS = "Work Address"
+JOB = "job"
+PROFESSION = "profession"
+MATERIAL_STOCK = "material_stock"
+ENTITY_TYPES = (
+    (JOB, "Job"),
+    (PROFESSION, "Profession"),
+    (SHOP, "Shop"),
+    (MATERIAL_STOCK, "Material stock"),
+)
+SHOP_ADDRESS = "Shop Address"
+ENTITY_ID = "entity_id"
+SEARCH_DOCUMENT = "search_document"
+SCORE = "score"
+MATCHES_RETRIEVED = "Matching workers retrieved successfully"
+NO_MATCHES = "No matching workers found"
+DETAIL = "Detail"
+JOB_NOT_EXIST = "Job does not exist"
+ADDRESS = "address"
+USER = "user"
+FEED = "feed"
+WORKER_FEED = "worker_feed"
+FEED_RETRIEVED = "Feed retrieved successfully"
+FEED_EMPTY = "No jobs in your feed"
+NAME = "name"
+QUANTITY = "quantity"
+COST = "cost"
+SHOPS = "shops"
+TOTAL = "total"
+ITEMS = "items"
+SINGLE_SHOP = "single_shop"
+TWO_SHOPS = "two_shops"
+MAX_BASKET_ITEMS = 50
+INVALID_BASKET = (
+    "Send a city and up to 50 items, each with a name and a positive quantity"
+)
+BASKET_RETRIEVED = "Basket prices retrieved successfully"
+NO_BASKET_OPTIONS = "No shop in the city can fill the basket"
+PRICE_ROLLUP = "material_price_rollup"
+MIN_RATE = "min_rate"
+AVERAGE_RATE = "average_rate"
+MAX_RATE = "max_rate"
+LABOUR = "labour"
+PAY = "work_pay"
+WORKERS = "number_of_workers"
+DAYS = "working_days"
+MEDIAN = "median"
+PERCENTILES = (0.25, 0.5, 0.75)
+PERCENTILE_LABELS = ("p25", MEDIAN, "p75")
+MARKET_PAY = "market_pay"
+MARKET_COST = "market_cost"
+MIN_COST = "min_cost"
+UNPRICED = "unpriced"
+# seconds a cached pay band or city rate table is served before recomputing,
+# warm_estimates run more often than this keeps requests off the aggregation
+ESTIMATE_TIMEOUT = 15 * 60
+INVALID_ESTIMATE = (
+    "Send a work type, an address or city, positive number_of_workers and "
+    "working_days, and up to 50 items each with a name and a positive quantity"
+)
+WORK_TYPE_NOT_EXIST = "Work type does not exist"
+ESTIMATE_RETRIEVED = "Job estimate retrieved successfully"
+CREATED_AT = "created_at"
+FEED_FAN_OUT = "worker_feed_fan_out"
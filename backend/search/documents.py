@@ -0,0 +1,260 @@
+from address.models import Address
+from django.db import connection, transaction
+from job.constants import CLOSED
+from job.models import Job
+from material_stock.models import MaterialStock
+from my_exceptions import DataNotExist
+from pagination import KeysetPagination
+from profession.models import Profession
+from psycopg2.extras import execute_values
+from shop.models import Shop
+
+from . import prices
+from .constants import *
+from .models import SearchDocument
+
+COLUMNS = (
+    "entity_type",
+    "entity_id",
+    "name",
+    "brand",
+    "owner_name",
+    "city",
+    "pincode",
+    "work_type_id",
+    "shop_id",
+    "shop_types",
+    "amount",
+    "work_date",
+    "working_days",
+    "is_available",
+    "is_deleted",
+    "created_at",
+)
+
+
+def live_documents(entity_type):
+    """
+    Search documents of the live rows of one entity type
+    """
+    return SearchDocument.objects.filter(entity_type=entity_type, is_deleted=False)
+
+
+def entity_ids(documents):
+    """
+    Subquery of the entity ids of the documents, usable in an `id__in` filter
+    """
+    return documents.values(ENTITY_ID)
+
+
+def document_page(request, documents, queryset, empty_message):
+    """
+    Keyset paginate search documents on their own (created_at, entity_id)
+    index, then read the rows of the page by id, so every page costs one
+    range scan of the documents and one primary key lookup
+    :param request: search request, may carry `cursor` and `page_size`
+    :param documents: filtered live documents of one entity type
+    :param queryset: rows the documents stand for
+    :param empty_message: error message when nothing matches
+    :return: paginator and the rows of the page, newest first
+    """
+    paginator = KeysetPagination(ordering=(CREATED_AT, ENTITY_ID))
+    page = paginator.paginate_queryset(documents, request)
+    if not page:
+        raise DataNotExist(empty_message)
+    rows = queryset.in_bulk([document.entity_id for document in page])
+    return paginator, [
+        rows[document.entity_id] for document in page if document.entity_id in rows
+    ]
+
+
+def paginated_documents(request, documents, queryset, serializer_class, empty_message):
+    """
+    Paginated response of the rows of a page of search documents
+    :param serializer_class: serializer of the page rows
+    """
+    paginator, rows = document_page(request, documents, queryset, empty_message)
+    serializer = serializer_class(rows, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+def addresses_of(address_type, ids):
+    """
+    Live addresses of one module type by the id of the row they belong to
+    """
+    addresses = Address.objects.filter(
+        module__address_type=address_type, module_field_id__in=ids
+    )
+    return {address.module_field_id: address for address in addresses}
+
+
+def document(entity_type, entity_id, **fields):
+    row = dict.fromkeys(COLUMNS)
+    row.update(entity_type=entity_type, entity_id=entity_id, shop_types=[])
+    row.update(is_available=True, is_deleted=False)
+    row.update(fields)
+    return row
+
+
+def job_documents(ids):
+    jobs = Job.all_objects.filter(id__in=ids).select_related("requestor", "address")
+    for job in jobs:
+        yield document(
+            JOB,
+            job.id,
+            owner_name=job.requestor.name if job.requestor else None,
+            city=job.address.city if job.address else None,
+            pincode=job.address.pincode if job.address else None,
+            work_type_id=job.work_type_id,
+            amount=job.work_pay,
+            work_date=job.work_date,
+            working_days=job.working_days,
+            is_available=job.number_of_workers > 0,
+            is_deleted=job.is_deleted or job.job_status == CLOSED,
+            created_at=job.created_at,
+        )
+
+
+def profession_documents(ids):
+    professions = Profession.all_objects.filter(id__in=ids).select_related("user")
+    addresses = addresses_of(WORK_ADDRESS, ids)
+    for profession in professions:
+        address = addresses.get(profession.id)
+        yield document(
+            PROFESSION,
+            profession.id,
+            owner_name=profession.user.name if profession.user else None,
+            city=address.city if address else None,
+            pincode=address.pincode if address else None,
+            work_type_id=profession.profession_id,
+            amount=profession.expected_salary,
+            is_available=profession.is_available,
+            is_deleted=profession.is_deleted,
+            created_at=profession.created_at,
+        )
+
+
+def shop_documents(ids):
+    shops = Shop.all_objects.filter(id__in=ids).select_related("user")
+    addresses = addresses_of(SHOP_ADDRESS, ids)
+    for shop in shops.prefetch_related("type"):
+        address = addresses.get(shop.id)
+        yield document(
+            SHOP,
+            shop.id,
+            name=shop.name,
+            owner_name=shop.user.name if shop.user else None,
+            city=address.city if address else None,
+            pincode=address.pincode if address else None,
+            shop_types=sorted(shop_type.id for shop_type in shop.type.all()),
+            is_deleted=shop.is_deleted,
+            created_at=shop.created_at,
+        )
+
+
+def material_documents(ids):
+    materials = MaterialStock.all_objects.filter(id__in=ids).select_related(
+        "shop__user", "product"
+    )
+    addresses = addresses_of(SHOP_ADDRESS, {material.shop_id for material in materials})
+    for material in materials:
+        shop = material.shop
+        address = addresses.get(material.shop_id)
+        yield document(
+            MATERIAL_STOCK,
+            material.id,
+            name=material.product.name,
+            brand=material.product.brand,
+            owner_name=shop.user.name if shop and shop.user else None,
+            city=address.city if address else None,
+            pincode=address.pincode if address else None,
+            shop_id=material.shop_id,
+            shop_types=[material.product.type_id],
+            amount=material.rate,
+            is_deleted=material.is_deleted or bool(shop and shop.is_deleted),
+            created_at=material.created_at,
+        )
+
+
+BUILDERS = {
+    JOB: job_documents,
+    PROFESSION: profession_documents,
+    SHOP: shop_documents,
+    MATERIAL_STOCK: material_documents,
+}
+
+
+UPSERT_SQL = (
+    f"INSERT INTO {SEARCH_DOCUMENT} ({', '.join(COLUMNS)}, updated_at) "
+    f"VALUES %s ON CONFLICT (entity_type, entity_id) DO {{action}}"
+)
+TEMPLATE = f"({', '.join(['%s'] * len(COLUMNS))}, now())"
+
+
+def upsert(rows, action):
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor, UPSERT_SQL.format(action=action), rows, template=TEMPLATE
+        )
+
+
+def claim(rows):
+    """
+    Insert the documents not stored yet as deleted ones, which add nothing
+    to the rollups, so there is a row to lock for every material even on
+    its first refresh. A concurrent first refresh waits on the insert.
+    """
+    deleted = COLUMNS.index(IS_DELETED)
+    upsert(
+        [row[:deleted] + (True,) + row[deleted + 1 :] for row in rows],
+        "NOTHING",
+    )
+
+
+def refresh(entity_type, ids):
+    """
+    Rebuild the search documents of the given rows with one upsert
+    :param entity_type: job, profession, shop or material_stock
+    :param ids: ids of the rows to rebuild
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    documents = sorted(BUILDERS[entity_type](ids), key=lambda row: row[ENTITY_ID])
+    if not documents:
+        return
+    rows = [tuple(row[column] for column in COLUMNS) for row in documents]
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS[2:])
+    with transaction.atomic():
+        if entity_type == MATERIAL_STOCK:
+            claim(rows)
+            counted = prices.stored_contributions(ids)
+        upsert(rows, f"UPDATE SET {updates}, updated_at = EXCLUDED.updated_at")
+        if entity_type == MATERIAL_STOCK:
+            prices.apply(counted, contributions(documents))
+
+
+def contributions(documents):
+    """
+    What built material documents add to the price rollups
+    """
+    counted = {}
+    for row in documents:
+        value = prices.contribution(row)
+        if value is not None:
+            counted[row[ENTITY_ID]] = value
+    return counted
+
+
+def remove(entity_type, ids):
+    """
+    Drop the search documents of rows removed from the database
+    """
+    with transaction.atomic():
+        if entity_type == MATERIAL_STOCK:
+            counted = prices.stored_contributions(ids)
+        SearchDocument.objects.filter(
+            entity_type=entity_type, entity_id__in=ids
+        ).delete()
+        if entity_type == MATERIAL_STOCK:
+            prices.apply(counted, {})
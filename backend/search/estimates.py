@@ -0,0 +1,190 @@
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.db import connection
+
+from .constants import *
+
+# market pay of a work type in a city, read off the live job documents
+PAY_SQL = f"""
+    SELECT work_type_id, city, count(*),
+        percentile_cont(ARRAY{list(PERCENTILES)}::float8[]) WITHIN GROUP (ORDER BY amount)
+    FROM {SEARCH_DOCUMENT}
+    WHERE entity_type = '{JOB}' AND NOT is_deleted AND work_type_id IS NOT NULL
+        AND city IS NOT NULL AND amount IS NOT NULL {{where}}
+    GROUP BY work_type_id, city
+"""
+
+# current rates of the materials stocked in a city, off the price index
+MATERIAL_SQL = f"""
+    SELECT city, name, brand, count(*), min(amount), avg(amount)
+    FROM {SEARCH_DOCUMENT}
+    WHERE entity_type = '{MATERIAL_STOCK}' AND NOT is_deleted AND city IS NOT NULL
+        AND name IS NOT NULL AND amount IS NOT NULL {{where}}
+    GROUP BY city, name, brand
+"""
+
+
+def pay_key(work_type_id, city):
+    return f"estimate:pay:{work_type_id}:{quote(city)}"
+
+
+def material_key(city):
+    return f"estimate:material:{quote(city)}"
+
+
+def pay_bands(where="", params=()):
+    """
+    Pay percentiles per work type and city
+    :return: dict of cache key -> {count, p25, median, p75}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(PAY_SQL.format(where=where), params)
+        rows = cursor.fetchall()
+    return {
+        pay_key(work_type_id, city): {
+            COUNT: count,
+            **{
+                label: round(value, 2)
+                for label, value in zip(PERCENTILE_LABELS, percentiles)
+            },
+        }
+        for work_type_id, city, count, percentiles in rows
+    }
+
+
+def material_rates(where="", params=()):
+    """
+    Low and average rate per material name and brand of every city
+    :return: dict of cache key -> {name: {brand: (count, low, average)}}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(MATERIAL_SQL.format(where=where), params)
+        rows = cursor.fetchall()
+    rates = {}
+    for city, name, brand, count, low, average in rows:
+        by_name = rates.setdefault(material_key(city), {})
+        by_name.setdefault(name, {})[brand] = (count, low, float(average))
+    return rates
+
+
+def warm():
+    """
+    Precompute the pay bands and material rates of every work type and city
+    with two grouped queries and cache them
+    :return: number of cached entries
+    """
+    entries = {**pay_bands(), **material_rates()}
+    cache.set_many(entries, ESTIMATE_TIMEOUT)
+    return len(entries)
+
+
+def market_pay(work_type_id, city):
+    """
+    Cached pay percentiles of a work type in a city, computed for that one
+    group on a miss
+    :return: dict of count and percentiles, count 0 when nobody posted one
+    """
+    key = pay_key(work_type_id, city)
+    band = cache.get(key)
+    if band is None:
+        band = pay_bands(
+            "AND work_type_id = %s AND city = %s", (work_type_id, city)
+        ).get(key, {COUNT: 0})
+        cache.set(key, band, ESTIMATE_TIMEOUT)
+    return band
+
+
+def city_rates(city):
+    """
+    Cached material rates of a city, computed for that one city on a miss
+    :return: dict of name -> {brand: (count, low, average)}
+    """
+    key = material_key(city)
+    rates = cache.get(key)
+    if rates is None:
+        rates = material_rates("AND city = %s", (city,)).get(key, {})
+        cache.set(key, rates, ESTIMATE_TIMEOUT)
+    return rates
+
+
+def labour_estimate(work_type_id, city, workers, days, work_pay=None):
+    """
+    Labour cost of a job at its own pay and at the market pay percentiles
+    :param work_type_id: id of the work type
+    :param city: city of the job
+    :param workers: number of workers
+    :param days: working days
+    :param work_pay: pay per worker per day offered, optional
+    :return: dict of the labour cost, market pay and market cost
+    """
+    band = market_pay(work_type_id, city)
+    market_cost = {
+        label: round(band[label] * workers * days, 2)
+        for label in PERCENTILE_LABELS
+        if label in band
+    }
+    return {
+        PAY: work_pay,
+        COST: (
+            round(work_pay * workers * days, 2)
+            if work_pay is not None
+            else market_cost.get(MEDIAN)
+        ),
+        MARKET_PAY: band,
+        MARKET_COST: market_cost,
+    }
+
+
+def material_estimate(city, items):
+    """
+    Material cost of a job at the current rates of its city, an item without
+    a brand is priced across every brand of that name
+    :param city: city of the job
+    :param items: list of {name, brand, quantity}
+    :return: dict of the priced items, the names nobody stocks and the total
+    """
+    rates = city_rates(city)
+    priced, unpriced = [], []
+    for item in items:
+        brands = rates.get(item[NAME], {})
+        if item.get(BRAND):
+            brands = {item[BRAND]: brands[item[BRAND]]} if item[BRAND] in brands else {}
+        if not brands:
+            unpriced.append(item[NAME])
+            continue
+        count = sum(value[0] for value in brands.values())
+        low = min(value[1] for value in brands.values())
+        average = sum(value[0] * value[2] for value in brands.values()) / count
+        priced.append(
+            {
+                NAME: item[NAME],
+                BRAND: item.get(BRAND),
+                QUANTITY: item[QUANTITY],
+                AVERAGE_RATE: round(average, 2),
+                MIN_RATE: low,
+                COST: round(average * item[QUANTITY], 2),
+                MIN_COST: round(low * item[QUANTITY], 2),
+            }
+        )
+    return {
+        ITEMS: priced,
+        UNPRICED: unpriced,
+        COST: round(sum(line[COST] for line in priced), 2),
+        MIN_COST: round(sum(line[MIN_COST] for line in priced), 2),
+    }
+
+
+def estimate(work_type_id, city, workers, days, work_pay=None, items=()):
+    """
+    Expected cost of a job, labour plus materials, off the cached aggregates
+    :return: dict of the labour, material and total cost
+    """
+    labour = labour_estimate(work_type_id, city, workers, days, work_pay)
+    materials = material_estimate(city, items)
+    return {
+        CITY: city,
+        LABOUR: labour,
+        MATERIAL: materials,
+        TOTAL: round((labour[COST] or 0) + materials[COST], 2),
+    }
@@ -0,0 +1,121 @@
+from django.db import connection
+from django.db.models import Case, CharField, F, Value, When
+from streaming import TRUE_VALUES
+
+from .constants import *
+
+# (lower bound, upper bound exclusive, label), None means unbounded
+PAY_BANDS = (
+    (0, 500, "0-499"),
+    (500, 1000, "500-999"),
+    (1000, 1500, "1000-1499"),
+    (1500, None, "1500+"),
+)
+DAYS_BANDS = (
+    (0, 2, "1 day"),
+    (2, 4, "2-3 days"),
+    (4, 8, "4-7 days"),
+    (8, None, "8+ days"),
+)
+
+
+def band(field, bands):
+    """
+    Expression labelling a numeric field with the band it falls in
+    :param field: numeric field name
+    :param bands: tuple of (low, high, label)
+    :return: Case expression
+    """
+    whens = []
+    for low, high, label in bands:
+        condition = {f"{field}__gte": low}
+        if high is not None:
+            condition[f"{field}__lt"] = high
+        whens.append(When(then=Value(label), **condition))
+    return Case(*whens, output_field=CharField())
+
+
+def facet_counts(queryset, dimensions):
+    """
+    Count the rows of a filtered queryset per value of every dimension,
+    all dimensions are computed by one GROUPING SETS query
+    :param queryset: queryset with the current search filters applied
+    :param dimensions: dict of facet name -> expression giving the facet value
+    :return: dict of facet name -> list of {value, count}, most frequent first
+    """
+    names = list(dimensions)
+    aliases = [f"facet_{name}" for name in names]
+    rows = queryset.order_by().annotate(
+        **{alias: dimensions[name] for alias, name in zip(aliases, names)}
+    )
+    sql, params = rows.values(*aliases).query.sql_with_params()
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(alias) for alias in aliases)
+    grouping_sets = ", ".join(f"({quote(alias)})" for alias in aliases)
+    groupings = ", ".join(f"GROUPING({quote(alias)})" for alias in aliases)
+    query = (
+        f"SELECT {columns}, {groupings}, COUNT(*) FROM ({sql}) AS facet_rows "
+        f"GROUP BY GROUPING SETS ({grouping_sets}) ORDER BY COUNT(*) DESC"
+    )
+    facets = {name: [] for name in names}
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        for row in cursor.fetchall():
+            values, flags, count = row[: len(names)], row[len(names) : -1], row[-1]
+            # GROUPING() is 0 for the column the current grouping set is on
+            position = flags.index(0)
+            if values[position] is not None:
+                facets[names[position]].append({VALUE: values[position], COUNT: count})
+    return facets
+
+
+def job_facets(documents):
+    """
+    Facet counts of a job search: work type, city, pay band and working days band
+    :param documents: job search documents matching the search
+    """
+    return facet_counts(
+        documents,
+        {
+            WORK_TYPE: F("work_type__name"),
+            CITY: F(CITY),
+            PAY_BAND: band("amount", PAY_BANDS),
+            DAYS_BAND: band("working_days", DAYS_BANDS),
+        },
+    )
+
+
+def profession_facets(documents):
+    """
+    Facet counts of a worker search: work type, work address city and salary band
+    :param documents: profession search documents matching the search
+    """
+    return facet_counts(
+        documents,
+        {
+            WORK_TYPE: F("work_type__name"),
+            CITY: F(CITY),
+            PAY_BAND: band("amount", PAY_BANDS),
+        },
+    )
+
+
+def wants_facets(request):
+    """
+    Facets are opt-in through the `facets` query parameter
+    """
+    return request.query_params.get(FACETS, "").lower() in TRUE_VALUES
+
+
+def with_facets(request, response, queryset, facets):
+    """
+    Attach facet counts to a search response when the client asked for them
+    :param request: search request
+    :param response: paginated search response
+    :param queryset: search documents the results come from
+    :param facets: function computing the facets of the queryset
+    :return: the response
+    """
+    if wants_facets(request):
+        response.data[FACETS] = facets(queryset)
+    return response
@@ -0,0 +1,166 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from job.models import Job
+from profession.models import Profession
+
+from .constants import *
+from .documents import entity_ids, live_documents
+from .matching import NEARBY_PINCODE_RANGE
+from .models import FeedFanOut, WorkerFeedEntry
+
+# jobs kept per worker, older entries are trimmed on every fan-out
+FEED_SIZE = 200
+BATCH_SIZE = 1000
+
+TRIM_SQL = f"""
+    DELETE FROM {WORKER_FEED} WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY worker_id ORDER BY created_at DESC, id DESC
+            ) AS position
+            FROM {WORKER_FEED} WHERE worker_id = ANY(%s)
+        ) AS ranked WHERE position > %s
+    )
+"""
+
+
+ENQUEUE_SQL = f"""
+    INSERT INTO {FEED_FAN_OUT} (job_id, queued_at)
+    SELECT job_id, now() FROM unnest(%s) AS job_id
+    ON CONFLICT (job_id) DO NOTHING
+"""
+
+
+def located(documents, city, pincode):
+    """
+    Documents in the city or within the nearby pincode range
+    """
+    condition = Q(city=city) if city else Q(pk__in=[])
+    if pincode is not None:
+        condition |= Q(
+            pincode__range=(
+                pincode - NEARBY_PINCODE_RANGE,
+                pincode + NEARBY_PINCODE_RANGE,
+            )
+        )
+    return documents.filter(condition)
+
+
+def trim(worker_ids):
+    """
+    Keep only the newest FEED_SIZE entries of every given worker
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(TRIM_SQL, [list(worker_ids), FEED_SIZE])
+
+
+def fan_out(job_id):
+    """
+    Bring the feeds in step with one job: the job is added to the feed of
+    every available worker of its work type near it and removed from the
+    feeds it no longer belongs in
+    :param job_id: id of the created, updated or deleted job
+    """
+    job = live_documents(JOB).filter(entity_id=job_id, is_available=True).first()
+    workers = set()
+    if job is not None:
+        professions = located(
+            live_documents(PROFESSION).filter(
+                work_type_id=job.work_type_id, is_available=True
+            ),
+            job.city,
+            job.pincode,
+        )
+        workers = set(
+            Profession.objects.filter(
+                id__in=entity_ids(professions), user__isnull=False
+            ).values_list("user_id", flat=True)
+        )
+    with transaction.atomic():
+        WorkerFeedEntry.objects.filter(job_id=job_id).exclude(
+            worker_id__in=workers
+        ).delete()
+        if not workers:
+            return
+        created_at = Job.objects.values_list("created_at", flat=True).get(id=job_id)
+        WorkerFeedEntry.objects.bulk_create(
+            (
+                WorkerFeedEntry(
+                    worker_id=worker_id, job_id=job_id, created_at=created_at
+                )
+                for worker_id in workers
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        trim(workers)
+
+
+def enqueue(job_ids):
+    """
+    Queue saved jobs for fan-out in the transaction saving them, a job queued
+    again before it is drained is fanned out once
+    :param job_ids: ids of the created, updated or deleted jobs
+    """
+    job_ids = list(job_ids)
+    if job_ids:
+        with connection.cursor() as cursor:
+            cursor.execute(ENQUEUE_SQL, [job_ids])
+
+
+def drain(batch_size=BATCH_SIZE):
+    """
+    Fan out one batch of the queued jobs, oldest first. Rows locked by
+    another drainer are skipped, a failure leaves the batch queued.
+    :param batch_size: jobs fanned out in this call
+    :return: number of jobs fanned out
+    """
+    with transaction.atomic():
+        queued = list(
+            FeedFanOut.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .values_list("id", "job_id")[:batch_size]
+        )
+        for _, job_id in queued:
+            fan_out(job_id)
+        FeedFanOut.objects.filter(id__in=[pk for pk, _ in queued]).delete()
+    return len(queued)
+
+
+def rebuild(worker_ids):
+    """
+    Rebuild the feeds of the given workers from the open jobs matching their
+    professions
+    :param worker_ids: ids of the workers
+    """
+    worker_ids = list(worker_ids)
+    professions = live_documents(PROFESSION).filter(is_available=True)
+    owners = dict(
+        Profession.objects.filter(user_id__in=worker_ids).values_list("id", "user_id")
+    )
+    entries = []
+    for profession in professions.filter(entity_id__in=owners):
+        jobs = located(
+            live_documents(JOB).filter(
+                work_type_id=profession.work_type_id, is_available=True
+            ),
+            profession.city,
+            profession.pincode,
+        )
+        newest = jobs.order_by("-created_at", "-entity_id").values_list(
+            ENTITY_ID, "created_at"
+        )[:FEED_SIZE]
+        entries.extend(
+            WorkerFeedEntry(
+                worker_id=owners[profession.entity_id],
+                job_id=job_id,
+                created_at=created_at,
+            )
+            for job_id, created_at in newest
+        )
+    with transaction.atomic():
+        WorkerFeedEntry.objects.filter(worker_id__in=worker_ids).delete()
+        WorkerFeedEntry.objects.bulk_create(
+            entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+        )
+        trim(worker_ids)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...feed import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the worker feeds in step with the jobs saved since the last run, "
+        "in batches, meant to be run on a short schedule"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--pause", type=float, default=0.1, help="seconds to sleep between batches"
+        )
+
+    def handle(self, *args, **options):
+        batch_size, pause = options["batch_size"], options["pause"]
+        total = 0
+        started = time.perf_counter()
+        while True:
+            drained = drain(batch_size)
+            total += drained
+            if drained < batch_size:
+                break
+            time.sleep(pause)
+        self.stdout.write(
+            f"{total} jobs fanned out in {time.perf_counter() - started:.2f}s"
+        )
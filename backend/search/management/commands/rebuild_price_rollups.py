@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ...prices import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the material price rollups from the search documents"
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write("material price rollups rebuilt")
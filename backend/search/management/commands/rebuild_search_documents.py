@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from job.models import Job
+from material_stock.models import MaterialStock
+from profession.models import Profession
+from shop.models import Shop
+
+from ...constants import *
+from ...documents import refresh
+from ...models import SearchDocument
+
+MODELS = {
+    JOB: Job,
+    PROFESSION: Profession,
+    SHOP: Shop,
+    MATERIAL_STOCK: MaterialStock,
+}
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search documents of every job, worker, shop and material"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for entity_type, model in MODELS.items():
+            ids = model._base_manager.values_list("id", flat=True).order_by("id")
+            SearchDocument.objects.filter(entity_type=entity_type).exclude(
+                entity_id__in=ids
+            ).delete()
+            total = 0
+            last_id = 0
+            while True:
+                batch = list(ids.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                refresh(entity_type, batch)
+                total += len(batch)
+                last_id = batch[-1]
+            self.stdout.write(f"{entity_type}: {total} documents rebuilt")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from profession.models import Profession
+
+from ...feed import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job feed of every worker from the open jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = (
+            Profession.objects.filter(user__isnull=False)
+            .values_list("user_id", flat=True)
+            .order_by("user_id")
+            .distinct()
+        )
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(workers.filter(user_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            rebuild(batch)
+            total += len(batch)
+            last_id = batch[-1]
+        self.stdout.write(f"{total} worker feeds rebuilt")
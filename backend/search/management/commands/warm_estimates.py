@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ...estimates import warm
+
+
+class Command(BaseCommand):
+    help = "Precompute and cache the pay bands and material rates of job estimates"
+
+    def handle(self, *args, **options):
+        entries = warm()
+        self.stdout.write(f"{entries} job estimate aggregates cached")
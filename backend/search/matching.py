@@ -0,0 +1,147 @@
+import threading
+import time
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+from profession.models import Profession
+
+from .constants import *
+from .documents import live_documents
+
+# weights of the score components, they add up to 1
+LOCATION_WEIGHT = 0.5
+EXPERIENCE_WEIGHT = 0.3
+SALARY_WEIGHT = 0.2
+# a worker outside the job city still matches within this pincode distance
+NEARBY_PINCODE_RANGE = 10
+# years of experience past which a worker scores no higher
+EXPERIENCE_CAP = 10.0
+# seconds a candidate pool is trusted, bounds staleness across processes
+POOL_TTL = 300
+
+
+class CandidatePool:
+    """
+    Column arrays of the available workers of one work type
+    """
+
+    def __init__(self, rows):
+        ids, cities, pincodes, salaries, experiences = zip(*rows) if rows else ((),) * 5
+        self.ids = np.array(ids, dtype=np.int64)
+        self.city_names, self.cities = np.unique(
+            np.array([city or "" for city in cities], dtype=object).astype(str),
+            return_inverse=True,
+        )
+        self.pincodes = np.array(
+            [pincode or -1 for pincode in pincodes], dtype=np.int64
+        )
+        self.salaries = np.array(salaries, dtype=np.float64)
+        self.experiences = np.array(
+            [experience or 0.0 for experience in experiences], dtype=np.float64
+        )
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def city_code(self, city):
+        """
+        Position of the city in the pool, -1 when no candidate lives there
+        """
+        if not city:
+            return -1
+        position = np.searchsorted(self.city_names, city)
+        if position < len(self.city_names) and self.city_names[position] == city:
+            return position
+        return -1
+
+
+pools = {}
+lock = threading.Lock()
+
+
+def load_pool(work_type_id):
+    documents = live_documents(PROFESSION).filter(
+        work_type_id=work_type_id, is_available=True
+    )
+    experience = Profession.objects.filter(id=OuterRef(ENTITY_ID)).values(
+        "work_experience"
+    )
+    rows = documents.annotate(experience=Subquery(experience)).values_list(
+        ENTITY_ID, CITY, "pincode", "amount", "experience"
+    )
+    return CandidatePool(list(rows))
+
+
+def get_pool(work_type_id):
+    """
+    Candidate pool of a work type, loaded on first use and reloaded once stale
+    """
+    pool = pools.get(work_type_id)
+    if pool is None or time.monotonic() - pool.loaded_at > POOL_TTL:
+        pool = load_pool(work_type_id)
+        with lock:
+            pools[work_type_id] = pool
+    return pool
+
+
+def invalidate(profession_ids=(), work_type_ids=()):
+    """
+    Drop the pools of the given work types and the pools holding the given
+    professions, they are reloaded on the next match
+    """
+    profession_ids = np.array(list(profession_ids), dtype=np.int64)
+    with lock:
+        for work_type_id, pool in list(pools.items()):
+            if work_type_id in work_type_ids or np.isin(profession_ids, pool.ids).any():
+                del pools[work_type_id]
+
+
+def score(pool, city, pincode, pay):
+    """
+    Score every candidate of a pool against a job in a few array passes
+    :param pool: candidate pool of the job work type
+    :param city: city of the job
+    :param pincode: pincode of the job
+    :param pay: work pay of the job
+    :return: score per candidate, -inf for candidates that do not match
+    """
+    same_city = pool.cities == pool.city_code(city)
+    distance = np.abs(pool.pincodes - (pincode if pincode is not None else -1))
+    nearby = (pool.pincodes >= 0) & (distance <= NEARBY_PINCODE_RANGE)
+    location = np.where(
+        same_city, 1.0, np.where(nearby, 1.0 - distance / (NEARBY_PINCODE_RANGE + 1), 0)
+    )
+    experience = np.minimum(pool.experiences, EXPERIENCE_CAP) / EXPERIENCE_CAP
+    salary = 1.0 - pool.salaries / pay if pay > 0 else np.zeros(len(pool))
+    scores = (
+        LOCATION_WEIGHT * location
+        + EXPERIENCE_WEIGHT * experience
+        + SALARY_WEIGHT * salary
+    )
+    matches = (same_city | nearby) & (pool.salaries <= pay)
+    return np.where(matches, scores, -np.inf)
+
+
+def top_matches(job, limit):
+    """
+    Best matching available workers of a job
+    :param job: job to match, with its address
+    :param limit: number of workers to return
+    :return: list of (profession id, score), best first
+    """
+    pool = get_pool(job.work_type_id)
+    if not len(pool):
+        return []
+    address = job.address
+    scores = score(
+        pool,
+        address.city if address else None,
+        address.pincode if address else None,
+        job.work_pay,
+    )
+    limit = min(limit, len(scores))
+    best = np.argpartition(-scores, limit - 1)[:limit]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    best = best[np.isfinite(scores[best])]
+    return [(int(pool.ids[i]), round(float(scores[i]), 4)) for i in best]
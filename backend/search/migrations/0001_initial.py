@@ -0,0 +1,126 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:35
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("job", "0003_job_job_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "entity_type",
+                    models.CharField(
+                        choices=[
+                            ("job", "Job"),
+                            ("profession", "Profession"),
+                            ("shop", "Shop"),
+                            ("material_stock", "Material stock"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("entity_id", models.IntegerField()),
+                ("name", models.CharField(max_length=100, null=True)),
+                ("brand", models.CharField(max_length=100, null=True)),
+                ("owner_name", models.CharField(max_length=100, null=True)),
+                ("city", models.CharField(max_length=100, null=True)),
+                ("pincode", models.IntegerField(null=True)),
+                (
+                    "shop_types",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), default=list, size=None
+                    ),
+                ),
+                ("amount", models.FloatField(null=True)),
+                ("work_date", models.DateField(null=True)),
+                ("working_days", models.IntegerField(null=True)),
+                ("is_available", models.BooleanField(default=True)),
+                ("is_deleted", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "work_type",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="job.worktype",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "search_document",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "work_type", "amount"],
+                name="search_doc_work_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "city", "work_type"],
+                name="search_doc_city_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "amount"],
+                name="search_doc_amount_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "work_date", "working_days"],
+                name="search_doc_work_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "name", "city"],
+                name="search_doc_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "brand", "name"],
+                name="search_doc_brand_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["shop_types"], name="search_doc_shop_types_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="searchdocument",
+            constraint=models.UniqueConstraint(
+                fields=("entity_type", "entity_id"), name="unique_search_document"
+            ),
+        ),
+    ]
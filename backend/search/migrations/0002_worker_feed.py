@@ -0,0 +1,59 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0004_job_application"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkerFeedEntry",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField()),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="job.job",
+                    ),
+                ),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "worker_feed",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="workerfeedentry",
+            index=models.Index(
+                fields=["worker", "created_at", "id"], name="worker_feed_page_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workerfeedentry",
+            index=models.Index(fields=["job"], name="worker_feed_job_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="workerfeedentry",
+            constraint=models.UniqueConstraint(
+                fields=("worker", "job"), name="unique_worker_feed_entry"
+            ),
+        ),
+    ]
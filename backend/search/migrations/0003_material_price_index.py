@@ -0,0 +1,40 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_shop_shop_created_id_idx"),
+        ("search", "0002_worker_feed"),
+        ("material_stock", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchdocument",
+            name="shop",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="shop.shop",
+            ),
+        ),
+        migrations.RunSQL(
+            "UPDATE search_document SET shop_id = material.shop_id "
+            "FROM material_stock_materialstock AS material "
+            "WHERE entity_type = 'material_stock' AND entity_id = material.id",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "city", "name", "brand", "amount"],
+                name="search_doc_price_idx",
+            ),
+        ),
+    ]
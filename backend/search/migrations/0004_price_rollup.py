@@ -0,0 +1,55 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_shop_shop_created_id_idx"),
+        ("search", "0003_material_price_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceRollup",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("brand", models.CharField(max_length=100)),
+                ("city", models.CharField(max_length=100)),
+                ("count", models.IntegerField()),
+                ("rate_sum", models.FloatField()),
+                ("min_rate", models.FloatField()),
+                ("max_rate", models.FloatField()),
+                (
+                    "type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shop.shoptype",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "material_price_rollup",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="pricerollup",
+            constraint=models.UniqueConstraint(
+                fields=("type", "city", "brand"), name="unique_price_rollup"
+            ),
+        ),
+        migrations.RunSQL(
+            "INSERT INTO material_price_rollup "
+            "(type_id, brand, city, count, rate_sum, min_rate, max_rate) "
+            "SELECT shop_types[1], brand, city, count(*), sum(amount), "
+            "min(amount), max(amount) FROM search_document "
+            "WHERE entity_type = 'material_stock' AND NOT is_deleted "
+            "AND cardinality(shop_types) > 0 AND brand IS NOT NULL "
+            "AND city IS NOT NULL AND amount IS NOT NULL "
+            "GROUP BY shop_types[1], brand, city",
+            migrations.RunSQL.noop,
+        ),
+    ]
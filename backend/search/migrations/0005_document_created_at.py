@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+SOURCES = (
+    ("job", "job_job"),
+    ("profession", "profession_profession"),
+    ("shop", "shop_shop"),
+    ("material_stock", "material_stock_materialstock"),
+)
+
+
+class Migration(migrations.Migration):
+
+    # the created_at of the documents is read off the tables they stand for
+    dependencies = [
+        ("search", "0004_price_rollup"),
+        ("job", "0001_initial"),
+        ("profession", "0001_initial"),
+        ("shop", "0001_initial"),
+        ("material_stock", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchdocument",
+            name="created_at",
+            field=models.DateTimeField(null=True),
+        ),
+        *(
+            migrations.RunSQL(
+                "UPDATE search_document AS document SET created_at = source.created_at "
+                f"FROM {table} AS source WHERE document.entity_type = '{entity_type}' "
+                "AND document.entity_id = source.id",
+                migrations.RunSQL.noop,
+            )
+            for entity_type, table in SOURCES
+        ),
+        # documents left without a row to stand for are stale
+        migrations.RunSQL(
+            "DELETE FROM search_document WHERE created_at IS NULL",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="searchdocument",
+            name="created_at",
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "created_at", "entity_id"],
+                name="search_doc_page_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="searchdocument",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["entity_type", "city", "created_at", "entity_id"],
+                name="search_doc_city_page_idx",
+            ),
+        ),
+    ]
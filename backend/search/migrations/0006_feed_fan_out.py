@@ -0,0 +1,39 @@
+# Generated by Django 3.2.17 on 2026-10-19 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job", "0009_updated_id_index"),
+        ("search", "0005_document_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedFanOut",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                ("queued_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="job.job",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "worker_feed_fan_out",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="feedfanout",
+            constraint=models.UniqueConstraint(
+                fields=("job",), name="unique_feed_fan_out"
+            ),
+        ),
+    ]
@@ -0,0 +1,169 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+from job.models import Job, WorkType
+from shop.models import Shop, ShopType
+from user.models import User
+
+from .constants import *
+
+
+class SearchDocument(models.Model):
+    """
+    Search document model class
+    one flattened row per searchable job, worker, shop or material stock,
+    kept current from the save and soft delete of the rows it is built from
+    """
+
+    id = models.AutoField(primary_key=True)
+    entity_type = models.CharField(max_length=20, choices=ENTITY_TYPES)
+    entity_id = models.IntegerField()
+    name = models.CharField(max_length=100, null=True)
+    brand = models.CharField(max_length=100, null=True)
+    owner_name = models.CharField(max_length=100, null=True)
+    city = models.CharField(max_length=100, null=True)
+    pincode = models.IntegerField(null=True)
+    work_type = models.ForeignKey(
+        WorkType, on_delete=models.SET_NULL, related_name="+", null=True
+    )
+    # shop stocking a material stock, the price index of basket pricing
+    shop = models.ForeignKey(
+        Shop, on_delete=models.SET_NULL, related_name="+", null=True
+    )
+    shop_types = ArrayField(models.IntegerField(), default=list)
+    amount = models.FloatField(null=True)
+    work_date = models.DateField(null=True)
+    working_days = models.IntegerField(null=True)
+    is_available = models.BooleanField(default=True)
+    is_deleted = models.BooleanField(default=False)
+    # created_at of the row, searches page on the documents newest first
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = SEARCH_DOCUMENT
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_type", "entity_id"], name="unique_search_document"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["entity_type", "work_type", "amount"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_work_type_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "city", "work_type"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_city_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "amount"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_amount_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "work_date", "working_days"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_work_date_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "name", "city"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_name_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "brand", "name"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_brand_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "city", "name", "brand", "amount"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_price_idx",
+            ),
+            GinIndex(fields=["shop_types"], name="search_doc_shop_types_idx"),
+            models.Index(
+                fields=["entity_type", "created_at", "entity_id"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_page_idx",
+            ),
+            models.Index(
+                fields=["entity_type", "city", "created_at", "entity_id"],
+                condition=models.Q(is_deleted=False),
+                name="search_doc_city_page_idx",
+            ),
+        ]
+
+
+class WorkerFeedEntry(models.Model):
+    """
+    Worker feed entry model class
+    one row per worker and job recommended to the worker, written when the
+    job is saved so reading a feed is one index range scan
+    """
+
+    id = models.AutoField(primary_key=True)
+    worker = models.ForeignKey(User, on_delete=models.CASCADE, related_name=FEED)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    # created_at of the job, the feed is ordered newest job first
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = WORKER_FEED
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "job"], name="unique_worker_feed_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["worker", "created_at", "id"], name="worker_feed_page_idx"
+            ),
+            models.Index(fields=["job"], name="worker_feed_job_idx"),
+        ]
+
+
+class FeedFanOut(models.Model):
+    """
+    Feed fan-out model class
+    one row per job saved since the worker feeds were last brought in step
+    with it, written in the transaction saving the job and drained by the
+    fan_out_jobs command
+    """
+
+    id = models.AutoField(primary_key=True)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = FEED_FAN_OUT
+        constraints = [
+            models.UniqueConstraint(fields=["job"], name="unique_feed_fan_out")
+        ]
+
+
+class PriceRollup(models.Model):
+    """
+    Price rollup model class
+    count, sum, low and high rate of the live material stocks of one shop
+    type and brand in one city, adjusted with every material document change
+    """
+
+    id = models.AutoField(primary_key=True)
+    type = models.ForeignKey(ShopType, on_delete=models.CASCADE, related_name="+")
+    brand = models.CharField(max_length=100)
+    city = models.CharField(max_length=100)
+    count = models.IntegerField()
+    rate_sum = models.FloatField()
+    min_rate = models.FloatField()
+    max_rate = models.FloatField()
+
+    class Meta:
+        db_table = PRICE_ROLLUP
+        constraints = [
+            models.UniqueConstraint(
+                fields=["type", "city", "brand"], name="unique_price_rollup"
+            )
+        ]
@@ -0,0 +1,138 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+# Appended to a prefix to get the upper bound of its range in the sorted keys.
+PREFIX_END = "\U0010ffff"
+# Prefixes up to this length match a large part of the keys, their best
+# completions are kept ranked instead of being ranked on every keystroke.
+SHORT_PREFIX = 2
+# Completions kept ranked for every short prefix, requests never ask for more.
+TOP_SIZE = 50
+
+
+def normalize(term):
+    """
+    Normalize a term for prefix matching, case and extra spaces are ignored
+    :param term: raw value from the database or from the request
+    :return: normalized key
+    """
+    return " ".join(str(term).split()).casefold()
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index kept as a sorted array of normalized keys.
+    Every key carries a popularity count (number of live rows holding it),
+    completions for a prefix are the keys in the bisected range ranked by count.
+
+    The index lives in the memory of one process and signals only update the
+    index of the process that wrote the row, so every worker process drifts
+    from the others until it reloads; stale() tells the caller when to reload.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._terms = {}
+        self._counts = {}
+        self._top = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.loaded_at = None
+
+    def stale(self, max_age):
+        """
+        Whether the index was never loaded or was loaded too long ago
+        :param max_age: seconds a load is trusted
+        """
+        return not self.loaded or time.monotonic() - self.loaded_at > max_age
+
+    def load(self, rows):
+        """
+        Replace the index content with the given rows
+        :param rows: iterable of (term, count) pairs
+        """
+        counts = {}
+        terms = {}
+        for term, count in rows:
+            if not term:
+                continue
+            key = normalize(term)
+            counts[key] = counts.get(key, 0) + count
+            terms.setdefault(key, term.strip())
+        with self._lock:
+            self._counts = counts
+            self._terms = terms
+            self._keys = sorted(counts)
+            self._top = {}
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def add(self, term, count=1):
+        """
+        Increase the popularity of a term, inserting it when it is new
+        :param term: value to add
+        :param count: how many rows hold the value
+        """
+        if not term:
+            return
+        key = normalize(term)
+        with self._lock:
+            self._forget_top(key)
+            if key in self._counts:
+                self._counts[key] += count
+            else:
+                self._counts[key] = count
+                self._terms[key] = term.strip()
+                insort(self._keys, key)
+
+    def remove(self, term, count=1):
+        """
+        Decrease the popularity of a term, dropping it when no row holds it anymore
+        :param term: value to remove
+        :param count: how many rows released the value
+        """
+        if not term:
+            return
+        key = normalize(term)
+        with self._lock:
+            if key not in self._counts:
+                return
+            self._forget_top(key)
+            self._counts[key] -= count
+            if self._counts[key] <= 0:
+                del self._counts[key]
+                del self._terms[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def _forget_top(self, key):
+        # the ranking of every short prefix of a changed key may change
+        for length in range(min(len(key), SHORT_PREFIX) + 1):
+            self._top.pop(key[:length], None)
+
+    def _rank(self, key, limit):
+        low = bisect_left(self._keys, key)
+        high = bisect_left(self._keys, key + PREFIX_END, low)
+        return heapq.nsmallest(
+            limit,
+            (self._keys[i] for i in range(low, high)),
+            key=lambda k: (-self._counts[k], k),
+        )
+
+    def complete(self, prefix, limit):
+        """
+        Find the most popular terms starting with the prefix
+        :param prefix: text typed by the user
+        :param limit: maximum number of completions
+        :return: list of (term, count) pairs, most popular first
+        """
+        key = normalize(prefix)
+        with self._lock:
+            if len(key) > SHORT_PREFIX or limit > TOP_SIZE:
+                best = self._rank(key, limit)
+            else:
+                if key not in self._top:
+                    self._top[key] = self._rank(key, TOP_SIZE)
+                best = self._top[key][:limit]
+            return [(self._terms[k], self._counts[k]) for k in best]
@@ -0,0 +1,163 @@
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+
+from .constants import *
+from .models import PriceRollup, SearchDocument
+
+# a material document counts towards a rollup when it is live and has all of
+# type, brand, city and rate
+COUNTED = f"""
+    entity_type = '{MATERIAL_STOCK}' AND NOT is_deleted
+    AND cardinality(shop_types) > 0 AND brand IS NOT NULL
+    AND city IS NOT NULL AND amount IS NOT NULL
+"""
+
+# the low and high of a rollup losing its cheapest or dearest material are
+# read again off the documents, already rewritten by the time this runs
+REMOVE_SQL = f"""
+    UPDATE {PRICE_ROLLUP} AS rollup SET
+        count = rollup.count - gone.count,
+        rate_sum = rollup.rate_sum - gone.rate_sum,
+        min_rate = CASE WHEN gone.low <= rollup.min_rate THEN COALESCE(
+            (SELECT min(amount) FROM {SEARCH_DOCUMENT} WHERE {COUNTED}
+             AND shop_types[1] = gone.type_id AND brand = gone.brand
+             AND city = gone.city),
+            rollup.min_rate) ELSE rollup.min_rate END,
+        max_rate = CASE WHEN gone.high >= rollup.max_rate THEN COALESCE(
+            (SELECT max(amount) FROM {SEARCH_DOCUMENT} WHERE {COUNTED}
+             AND shop_types[1] = gone.type_id AND brand = gone.brand
+             AND city = gone.city),
+            rollup.max_rate) ELSE rollup.max_rate END
+    FROM (VALUES %s) AS gone (type_id, brand, city, count, rate_sum, low, high)
+    WHERE rollup.type_id = gone.type_id AND rollup.brand = gone.brand
+        AND rollup.city = gone.city
+    RETURNING rollup.id, rollup.count
+"""
+
+ADD_SQL = f"""
+    INSERT INTO {PRICE_ROLLUP} (
+        type_id, brand, city, count, rate_sum, min_rate, max_rate
+    ) VALUES %s
+    ON CONFLICT (type_id, city, brand) DO UPDATE SET
+        count = {PRICE_ROLLUP}.count + EXCLUDED.count,
+        rate_sum = {PRICE_ROLLUP}.rate_sum + EXCLUDED.rate_sum,
+        min_rate = LEAST({PRICE_ROLLUP}.min_rate, EXCLUDED.min_rate),
+        max_rate = GREATEST({PRICE_ROLLUP}.max_rate, EXCLUDED.max_rate)
+"""
+
+REBUILD_SQL = f"""
+    INSERT INTO {PRICE_ROLLUP} (
+        type_id, brand, city, count, rate_sum, min_rate, max_rate
+    )
+    SELECT shop_types[1], brand, city, count(*), sum(amount), min(amount),
+        max(amount)
+    FROM {SEARCH_DOCUMENT} WHERE {COUNTED}
+    GROUP BY shop_types[1], brand, city
+"""
+
+
+def contribution(document):
+    """
+    Rollup key and rate a material document adds, None when it adds nothing
+    :param document: dict of search document columns
+    """
+    if (
+        document[IS_DELETED]
+        or not document["shop_types"]
+        or document[BRAND] is None
+        or document[CITY] is None
+        or document["amount"] is None
+    ):
+        return None
+    return (
+        document["shop_types"][0],
+        document[BRAND],
+        document[CITY],
+    ), document["amount"]
+
+
+def stored_contributions(ids):
+    """
+    What the stored documents of some material stocks add to the rollups.
+    The documents stay locked until the transaction ends, so a concurrent
+    refresh of the same materials waits and then reads what this one wrote
+    instead of moving the rollups off the same old rates a second time
+    :return: dict of material id -> (key, rate)
+    """
+    documents = (
+        SearchDocument.objects.select_for_update()
+        .filter(entity_type=MATERIAL_STOCK, entity_id__in=ids)
+        .order_by(ENTITY_ID)
+        .values(ENTITY_ID, "shop_types", BRAND, CITY, "amount", IS_DELETED)
+    )
+    counted = {}
+    for document in documents:
+        value = contribution(document)
+        if value is not None:
+            counted[document[ENTITY_ID]] = value
+    return counted
+
+
+def totals(values):
+    """
+    Count, sum, low and high of the rates per rollup key, in key order so
+    that concurrent updates lock the rollups in the same order
+    """
+    grouped = {}
+    for key, rate in values:
+        count, rate_sum, low, high = grouped.get(key, (0, 0.0, rate, rate))
+        grouped[key] = (count + 1, rate_sum + rate, min(low, rate), max(high, rate))
+    return [key + grouped[key] for key in sorted(grouped)]
+
+
+def apply(old, new):
+    """
+    Move the rollups from what the old documents added to what the new ones
+    add, one UPDATE for the removed rates and one upsert for the added ones
+    :param old: dict of material id -> (key, rate) before the change
+    :param new: dict of material id -> (key, rate) after the change
+    """
+    removed = totals(value for pk, value in old.items() if new.get(pk) != value)
+    added = totals(value for pk, value in new.items() if old.get(pk) != value)
+    with connection.cursor() as cursor:
+        if removed:
+            rows = execute_values(cursor, REMOVE_SQL, removed, fetch=True)
+            empty = [pk for pk, count in rows if count <= 0]
+            if empty:
+                PriceRollup.objects.filter(id__in=empty).delete()
+        if added:
+            execute_values(cursor, ADD_SQL, added)
+
+
+def rebuild():
+    """
+    Recompute every price rollup from the material documents
+    """
+    with transaction.atomic():
+        PriceRollup.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(REBUILD_SQL)
+
+
+def price_summary(type_id, city, brand=None):
+    """
+    Low, average and high rate of the materials of a shop type in a city,
+    read off the rollups, per brand
+    :param type_id: id of the shop type
+    :param city: city of the shops
+    :param brand: only this brand when given
+    :return: list of dicts, most stocked brand first
+    """
+    rollups = PriceRollup.objects.filter(type_id=type_id, city=city)
+    if brand:
+        rollups = rollups.filter(brand=brand)
+    return [
+        {
+            BRAND: rollup.brand,
+            MIN_RATE: rollup.min_rate,
+            AVERAGE_RATE: round(rollup.rate_sum / rollup.count, 2),
+            MAX_RATE: rollup.max_rate,
+            COUNT: rollup.count,
+        }
+        for rollup in rollups.order_by("-count", BRAND)
+    ]
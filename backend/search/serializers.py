@@ -0,0 +1,16 @@
+from job.serializers import JobResponseSerializer
+from rest_framework import serializers
+
+from .models import WorkerFeedEntry
+
+
+class WorkerFeedEntrySerializer(serializers.ModelSerializer):
+    """
+    Worker feed serializer for return the recommended jobs of a worker
+    """
+
+    job = JobResponseSerializer()
+
+    class Meta:
+        model = WorkerFeedEntry
+        fields = ("job", "created_at")
@@ -0,0 +1,266 @@
+from address.models import Address
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from job.models import Job
+from material_stock.models import MaterialStock
+from models import soft_deleted
+from profession.models import Profession
+from shop.models import Shop
+from user.models import User
+
+from . import autocomplete, documents, feed, matching
+from .constants import *
+from .models import WorkerFeedEntry
+
+DOCUMENT_TYPES = {
+    Job: JOB,
+    Profession: PROFESSION,
+    Shop: SHOP,
+    MaterialStock: MATERIAL_STOCK,
+}
+
+AUTOCOMPLETE_SNAPSHOT = "_autocomplete_snapshot"
+
+
+def capture_autocomplete_values(sender, instance, raw=False, **kwargs):
+    """
+    Remember the stored values of the autocomplete fields before a write
+    """
+    fields = autocomplete.tracked_fields(sender)
+    if fields and not raw:
+        setattr(
+            instance, AUTOCOMPLETE_SNAPSHOT, autocomplete.snapshot(instance, fields)
+        )
+
+
+def update_autocomplete_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Incrementally update the prefix indexes after a create, update or soft delete
+    """
+    fields = autocomplete.tracked_fields(sender)
+    if fields and not raw:
+        old = instance.__dict__.pop(AUTOCOMPLETE_SNAPSHOT, {})
+        autocomplete.apply_change(fields, old, instance)
+
+
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    """
+    Drop the values of a removed row from the prefix indexes
+    """
+    fields = autocomplete.tracked_fields(sender)
+    if fields and not getattr(instance, "is_deleted", False):
+        old = {
+            column: autocomplete.value_of(instance, column)
+            for column in fields.values()
+        }
+        autocomplete.apply_change(fields, old, None)
+
+
+for label in {label for label, _ in autocomplete.SOURCES.values()}:
+    model = apps.get_model(label)
+    pre_save.connect(capture_autocomplete_values, sender=model)
+    post_save.connect(update_autocomplete_on_save, sender=model)
+    post_delete.connect(update_autocomplete_on_delete, sender=model)
+
+
+def materials_of(shop_ids):
+    return MaterialStock.objects.filter(shop_id__in=shop_ids).values_list(
+        "id", flat=True
+    )
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=Profession)
+@receiver(post_save, sender=Shop)
+@receiver(post_save, sender=MaterialStock)
+def refresh_search_document(sender, instance, raw=False, **kwargs):
+    """
+    Rebuild the search document of a created, updated or soft deleted row
+    """
+    if raw:
+        return
+    documents.refresh(DOCUMENT_TYPES[sender], [instance.id])
+    if sender is Shop:
+        documents.refresh(MATERIAL_STOCK, materials_of([instance.id]))
+
+
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=Profession)
+@receiver(post_delete, sender=Shop)
+@receiver(post_delete, sender=MaterialStock)
+def remove_search_document(sender, instance, **kwargs):
+    """
+    Drop the search document of a row removed from the database
+    """
+    documents.remove(DOCUMENT_TYPES[sender], [instance.id])
+
+
+@receiver(m2m_changed, sender=Shop.type.through)
+def refresh_shop_types(sender, instance, action, **kwargs):
+    """
+    Keep the shop types of a shop document in step with its m2m rows
+    """
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(
+        instance, Shop
+    ):
+        documents.refresh(SHOP, [instance.id])
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def refresh_located_documents(sender, instance, raw=False, **kwargs):
+    """
+    Copy a changed city or pincode into the documents located by the address
+    """
+    if raw:
+        return
+    address_type = instance.module.address_type
+    if address_type == WORK_ADDRESS:
+        documents.refresh(PROFESSION, [instance.module_field_id])
+    elif address_type == SHOP_ADDRESS:
+        documents.refresh(SHOP, [instance.module_field_id])
+        documents.refresh(MATERIAL_STOCK, materials_of([instance.module_field_id]))
+    documents.refresh(
+        JOB, Job.objects.filter(address_id=instance.id).values_list("id", flat=True)
+    )
+
+
+@receiver(pre_save, sender=Profession)
+def capture_work_type(sender, instance, raw=False, **kwargs):
+    """
+    Remember the stored work type of a profession before a write
+    """
+    if not raw and instance.id:
+        instance._stored_work_type = (
+            Profession.all_objects.filter(id=instance.id)
+            .values_list("profession_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Profession)
+@receiver(post_delete, sender=Profession)
+def invalidate_candidate_pools(sender, instance, raw=False, **kwargs):
+    """
+    Drop the matching pools of the old and new work type of a changed worker
+    """
+    if raw:
+        return
+    stored = instance.__dict__.pop("_stored_work_type", None)
+    matching.invalidate([instance.id], {stored, instance.profession_id})
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def invalidate_located_candidates(sender, instance, raw=False, **kwargs):
+    """
+    Drop the matching pools holding a worker whose work address changed
+    """
+    if not raw and instance.module.address_type == WORK_ADDRESS:
+        matching.invalidate([instance.module_field_id])
+
+
+@receiver(post_save, sender=Job)
+def fan_out_job(sender, instance, raw=False, **kwargs):
+    """
+    Queue a saved job for adding to the feeds of the workers it matches, the
+    fan_out_jobs command does the work outside the request
+    """
+    if not raw:
+        feed.enqueue([instance.id])
+
+
+@receiver(post_save, sender=Profession)
+@receiver(post_delete, sender=Profession)
+def rebuild_worker_feed(sender, instance, raw=False, **kwargs):
+    """
+    Rebuild the feed of a worker whose profession changed
+    """
+    if not raw and instance.user_id:
+        feed.rebuild([instance.user_id])
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def rebuild_located_worker_feed(sender, instance, raw=False, **kwargs):
+    """
+    Rebuild the feed of a worker whose work address changed
+    """
+    if not raw and instance.module.address_type == WORK_ADDRESS:
+        feed.rebuild(
+            Profession.objects.filter(
+                id=instance.module_field_id, user__isnull=False
+            ).values_list("user_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=User)
+def refresh_owner_name(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Copy a changed user name into the documents of the rows the user owns
+    """
+    if raw or created:
+        return
+    shops = Shop.objects.filter(user_id=instance.id).values_list("id", flat=True)
+    documents.refresh(
+        JOB, Job.objects.filter(requestor_id=instance.id).values_list("id", flat=True)
+    )
+    documents.refresh(
+        PROFESSION,
+        Profession.objects.filter(user_id=instance.id).values_list("id", flat=True),
+    )
+    documents.refresh(SHOP, shops)
+    documents.refresh(MATERIAL_STOCK, materials_of(shops))
+
+
+@receiver(soft_deleted)
+def refresh_soft_deleted(sender, ids, **kwargs):
+    """
+    Take rows soft deleted by one UPDATE out of search, completions, matching
+    pools and worker feeds, the work post_save does for a single row
+    """
+    autocomplete.record_deleted(sender, ids)
+    if sender in DOCUMENT_TYPES:
+        documents.refresh(DOCUMENT_TYPES[sender], ids)
+    if sender is Job:
+        WorkerFeedEntry.objects.filter(job_id__in=ids).delete()
+    elif sender is Profession:
+        professions = Profession.all_objects.filter(id__in=ids)
+        matching.invalidate(
+            ids, set(professions.values_list("profession_id", flat=True))
+        )
+        feed.rebuild(
+            professions.filter(user__isnull=False).values_list("user_id", flat=True)
+        )
+    elif sender is Address:
+        refresh_deleted_addresses(ids)
+
+
+def refresh_deleted_addresses(ids):
+    """
+    Rebuild what the soft deleted addresses located: worker and shop
+    documents, the matching pools and feeds of the workers, and the jobs
+    """
+    owners = {WORK_ADDRESS: [], SHOP_ADDRESS: []}
+    for address_type, owner_id in Address.all_objects.filter(id__in=ids).values_list(
+        "module__address_type", "module_field_id"
+    ):
+        if address_type in owners:
+            owners[address_type].append(owner_id)
+    workers = owners[WORK_ADDRESS]
+    if workers:
+        documents.refresh(PROFESSION, workers)
+        matching.invalidate(workers)
+        feed.rebuild(
+            Profession.objects.filter(id__in=workers, user__isnull=False).values_list(
+                "user_id", flat=True
+            )
+        )
+    shops = owners[SHOP_ADDRESS]
+    documents.refresh(SHOP, shops)
+    documents.refresh(MATERIAL_STOCK, materials_of(shops))
+    documents.refresh(
+        JOB,
+        Job.all_objects.filter(address_id__in=ids).values_list("id", flat=True),
+    )
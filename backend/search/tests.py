@@ -0,0 +1,526 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from address.constants import USER_ADDRESS
+from address.models import Address, AddressType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from job.models import Job, WorkType
+from material_stock.catalog import product_for
+from material_stock.models import MaterialStock
+from material_stock.tests import make_user
+from profession.models import Profession
+from rest_framework.test import APIClient
+from shop.models import Shop, ShopType
+from user.authentication import SafeJWTAuthentication
+
+from . import autocomplete, estimates, feed, matching, prices
+from .basket import rank_baskets
+from .constants import *
+from .documents import COLUMNS, live_documents
+from .facets import job_facets
+from .models import FeedFanOut, PriceRollup, SearchDocument, WorkerFeedEntry
+from .prefix_index import TOP_SIZE, PrefixIndex
+
+
+def make_address(kind, module_field_id, city="Chennai", pincode=600001):
+    return Address.objects.create(
+        city=city,
+        landmark="landmark",
+        district=city,
+        state="Tamil Nadu",
+        pincode=pincode,
+        module=AddressType.objects.get_or_create(address_type=kind)[0],
+        module_field_id=module_field_id,
+    )
+
+
+class PrefixIndexTestCase(SimpleTestCase):
+    """
+    Completions ranked by popularity, for short prefixes served from the kept top
+    """
+
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.load([("Cement", 5), ("Cera", 2), ("Ceramic tile", 7), ("Steel", 9)])
+
+    def test_most_popular_first(self):
+        self.assertEqual(
+            self.index.complete("ce", 2), [("Ceramic tile", 7), ("Cement", 5)]
+        )
+        self.assertEqual(self.index.complete(" CERA ", 5)[0], ("Ceramic tile", 7))
+        self.assertEqual(self.index.complete("x", 5), [])
+
+    def test_short_prefix_follows_writes(self):
+        self.assertEqual(self.index.complete("c", 1), [("Ceramic tile", 7)])
+        self.index.add("cera", 6)
+        self.assertEqual(self.index.complete("c", 1), [("Cera", 8)])
+        self.index.remove("Cera", 8)
+        self.index.remove("Ceramic tile", 7)
+        self.assertEqual(self.index.complete("c", 5), [("Cement", 5)])
+        self.assertEqual(self.index.complete("", 1), [("Steel", 9)])
+
+    def test_long_limit_ranks_the_whole_range(self):
+        self.index.load([(f"term {number}", number) for number in range(TOP_SIZE * 2)])
+        completions = self.index.complete("t", TOP_SIZE * 2)
+        self.assertEqual(len(completions), TOP_SIZE * 2)
+        self.assertEqual(completions[0], (f"term {TOP_SIZE * 2 - 1}", TOP_SIZE * 2 - 1))
+
+
+class AutocompleteRefreshTestCase(TestCase):
+    """
+    Indexes are rebuilt from the database once they are too old
+    """
+
+    def setUp(self):
+        patcher = mock.patch.dict(autocomplete.indexes, {WORK_TYPE: PrefixIndex()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rows_written_elsewhere_show_up_after_refresh(self):
+        WorkType.objects.create(name="Mason")
+        index = autocomplete.get_index(WORK_TYPE)
+        self.assertEqual(index.complete("ma", 5), [("Mason", 1)])
+        # rows written without this process' signals, like another worker's
+        WorkType.objects.bulk_create([WorkType(name="Marble polish")])
+        self.assertEqual(autocomplete.get_index(WORK_TYPE).complete("mar", 5), [])
+        later = index.loaded_at + AUTOCOMPLETE_REFRESH + 1
+        with mock.patch("search.prefix_index.time.monotonic", return_value=later):
+            self.assertEqual(
+                autocomplete.get_index(WORK_TYPE).complete("mar", 5),
+                [("Marble polish", 1)],
+            )
+
+
+class BasketTestCase(TestCase):
+    """
+    Shops and shop pairs of a city filling a basket, cheapest first
+    """
+
+    def setUp(self):
+        cement = ShopType.objects.create(name="Cement")
+        self.shops = {}
+        for number, (name, city, stock) in enumerate(
+            [
+                ("both", "Chennai", [("OPC", 300, 100), ("Sand", 50, 100)]),
+                ("cement", "Chennai", [("OPC", 280, 100)]),
+                ("sand", "Chennai", [("Sand", 40, 100)]),
+                ("far", "Madurai", [("OPC", 100, 100), ("Sand", 10, 100)]),
+                ("short", "Chennai", [("OPC", 100, 1)]),
+            ]
+        ):
+            shop = Shop.objects.create(
+                name=name, invented_year=2000, user=make_user(number)
+            )
+            make_address(SHOP_ADDRESS, shop.id, city)
+            for material, rate, quantity in stock:
+                MaterialStock.objects.create(
+                    product=product_for(cement.id, material, "ACC"),
+                    quantity=quantity,
+                    unit="bag",
+                    rate=rate,
+                    shop=shop,
+                )
+            self.shops[shop.id] = name
+
+    def test_cheapest_options(self):
+        items = [{NAME: "OPC", QUANTITY: 10}, {NAME: "Sand", BRAND: "ACC", QUANTITY: 5}]
+        options = rank_baskets("Chennai", items, 5)
+        summary = {
+            kind: [
+                ([self.shops[shop] for shop in option[SHOPS]], option[TOTAL])
+                for option in found
+            ]
+            for kind, found in options.items()
+        }
+        self.assertEqual(
+            summary,
+            {
+                SINGLE_SHOP: [(["both"], 3250)],
+                TWO_SHOPS: [
+                    (["cement", "sand"], 3000),
+                    (["both", "cement"], 3050),
+                    (["both", "sand"], 3200),
+                ],
+            },
+        )
+        lines = options[TWO_SHOPS][0][ITEMS]
+        self.assertEqual(
+            [(self.shops[line[SHOP]], line[COST]) for line in lines],
+            [("cement", 2800), ("sand", 200)],
+        )
+        self.assertEqual(
+            rank_baskets("Chennai", [{NAME: "Brick", QUANTITY: 1}], 5),
+            {SINGLE_SHOP: [], TWO_SHOPS: []},
+        )
+
+
+class DocumentTestCase(TestCase):
+    """
+    Documents kept up to date by the signals match a rebuild from the rows
+    """
+
+    def documents(self):
+        return list(
+            SearchDocument.objects.order_by("entity_type", "entity_id").values(*COLUMNS)
+        )
+
+    def test_incremental_documents_match_a_rebuild(self):
+        owner = make_user(0)
+        shop_type = ShopType.objects.create(name="Cement")
+        shop = Shop.objects.create(name="shop", invented_year=2000, user=owner)
+        shop.type.add(shop_type)
+        address = make_address(SHOP_ADDRESS, shop.id)
+        materials = [
+            MaterialStock.objects.create(
+                product=product_for(shop_type.id, name, "ACC"),
+                quantity=1,
+                unit="bag",
+                rate=300,
+                shop=shop,
+            )
+            for name in ("OPC", "PPC")
+        ]
+        job = Job.objects.create(
+            work_type=WorkType.objects.create(name="Mason"),
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 1),
+            working_days=1,
+            work_pay=500,
+            requestor=owner,
+        )
+        owner.name = "renamed"
+        owner.save()
+        address.city = "Madurai"
+        address.save()
+        materials[0].rate = 350
+        materials[0].save()
+        MaterialStock.objects.filter(id=materials[1].id).soft_delete()
+        job.number_of_workers = 0
+        job.save()
+
+        incremental = self.documents()
+        self.assertEqual(
+            [(row["entity_type"], row["city"]) for row in incremental],
+            [
+                (JOB, None),
+                (MATERIAL_STOCK, "Madurai"),
+                (MATERIAL_STOCK, "Madurai"),
+                (SHOP, "Madurai"),
+            ],
+        )
+        call_command("rebuild_search_documents", stdout=StringIO())
+        self.assertEqual(self.documents(), incremental)
+
+
+class FacetTestCase(TestCase):
+    """
+    Facet counts of the live jobs, every dimension from one query
+    """
+
+    def test_job_facets(self):
+        owner = make_user(0)
+        mason, painter = (
+            WorkType.objects.create(name=name) for name in ("Mason", "Painter")
+        )
+        chennai = make_address(USER_ADDRESS, owner.id)
+        for day, (work_type, pay, days, address) in enumerate(
+            [
+                (mason, 400, 1, chennai),
+                (mason, 700, 3, chennai),
+                (painter, 700, 10, None),
+                (painter, 2000, 5, chennai),
+            ],
+            start=1,
+        ):
+            job = Job.objects.create(
+                work_type=work_type,
+                number_of_workers=1,
+                work_date=datetime.date(2030, 1, day),
+                working_days=days,
+                work_pay=pay,
+                requestor=owner,
+                address=address,
+            )
+        Job.objects.filter(id=job.id).soft_delete()
+
+        with self.assertNumQueries(1):
+            facets = job_facets(live_documents(JOB))
+        counts = {
+            name: {facet[VALUE]: facet[COUNT] for facet in values}
+            for name, values in facets.items()
+        }
+        self.assertEqual(
+            counts,
+            {
+                WORK_TYPE: {"Mason": 2, "Painter": 1},
+                CITY: {"Chennai": 2},
+                PAY_BAND: {"0-499": 1, "500-999": 2},
+                DAYS_BAND: {"1 day": 1, "2-3 days": 1, "8+ days": 1},
+            },
+        )
+        self.assertEqual(facets[PAY_BAND][0], {VALUE: "500-999", COUNT: 2})
+
+
+class FeedTestCase(TestCase):
+    """
+    Queued jobs fanned out to the feeds of the matching workers nearby
+    """
+
+    def setUp(self):
+        self.mason = WorkType.objects.create(name="Mason")
+        self.nearby = self.worker(1, self.mason, "Chennai", 600001)
+        self.close = self.worker(2, self.mason, "Kanchipuram", 600010)
+        self.far = self.worker(3, self.mason, "Madurai", 625001)
+        painting = WorkType.objects.create(name="Painter")
+        self.painter = self.worker(4, painting, "Chennai", 600001)
+        owner = make_user(0)
+        self.job = Job.objects.create(
+            work_type=self.mason,
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 1),
+            working_days=1,
+            work_pay=500,
+            requestor=owner,
+            address=make_address(USER_ADDRESS, owner.id),
+        )
+
+    @staticmethod
+    def worker(number, work_type, city, pincode):
+        profession = Profession.objects.create(
+            profession=work_type,
+            work_experience=1,
+            expected_salary=400,
+            gender="Male",
+            user=make_user(number),
+        )
+        make_address(WORK_ADDRESS, profession.id, city, pincode)
+        return profession.user_id
+
+    def feed_of(self, worker_id):
+        return list(
+            WorkerFeedEntry.objects.filter(worker_id=worker_id).values_list(
+                "job_id", flat=True
+            )
+        )
+
+    def test_job_reaches_the_workers_nearby(self):
+        self.assertTrue(FeedFanOut.objects.filter(job_id=self.job.id).exists())
+        self.assertEqual(feed.drain(), 1)
+        self.assertEqual(feed.drain(), 0)
+        feeds = {
+            worker_id: self.feed_of(worker_id)
+            for worker_id in (self.nearby, self.close, self.far, self.painter)
+        }
+        self.assertEqual(
+            feeds,
+            {
+                self.nearby: [self.job.id],
+                self.close: [self.job.id],
+                self.far: [],
+                self.painter: [],
+            },
+        )
+        # the fan-out and a rebuild from the documents agree
+        feed.rebuild(feeds)
+        self.assertEqual(
+            {worker_id: self.feed_of(worker_id) for worker_id in feeds}, feeds
+        )
+
+    def test_filled_job_leaves_the_feeds(self):
+        feed.drain()
+        self.job.number_of_workers = 0
+        self.job.save()
+        self.assertEqual(feed.drain(), 1)
+        self.assertFalse(WorkerFeedEntry.objects.exists())
+
+
+class PriceRollupTestCase(TestCase):
+    """
+    Rollups moved on every write agree with a rebuild from the documents
+    """
+
+    def rollups(self):
+        return list(
+            PriceRollup.objects.order_by("city", BRAND).values_list(
+                "city", BRAND, COUNT, "rate_sum", "min_rate", "max_rate"
+            )
+        )
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        cement = ShopType.objects.create(name="Cement")
+        addresses, materials = [], []
+        for number, city in enumerate(("Chennai", "Chennai", "Madurai")):
+            shop = Shop.objects.create(
+                name="shop", invented_year=2000, user=make_user(number)
+            )
+            addresses.append(make_address(SHOP_ADDRESS, shop.id, city))
+            for brand, rate in (("ACC", 300 + number * 10), ("Ramco", 280)):
+                materials.append(
+                    MaterialStock.objects.create(
+                        product=product_for(cement.id, "OPC", brand),
+                        quantity=1,
+                        unit="bag",
+                        rate=rate,
+                        shop=shop,
+                    )
+                )
+        self.assertEqual(
+            prices.price_summary(cement.id, "Chennai", "ACC"),
+            [
+                {
+                    BRAND: "ACC",
+                    MIN_RATE: 300,
+                    AVERAGE_RATE: 305,
+                    MAX_RATE: 310,
+                    COUNT: 2,
+                }
+            ],
+        )
+        # the cheapest and the dearest of a rollup change, a shop moves city
+        materials[0].rate = 320
+        materials[0].save()
+        MaterialStock.objects.filter(id=materials[2].id).soft_delete()
+        addresses[2].city = "Chennai"
+        addresses[2].save()
+        MaterialStock.objects.filter(id=materials[3].id).soft_delete()
+
+        incremental = self.rollups()
+        self.assertEqual(
+            incremental,
+            [
+                ("Chennai", "ACC", 2, 640.0, 320.0, 320.0),
+                ("Chennai", "Ramco", 2, 560.0, 280.0, 280.0),
+            ],
+        )
+        prices.rebuild()
+        self.assertEqual(self.rollups(), incremental)
+
+
+class MatchWorkersTestCase(TestCase):
+    """
+    Candidates of a job are only shown to the house owner who posted it
+    """
+
+    def setUp(self):
+        self.owner = make_user(0)
+        work_type = WorkType.objects.create(name="Mason")
+        self.profession = Profession.objects.create(
+            profession=work_type,
+            work_experience=5,
+            expected_salary=500,
+            gender="Male",
+            user=make_user(1),
+        )
+        self.job = Job.objects.create(
+            work_type=work_type,
+            number_of_workers=1,
+            work_date=datetime.date(2030, 1, 30),
+            working_days=1,
+            work_pay=500,
+            requestor=self.owner,
+            address=make_address(USER_ADDRESS, self.owner.id),
+        )
+        make_address(WORK_ADDRESS, self.profession.id)
+        patcher = mock.patch.dict(matching.pools, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_matches(self, user, job_id):
+        with mock.patch.object(
+            SafeJWTAuthentication, "authenticate", return_value=(user, None)
+        ):
+            return APIClient().get(
+                f"/api/v1/civil-service-management/job/matches/{job_id}"
+            )
+
+    def test_requestor_sees_the_candidates(self):
+        response = self.get_matches(self.owner, self.job.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [match[USER]["email"] for match in response.data],
+            [self.profession.user.email],
+        )
+
+    def test_other_users_get_not_found(self):
+        for user in (make_user(2), self.profession.user):
+            response = self.get_matches(user, self.job.id)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.data, {DETAIL: JOB_NOT_EXIST})
+        self.assertEqual(self.get_matches(self.owner, self.job.id + 1).status_code, 404)
+
+
+class EstimateTestCase(TestCase):
+    """
+    Cost of a job off the market pay and the material rates of its city
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.mason = WorkType.objects.create(name="Mason")
+        cement = ShopType.objects.create(name="Cement")
+        for number, pay in enumerate((400, 500, 600, 700)):
+            owner = make_user(number)
+            Job.objects.create(
+                work_type=self.mason,
+                number_of_workers=1,
+                work_date=datetime.date(2030, 1, 1),
+                working_days=1,
+                work_pay=pay,
+                requestor=owner,
+                address=make_address(USER_ADDRESS, owner.id),
+            )
+        for number, brand, rate in (
+            (4, "ACC", 300),
+            (5, "ACC", 310),
+            (6, "Ramco", 280),
+        ):
+            shop = Shop.objects.create(
+                name="shop", invented_year=2000, user=make_user(number)
+            )
+            make_address(SHOP_ADDRESS, shop.id)
+            MaterialStock.objects.create(
+                product=product_for(cement.id, "OPC", brand),
+                quantity=1,
+                unit="bag",
+                rate=rate,
+                shop=shop,
+            )
+        self.items = [
+            {NAME: "OPC", QUANTITY: 10},
+            {NAME: "OPC", BRAND: "ACC", QUANTITY: 1},
+            {NAME: "Sand", QUANTITY: 1},
+        ]
+
+    def test_estimate(self):
+        result = estimates.estimate(self.mason.id, "Chennai", 2, 3, items=self.items)
+        labour, material = result[LABOUR], result[MATERIAL]
+        self.assertEqual(
+            labour[MARKET_PAY], {COUNT: 4, "p25": 475, MEDIAN: 550, "p75": 625}
+        )
+        self.assertEqual(labour[COST], 3300)
+        self.assertEqual(
+            [
+                (line[AVERAGE_RATE], line[MIN_RATE], line[COST])
+                for line in material[ITEMS]
+            ],
+            [(296.67, 280, 2966.67), (305, 300, 305)],
+        )
+        self.assertEqual(material[UNPRICED], ["Sand"])
+        self.assertEqual(result[TOTAL], 6571.67)
+        self.assertEqual(
+            estimates.estimate(self.mason.id, "Madurai", 1, 1, 500)[TOTAL], 500
+        )
+
+    def test_warmed_cache_matches_the_misses(self):
+        missed = estimates.estimate(self.mason.id, "Chennai", 2, 3, items=self.items)
+        cache.clear()
+        self.assertEqual(estimates.warm(), 2)
+        with mock.patch.object(estimates, "pay_bands") as pay_bands:
+            warmed = estimates.estimate(
+                self.mason.id, "Chennai", 2, 3, items=self.items
+            )
+        pay_bands.assert_not_called()
+        self.assertEqual(warmed, missed)
@@ -0,0 +1,18 @@
+from django.urls import path
+
+from .views import Autocomplete, BasketPrice, JobEstimate, MatchWorkers, WorkerFeed
+
+urlpatterns = [
+    path(
+        "api/v1/civil-service-management/autocomplete/<str:field>",
+        Autocomplete.as_view(),
+    ),
+    path("api/v1/civil-service-management/job/feed", WorkerFeed.as_view()),
+    path("api/v1/civil-service-management/job/estimate", JobEstimate.as_view()),
+    path(
+        "api/v1/civil-service-management/material-stock/basket", BasketPrice.as_view()
+    ),
+    path(
+        "api/v1/civil-service-management/job/matches/<int:pk>", MatchWorkers.as_view()
+    ),
+]
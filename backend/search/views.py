@@ -0,0 +1,252 @@
+from address.models import Address
+from job.constants import CLOSED
+from job.models import Job, WorkType
+from material_stock.catalog import normalize
+from my_exceptions import DataNotExist
+from pagination import paginated_response
+from profession.models import Profession
+from profession.serializers import ProfessionResponseSerializer
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from user.authentication import SafeJWTAuthentication
+from user.permissions import IsHouseOwner, IsWorker
+
+from .autocomplete import SOURCES, get_index
+from .basket import rank_baskets
+from .constants import *
+from .estimates import estimate
+from .matching import top_matches
+from .models import WorkerFeedEntry
+from .my_logger import logger
+from .serializers import WorkerFeedEntrySerializer
+
+
+class Autocomplete(APIView):
+    """
+    Api view class for prefix completion of cities, shop names, brands,
+    materials and work types
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request, field):
+        """
+        complete the typed prefix from the in-memory index of the field
+        :param request: get request with `q` prefix and optional `limit`
+        :param field: one of city, shop, brand, material or work_type
+        :return: most popular values starting with the prefix
+        """
+        try:
+            if field not in SOURCES:
+                raise DataNotExist(FIELD_NOT_SUPPORTED)
+            limit = int(request.query_params.get(LIMIT, DEFAULT_LIMIT))
+            if limit < 1:
+                raise DataNotExist(INVALID_LIMIT)
+            prefix = request.query_params.get(QUERY, "")
+            completions = get_index(field).complete(prefix, min(limit, MAX_LIMIT))
+            logger.info(RETRIEVED_SUCCESS)
+            return Response(
+                [{VALUE: value, COUNT: count} for value, count in completions],
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class MatchWorkers(APIView):
+    """
+    Api view class for ranking the available workers matching a job
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
+    @staticmethod
+    def get(request, pk):
+        """
+        score the available workers of the job work type and return the best,
+        only the requestor of the job may see its candidates
+        :param request: get request with optional `limit`
+        :param pk: id of the job
+        :return: best matching workers with their score, best first
+        """
+        try:
+            limit = int(request.query_params.get(LIMIT, DEFAULT_LIMIT))
+            if limit < 1:
+                raise DataNotExist(INVALID_LIMIT)
+            job = (
+                Job.objects.select_related(ADDRESS)
+                .filter(id=pk, requestor_id=request.user.id)
+                .first()
+            )
+            if job is None:
+                logger.error(JOB_NOT_EXIST)
+                return Response(
+                    {DETAIL: JOB_NOT_EXIST}, status=status.HTTP_404_NOT_FOUND
+                )
+            matches = top_matches(job, min(limit, MAX_LIMIT))
+            if not matches:
+                raise DataNotExist(NO_MATCHES)
+            professions = Profession.objects.select_related(USER).in_bulk(
+                [profession_id for profession_id, _ in matches]
+            )
+            serializer = ProfessionResponseSerializer()
+            logger.info(MATCHES_RETRIEVED)
+            return Response(
+                [
+                    {
+                        **serializer.to_representation(professions[profession_id]),
+                        SCORE: score,
+                    }
+                    for profession_id, score in matches
+                    if profession_id in professions
+                ],
+                status=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class WorkerFeed(APIView):
+    """
+    Api view class for the jobs recommended to the signed in worker
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsWorker,)
+
+    @staticmethod
+    def get(request):
+        """
+        read one page of the precomputed feed of the worker, newest job first
+        :param request: get request with optional `cursor` and `page_size`
+        :return: page of recommended jobs
+        """
+        try:
+            # jobs closed or deleted since, waiting for fan-out, are left out
+            entries = (
+                WorkerFeedEntry.objects.filter(
+                    worker_id=request.user.id, job__is_deleted=False
+                )
+                .exclude(job__job_status=CLOSED)
+                .select_related(JOB)
+            )
+            response = paginated_response(
+                request, entries, WorkerFeedEntrySerializer, FEED_EMPTY
+            )
+            logger.info(FEED_RETRIEVED)
+            return response
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class BasketPrice(APIView):
+    """
+    Api view class for pricing a basket of materials across the shops of a city
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def post(request):
+        """
+        rank the single shops and shop pairs able to fill the whole basket
+        :param request: post request with `city`, `items` of {name, brand, quantity}
+                        and an optional `limit`
+        :return: cheapest single shop and two shop options
+        """
+        try:
+            try:
+                city = request.data[CITY]
+                items = [
+                    {
+                        NAME: item[NAME],
+                        BRAND: item.get(BRAND),
+                        QUANTITY: float(item.get(QUANTITY, 1)),
+                    }
+                    for item in request.data[ITEMS]
+                ]
+                limit = int(request.data.get(LIMIT, DEFAULT_LIMIT))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                raise DataNotExist(INVALID_BASKET)
+            if (
+                not items
+                or len(items) > MAX_BASKET_ITEMS
+                or any(item[QUANTITY] <= 0 for item in items)
+            ):
+                raise DataNotExist(INVALID_BASKET)
+            if limit < 1:
+                raise DataNotExist(INVALID_LIMIT)
+            options = rank_baskets(city, items, min(limit, MAX_LIMIT))
+            if not options[SINGLE_SHOP] and not options[TWO_SHOPS]:
+                raise DataNotExist(NO_BASKET_OPTIONS)
+            logger.info(BASKET_RETRIEVED)
+            return Response(options, status=status.HTTP_200_OK)
+        except Exception as e:
+            raise DataNotExist(e.__str__())
+
+
+class JobEstimate(APIView):
+    """
+    Api view class for the expected cost of a job before it is posted
+    """
+
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (IsHouseOwner,)
+
+    @staticmethod
+    def post(request):
+        """
+        labour and material cost of a job off the cached market pay and rates
+        :param request: post request with the job fields `work_type`, `address`
+                        (or a `city`), `number_of_workers`, `working_days`, an
+                        optional `work_pay` and optional `items` of
+                        {name, brand, quantity}
+        :return: labour cost at the offered and market pay, material cost at
+                 the city rates and their total
+        """
+        try:
+            try:
+                workers = int(request.data[WORKERS])
+                days = int(request.data[DAYS])
+                work_pay = request.data.get(PAY)
+                work_pay = float(work_pay) if work_pay not in (None, "") else None
+                items = [
+                    {
+                        NAME: normalize(item[NAME]),
+                        BRAND: normalize(item[BRAND]) if item.get(BRAND) else None,
+                        QUANTITY: float(item.get(QUANTITY, 1)),
+                    }
+                    for item in request.data.get(ITEMS) or []
+                ]
+            except (KeyError, TypeError, ValueError, AttributeError):
+                raise DataNotExist(INVALID_ESTIMATE)
+            if (
+                workers < 1
+                or days < 1
+                or len(items) > MAX_BASKET_ITEMS
+                or any(item[QUANTITY] <= 0 for item in items)
+            ):
+                raise DataNotExist(INVALID_ESTIMATE)
+            work_type = WorkType.objects.filter(
+                name=request.data.get(WORK_TYPE)
+            ).first()
+            if work_type is None:
+                raise DataNotExist(WORK_TYPE_NOT_EXIST)
+            city = request.data.get(CITY)
+            if request.data.get(ADDRESS):
+                city = Address.objects.get(id=request.data[ADDRESS]).city
+            if not city:
+                raise DataNotExist(INVALID_ESTIMATE)
+            result = estimate(work_type.id, city, workers, days, work_pay, items)
+            logger.info(ESTIMATE_RETRIEVED)
+            return Response(
+                {WORK_TYPE: work_type.name, **result}, status=status.HTTP_200_OK
+            )
+        except Exception as e:
+            raise DataNotExist(e.__str__())
@@ -0,0 +1,22 @@
+from address.models import Address
+from django.db import transaction
+from material_stock.models import MaterialStock
+
+from .constants import *
+
+
+def delete_shops(shops):
+    """
+    Soft delete shops with their material stocks and shop addresses,
+    one UPDATE per table whatever the number of rows
+    :param shops: queryset of the shops to delete
+    :return: ids of the shops this call deleted
+    """
+    with transaction.atomic():
+        ids = shops.soft_delete()
+        if ids:
+            MaterialStock.objects.filter(shop_id__in=ids).soft_delete()
+            Address.objects.filter(
+                module__address_type=SHOP_ADDRESS, module_field_id__in=ids
+            ).soft_delete()
+    return ids
@@ -22,3 +22,6 @@ SHOPS = "shops"
 SHOP_MATERIAL = "shop_material"
 CREATE_SHOP = "create_shop"
 UPDATE_SHOP = "update_shop"
+USER = "user"
+USER_ROLE = "user__role"
+CHANGES_RETRIEVED = "Shop changes retrieved successfully"
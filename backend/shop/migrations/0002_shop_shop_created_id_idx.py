@@ -0,0 +1,17 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shop",
+            index=models.Index(fields=["created_at", "id"], name="shop_created_id_idx"),
+        ),
+    ]
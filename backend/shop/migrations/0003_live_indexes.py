@@ -0,0 +1,33 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_shop_shop_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="shop",
+            name="shop_created_id_idx",
+        ),
+        migrations.AddIndex(
+            model_name="shop",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["created_at", "id"],
+                name="shop_created_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shop",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["user"],
+                name="shop_live_user_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.17 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0003_live_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shop",
+            index=models.Index(fields=["updated_at", "id"], name="shop_updated_id_idx"),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from models import LIVE, SoftDeleteModel
 from user.models import User
 
 from .constants import *
@@ -13,7 +14,7 @@ class ShopType(models.Model):
     name = models.CharField(max_length=100)
 
 
-class Shop(models.Model):
+class Shop(SoftDeleteModel):
     """
     Shop model class
     mapped by : User - many to one mapping
@@ -37,4 +38,13 @@ class Shop(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name=SHOPS, null=True
     )
-    is_deleted = models.BooleanField(editable=False, default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], condition=LIVE, name="shop_created_id_idx"
+            ),
+            # delta sync reads every change, soft deletes included
+            models.Index(fields=["updated_at", "id"], name="shop_updated_id_idx"),
+            models.Index(fields=["user"], condition=LIVE, name="shop_live_user_idx"),
+        ]
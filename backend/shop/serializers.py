@@ -60,3 +60,13 @@ class ShopResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shop
         fields = ("name", "user", "telephone", "mobile", "email", "invented_year")
+
+
+class ShopChangeSerializer(ShopResponseSerializer):
+    """
+    Shop serializer for the changes of a client side cache, the response
+    fields and the id the client keys them by
+    """
+
+    class Meta(ShopResponseSerializer.Meta):
+        fields = ("id",) + ShopResponseSerializer.Meta.fields
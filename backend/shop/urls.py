@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import DeleteShop, SearchShop, ShopViewSets
+from .views import DeleteShop, SearchShop, ShopChanges, ShopViewSets
 
 router = DefaultRouter()
 router.register("api/v1/civil-service-management/shop", ShopViewSets)
@@ -12,4 +12,5 @@ urlpatterns = [
     path("", include(router.urls)),
     path("api/v1/civil-service-management/shop/backup/<int:pk>", DeleteShop.as_view()),
     path("api/v1/civil-service-management/shop/search", SearchShop.as_view()),
+    path("api/v1/civil-service-management/shop/changes", ShopChanges.as_view()),
 ]
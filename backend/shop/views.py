@@ -1,4 +1,3 @@
-from address.models import Address, AddressType
 from my_exceptions import DataNotExist
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
@@ -6,14 +5,18 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
+from search.constants import SHOP
+from search.documents import live_documents, paginated_documents
+from sync import changes_response
 from user.authentication import SafeJWTAuthentication
 from user.models import User
 from user.permissions import IsShopOwner
 
+from .cascade import delete_shops
 from .constants import *
 from .models import Shop, ShopType
 from .my_logger import logger
-from .serializers import ShopResponseSerializer, ShopSerializer
+from .serializers import ShopChangeSerializer, ShopResponseSerializer, ShopSerializer
 
 
 class ShopViewSets(ModelViewSet):
@@ -24,7 +27,7 @@ class ShopViewSets(ModelViewSet):
     Also, this class manage the all crud requests from end user.
     """
 
-    queryset = Shop.objects.filter(is_deleted=False)
+    queryset = Shop.objects.all()
     serializer_class = ShopSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsShopOwner,)
@@ -59,7 +62,7 @@ class ShopViewSets(ModelViewSet):
         """
         try:
             type = {"Electrical": 1, "Plumbing": 2, "Raw Material": 3}
-            created_by = User.objects.get(is_deleted=False, id=request.data["user"])
+            created_by = User.objects.get(id=request.data["user"])
             type_list = []
             for i in request.data["type"]:
                 type_list.append(type[i])
@@ -82,17 +85,12 @@ class ShopViewSets(ModelViewSet):
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(SHOP_NOT_EXIST)
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(SHOP_NOT_EXIST)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -109,7 +107,7 @@ class ShopViewSets(ModelViewSet):
         try:
             updated_by = request.headers.get("User_id")
             instance = self.get_object()
-            user = User.objects.get(is_deleted=False, id=updated_by)
+            user = User.objects.get(id=updated_by)
             instance.updated_by = user
             serializer = self.get_serializer(instance, data=request.data)
             serializer.is_valid(raise_exception=True)
@@ -139,10 +137,7 @@ class DeleteShop(APIView):
                  else return error message with status code
         """
         try:
-            shop = Shop.objects.get(pk=pk)
-            if not shop.is_deleted:
-                shop.is_deleted = True
-                Shop.save(shop)
+            if delete_shops(Shop.objects.filter(pk=pk)):
                 logger.info(DELETED_SUCCESS)
                 return Response({DETAIL: DELETED_SUCCESS})
             else:
@@ -172,90 +167,68 @@ class SearchShop(APIView):
         """
         try:
             if request.data:
+                shop_documents = live_documents(SHOP)
+                documents = None
                 if CITY and TYPE in request.data and len(request.data) == 2:
                     shop_type = request.data[TYPE]
                     city = request.data[CITY]
-                    shop = AddressType.objects.get(address_type=SHOP_ADDRESS)
-                    address = Address.objects.filter(
-                        is_deleted=False, module=shop.id, city=city
-                    )
-
-                    if not address:
-                        raise DataNotExist(NO_DATA)
-                    result = []
                     shop_type = ShopType.objects.get(name=shop_type)
-                    for i in address:
-                        shop = shop_type.shops.filter(
-                            id=i.__dict__[MODULE_FIELD_ID], is_deleted=False
-                        )
-                        if shop:
-                            shop_serializer = ShopResponseSerializer(shop, many=True)
-                            result.append(shop_serializer.data)
-                    if not result:
-                        raise DataNotExist(NO_DATA)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(result, status=status.HTTP_200_OK)
+                    documents = shop_documents.filter(
+                        city=city, shop_types__contains=[shop_type.id]
+                    )
 
                 elif NAME and CITY in request.data and len(request.data) == 2:
                     name = request.data[NAME]
                     city = request.data[CITY]
-                    shop = AddressType.objects.get(address_type=SHOP_ADDRESS)
-                    address = Address.objects.filter(
-                        is_deleted=False, module=shop.id, city=city
-                    )
-
-                    if not address:
-                        raise DataNotExist(NO_DATA)
-                    result = []
-                    for i in address:
-                        shop = Shop.objects.filter(
-                            name=name, id=i.__dict__[MODULE_FIELD_ID], is_deleted=False
-                        )
-                        if shop:
-                            shop_serializer = ShopResponseSerializer(shop, many=True)
-                            result.append(shop_serializer.data)
-                    if not result:
-                        raise DataNotExist(NO_DATA)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response({DATA: result}, status=status.HTTP_200_OK)
+                    documents = shop_documents.filter(name=name, city=city)
 
                 elif NAME in request.data and len(request.data) == 2:
                     name = request.data[NAME]
-                    shop = Shop.objects.filter(is_deleted=False, name=name)
-                    if not shop:
-                        raise DataNotExist(NO_DATA)
-                    shop_serializer = ShopResponseSerializer(shop, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(shop_serializer.data, status=status.HTTP_200_OK)
+                    documents = shop_documents.filter(name=name)
 
                 elif CITY in request.data and len(request.data) == 1:
                     city = request.data[CITY]
-                    shop = AddressType.objects.get(address_type=SHOP_ADDRESS)
-                    address = Address.objects.filter(
-                        is_deleted=False, module=shop.id, city=city
-                    )
-                    if not address:
-                        raise DataNotExist(NO_DATA)
-                    result = []
-                    for i in address:
-                        result.append(Shop.objects.get(id=i.__dict__[MODULE_FIELD_ID]))
-                    shop_serializer = ShopResponseSerializer(result, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(shop_serializer.data, status=status.HTTP_200_OK)
+                    documents = shop_documents.filter(city=city)
+
+                if documents is None:
+                    raise DataNotExist(NO_DATA)
             else:
-                queryset = Shop.objects.filter(is_deleted=False)
-                if queryset:
-                    page = Shop.paginate_queryset(queryset)
+                documents = live_documents(SHOP)
+            response = paginated_documents(
+                request,
+                documents,
+                Shop.objects.select_related(USER),
+                ShopResponseSerializer,
+                NO_DATA,
+            )
+            logger.info(RETRIEVED_SUCCESS)
+            return response
+        except Exception as e:
+            raise DataNotExist(e.__str__())
 
-                    if page is not None:
-                        serializer = ShopResponseSerializer(page, many=True)
-                        logger.info(RETRIEVED_SUCCESS)
-                        return Shop.get_paginated_response(serializer.data)
 
-                    serializer = ShopResponseSerializer(queryset, many=True)
-                    logger.info(RETRIEVED_SUCCESS)
-                    return Response(serializer.data)
+class ShopChanges(APIView):
+    """
+    Api view class for the shop changes of a client side cache
+    """
 
-                raise DataNotExist(SHOP_NOT_EXIST)
+    authentication_classes = (SafeJWTAuthentication,)
+    permission_classes = (AllowAny,)
+
+    @staticmethod
+    def get(request):
+        """
+        shops created, updated or deleted since the cursor, oldest first
+        :param request: get request with the `since` cursor of the last pull
+        :return: changed shops, ids of the deleted ones and the next cursor
+        """
+        try:
+            response = changes_response(
+                request,
+                Shop.all_objects.select_related(USER).prefetch_related(USER_ROLE),
+                ShopChangeSerializer,
+            )
+            logger.info(CHANGES_RETRIEVED)
+            return response
         except Exception as e:
             raise DataNotExist(e.__str__())
@@ -0,0 +1,99 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM = "stream"
+TRUE_VALUES = ("1", "true", "yes")
+CHUNK_SIZE = 2000
+# streamed parts read per hop from the event loop to the worker thread
+PARTS_PER_SEND = 500
+
+
+def wants_stream(request):
+    """
+    Streaming is opt-in through the `stream` query parameter
+    """
+    return request.query_params.get(STREAM, "").lower() in TRUE_VALUES
+
+
+def json_array(queryset, serializer_class, chunk_size=CHUNK_SIZE):
+    """
+    Generate a JSON array of the serialized rows piece by piece. Rows are read
+    through a server-side cursor `chunk_size` at a time, so only one chunk
+    and one serialized row are held in memory whatever the row count.
+    :param queryset: rows to serialize
+    :param serializer_class: serializer of one row
+    :param chunk_size: rows fetched from the cursor per round trip
+    """
+    encoder = JSONEncoder()
+    serializer = serializer_class()
+    yield "["
+    separator = ""
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        yield separator + encoder.encode(serializer.to_representation(instance))
+        separator = ","
+    yield "]"
+
+
+def streaming_response(queryset, serializer_class):
+    """
+    Stream every row of the queryset as a JSON array, newest first
+    :param queryset: rows to serialize
+    :param serializer_class: serializer of one row
+    :return: streaming http response
+    """
+    return StreamingHttpResponse(
+        json_array(queryset.order_by("-created_at", "-id"), serializer_class),
+        content_type="application/json",
+    )
+
+
+def read_parts(parts, count):
+    """
+    Join the next parts of a streamed response
+    :return: the joined bytes and whether the parts ran out
+    """
+    chunk = list(islice(parts, count))
+    return b"".join(chunk), len(chunk) < count
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGI handler that reads streaming responses off the worker thread.
+    Django 3.2 iterates them inside the event loop, where the queryset
+    iterator behind a streamed list may not touch the database.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [
+            (str(header).encode("ascii"), str(value).encode("latin1"))
+            for header, value in response.items()
+        ]
+        headers += [
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            for cookie in response.cookies.values()
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        parts = iter(response)
+        read = sync_to_async(read_parts, thread_sensitive=True)
+        done = False
+        while not done:
+            body, done = await read(parts, PARTS_PER_SEND)
+            for chunk, _ in self.chunk_bytes(body):
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,110 @@
+import datetime
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from pagination import decode_cursor, encode_cursor
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+SINCE = "since"
+PAGE_SIZE = "page_size"
+MAX_PAGE_SIZE = 500
+CHANGED = "changed"
+DELETED = "deleted"
+CURSOR = "cursor"
+HAS_MORE = "has_more"
+INVALID_SINCE = "Invalid since cursor"
+# a row is stamped before its statement, or its transaction, starts on the
+# database and on another clock, this much slack covers both
+SYNC_LAG = datetime.timedelta(seconds=2)
+# longest an open transaction holds every pull back, a pull only skips rows
+# of a transaction that stays open longer than this before committing
+MAX_SYNC_HOLD = datetime.timedelta(minutes=5)
+
+# start of the oldest transaction still open on the database, a row it
+# writes is stamped after that but only shows up once it commits
+OLDEST_OPEN_SQL = """
+    SELECT min(xact_start) FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_type = 'client backend'
+        AND state <> 'idle' AND xact_start IS NOT NULL AND pid <> pg_backend_pid()
+"""
+
+
+def read_since(token):
+    """
+    Position (updated_at, id) a client synced up to, None for a first sync
+    """
+    if not token:
+        return None
+    cursor = decode_cursor(token)
+    try:
+        position = (parse_datetime(cursor["u"]), int(cursor["i"]))
+    except (KeyError, TypeError, ValueError):
+        raise NotFound(INVALID_SINCE)
+    if position[0] is None:
+        raise NotFound(INVALID_SINCE)
+    return position
+
+
+def settled_before():
+    """
+    Time before which every stamped row is committed or rolled back, so a
+    pull never moves the cursor past a row that is still to show up. An
+    open transaction holds it back until it ends or for MAX_SYNC_HOLD, so a
+    stuck session can not stop every client from syncing.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(OLDEST_OPEN_SQL)
+        (oldest,) = cursor.fetchone()
+    now = timezone.now()
+    return max(min(oldest or now, now), now - MAX_SYNC_HOLD) - SYNC_LAG
+
+
+def changes_response(request, queryset, serializer_class):
+    """
+    Rows created, updated or soft deleted since the client's cursor, oldest
+    change first, read with one range scan of the (updated_at, id) index
+    :param request: get request with an optional `since` cursor from the
+                    last pull and `page_size`
+    :param queryset: every row of the resource, soft deleted ones included
+    :param serializer_class: serializer of a changed row
+    :return: changed rows, ids of the deleted rows, the cursor to send next
+             time and whether more changes are waiting
+    """
+    params = request.query_params
+    since = read_since(params.get(SINCE))
+    try:
+        page_size = min(
+            int(params.get(PAGE_SIZE, api_settings.PAGE_SIZE)), MAX_PAGE_SIZE
+        )
+    except (TypeError, ValueError):
+        page_size = api_settings.PAGE_SIZE
+    page_size = max(page_size, 1)
+
+    changes = queryset.filter(updated_at__lt=settled_before())
+    if since is not None:
+        updated_at, pk = since
+        changes = changes.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+        )
+    rows = list(changes.order_by("updated_at", "id")[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    token = params.get(SINCE)
+    if rows:
+        last = rows[-1]
+        token = encode_cursor({"u": last.updated_at.isoformat(), "i": last.id})
+    return Response(
+        {
+            CHANGED: serializer_class(
+                [row for row in rows if not row.is_deleted], many=True
+            ).data,
+            DELETED: [row.id for row in rows if row.is_deleted],
+            CURSOR: token,
+            HAS_MORE: has_more,
+        }
+    )
@@ -0,0 +1,28 @@
+from address.models import Address
+from django.db import transaction
+from job.models import Job
+from profession.cascade import delete_professions
+from profession.models import Profession
+from shop.cascade import delete_shops
+from shop.models import Shop
+
+from .constants import *
+
+
+def delete_users(users):
+    """
+    Soft delete users with everything they own: their shops, professions,
+    jobs and home addresses, each cascade one UPDATE per table
+    :param users: queryset of the users to delete
+    :return: ids of the users this call deleted
+    """
+    with transaction.atomic():
+        ids = users.soft_delete()
+        if ids:
+            delete_shops(Shop.objects.filter(user_id__in=ids))
+            delete_professions(Profession.objects.filter(user_id__in=ids))
+            Job.objects.filter(requestor_id__in=ids).soft_delete()
+            Address.objects.filter(
+                module__address_type=HOME_ADDRESS, module_field_id__in=ids
+            ).soft_delete()
+    return ids
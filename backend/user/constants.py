@@ -30,3 +30,4 @@ STATUS = "status"
 OTP = "otp"
 OTP_VERIFICATION_SUCCESS = "OTP verification success"
 OTP_DOES_NOT_MATCH = "OTP does not match"
+HOME_ADDRESS = "Home Address"
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.17 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0008_alter_user_options_remove_user_date_joined_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["created_at", "id"], name="user_created_id_idx"),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from models import LIVE, SoftDeleteModel
 
 
 class Verification(models.Model):
@@ -12,7 +13,7 @@ class Role(models.Model):
     name = models.CharField(max_length=100)
 
 
-class User(models.Model):
+class User(SoftDeleteModel):
     """
     User model class
     """
@@ -40,7 +41,13 @@ class User(models.Model):
         related_name="update_user",
     )
     role = models.ManyToManyField(Role, related_name="roles")
-    is_deleted = models.BooleanField(editable=False, default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], condition=LIVE, name="user_created_id_idx"
+            )
+        ]
 
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = []
@@ -1 +1,115 @@
-# Create your tests here.
+import datetime
+
+from address.models import Address, AddressType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from job.models import Job, WorkType
+from material_stock.catalog import product_for
+from material_stock.models import MaterialStock
+from profession.models import Profession
+from search.models import SearchDocument
+from shop.models import Shop, ShopType
+
+from .cascade import delete_users
+from .constants import *
+from .models import User
+
+
+def make_user(number):
+    return User.objects.create(
+        username=f"user-{number}",
+        name=f"user {number}",
+        mobile=9000000000 + number,
+        email=f"user-{number}@example.com",
+    )
+
+
+class CascadeTestCase(TestCase):
+    """
+    Deleting users soft deletes everything they own with set based updates
+    """
+
+    def setUp(self):
+        self.work_type = WorkType.objects.create(name="Mason")
+        self.shop_type = ShopType.objects.create(name="Cement")
+
+    def address(self, kind, module_field_id):
+        return Address.objects.create(
+            city="Chennai",
+            landmark="landmark",
+            district="Chennai",
+            state="Tamil Nadu",
+            pincode=600001,
+            module=AddressType.objects.get_or_create(address_type=kind)[0],
+            module_field_id=module_field_id,
+        )
+
+    def estate(self, user, size):
+        """
+        Rows a user owns, `size` of each kind
+        :return: list of every owned row
+        """
+        rows = [self.address(HOME_ADDRESS, user.id)]
+        for number in range(size):
+            shop = Shop.objects.create(name="shop", invented_year=2000, user=user)
+            profession = Profession.objects.create(
+                profession=self.work_type,
+                work_experience=1,
+                expected_salary=500,
+                gender="Male",
+                user=user,
+            )
+            rows += [
+                shop,
+                profession,
+                MaterialStock.objects.create(
+                    product=product_for(self.shop_type.id, "OPC", "ACC"),
+                    quantity=1,
+                    unit="bag",
+                    shop=shop,
+                ),
+                self.address("Shop Address", shop.id),
+                self.address("Work Address", profession.id),
+                Job.objects.create(
+                    work_type=self.work_type,
+                    number_of_workers=1,
+                    work_date=datetime.date(2030, 1, 1 + number),
+                    working_days=1,
+                    work_pay=500,
+                    requestor=user,
+                ),
+            ]
+        return rows
+
+    def is_deleted(self, row):
+        return type(row).all_objects.get(id=row.id).is_deleted
+
+    def test_owned_rows_are_deleted(self):
+        owner, other = make_user(0), make_user(1)
+        owned = self.estate(owner, 2)
+        kept = self.estate(other, 2)
+        shop = owned[1]
+
+        self.assertEqual(delete_users(User.objects.filter(id=owner.id)), [owner.id])
+        self.assertTrue(self.is_deleted(owner))
+        self.assertEqual([row for row in owned if not self.is_deleted(row)], [])
+        self.assertEqual([row for row in kept if self.is_deleted(row)], [])
+        self.assertFalse(Shop.objects.filter(id=shop.id).exists())
+        self.assertTrue(
+            SearchDocument.objects.get(entity_type="shop", entity_id=shop.id).is_deleted
+        )
+        self.assertEqual(delete_users(User.objects.filter(id=owner.id)), [])
+
+    def test_queries_do_not_grow_with_the_rows(self):
+        small, large = make_user(0), make_user(1)
+        self.estate(small, 1)
+        self.estate(large, 4)
+        # the price rollups stay in use, neither delete empties one
+        self.estate(make_user(2), 1)
+        counts = []
+        for user in (small, large):
+            with CaptureQueriesContext(connection) as queries:
+                delete_users(User.objects.filter(id=user.id))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
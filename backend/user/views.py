@@ -12,6 +12,7 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from .authentication import SafeJWTAuthentication
+from .cascade import delete_users
 from .constants import *
 from .models import Role, User, Verification
 from .my_logger import logger
@@ -49,7 +50,7 @@ class UserViewSets(ModelViewSet):
     If you want changes in that default methods we can override it is possible.
     """
 
-    queryset = User.objects.filter(is_deleted=False)
+    queryset = User.objects.all()
     serializer_class = UserSerializer
     authentication_classes = (SafeJWTAuthentication,)
     permission_classes = (IsCreationOrIsAuthenticated,)
@@ -111,17 +112,12 @@ class UserViewSets(ModelViewSet):
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
-            if queryset:
-                page = self.paginate_queryset(queryset)
-                if page is not None:
-                    serializer = self.get_serializer(page, many=True)
-                    logger.info()
-                    return self.get_paginated_response(serializer.data)
-
-                serializer = self.get_serializer(queryset, many=True)
-                logger.info(RETRIEVED_SUCCESS)
-                return Response(serializer.data)
-            raise DataNotExist(USER_NOT_EXIST)
+            page = self.paginate_queryset(queryset)
+            if not page:
+                raise DataNotExist(USER_NOT_EXIST)
+            serializer = self.get_serializer(page, many=True)
+            logger.info(RETRIEVED_SUCCESS)
+            return self.get_paginated_response(serializer.data)
         except Exception as e:
             raise DataNotExist(e.__str__())
 
@@ -141,7 +137,7 @@ class UserViewSets(ModelViewSet):
             for i in value:
                 role = Role.objects.get(name=i)
                 request.data[ROLE].append(role.id)
-            instance.updated_by = User.objects.get(is_deleted=False, id=updated_by)
+            instance.updated_by = User.objects.get(id=updated_by)
             serializer = self.get_serializer(instance, data=request.data)
             serializer.is_valid(raise_exception=True)
             self.perform_update(serializer)
@@ -170,10 +166,7 @@ class DeleteUser(APIView):
                  else return error message with status code
         """
         try:
-            user = User.objects.get(pk=pk)
-            if not user.is_deleted:
-                user.is_deleted = True
-                User.save(user)
+            if delete_users(User.objects.filter(pk=pk)):
                 logger.info(DELETED_SUCCESS)
                 return Response({DETAIL: DELETED_SUCCESS})
             else: